@@ -0,0 +1,44 @@
+from agno.agent import Agent
+from agno.storage.agent.sqlite import SqliteAgentStorage
+from sqlalchemy import event
+from llm_scheduler import ScheduledTogether
+from telemetry import VERBOSE_LOGGING
+from knowledge.knowledge_base import search_papers
+from storage.workflow_storage import configure_connection
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# SQLite storage of the chat sessions, so a conversation continues across requests
+chat_storage = SqliteAgentStorage(table_name="chat_agent_sessions", db_file="workflows/db/chat.db")
+event.listen(chat_storage.db_engine, "connect", configure_connection)  # Concurrent chats wait on locks instead of failing
+chat_storage.create()
+
+def create_chat_agent(session_id=None):
+    """
+    Creates a chat agent that answers questions about the downloaded papers. Each request gets its own instance;
+    the previous questions and answers of its conversation are loaded from the chat storage.
+    """
+    return Agent(
+        session_id=session_id,
+        storage=chat_storage,
+        add_history_to_messages=True,
+        name="chat-agent",
+        model=ScheduledTogether(id="meta-llama/Llama-3.3-70B-Instruct-Turbo-Free", api_key=os.getenv("TOGETHER_API_KEY"), priority="interactive"),
+        tools=[search_papers],
+        description=
+        '''
+            You are a research assistant that answers questions about the research papers downloaded
+            for the literature reviews, using passages retrieved from their full text.
+        ''',
+        instructions=[
+            "Search the papers for passages relevant to the question before answering.",
+            "Answer using only the information in the retrieved passages.",
+            "Cite the title, page, and source link of the papers you use.",
+            "If the passages do not answer the question, say so instead of guessing."
+        ],
+        markdown=True,
+        show_tool_calls=VERBOSE_LOGGING,
+        debug_mode=VERBOSE_LOGGING
+    )
@@ -0,0 +1,43 @@
+from agno.agent import Agent
+from llm_scheduler import ScheduledTogether
+from telemetry import VERBOSE_LOGGING
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+def create_paper_review_agent(session_id=None):
+    """Creates a paper review agent that writes the literature review of a single paper."""
+    return Agent(
+        session_id=session_id,
+        name="paper-review-agent",
+        model=ScheduledTogether(id="meta-llama/Llama-3.3-70B-Instruct-Turbo-Free", api_key=os.getenv("TOGETHER_API_KEY")),
+        description=
+        '''
+            You are a paper review agent that will generate the literature review of a single research paper using
+            the metadata and summary of the paper generated by the Summarization Agent.
+        ''',
+        instructions=[
+            "Generate a literature review of the given research paper using its metadata, abstract, and summary.",
+            "If excerpts of the methods and results sections of the paper are provided, use them to discuss its approach and findings.",
+            "The review should be a single paragraph discussing the contributions, methods, results, and limitations of the paper.",
+            "Keep the metadata of the paper exactly as provided.",
+            "Important: Your final response must be in JSON format with the following structure:",
+                "{"
+                "    'title': 'Title of the Paper',"
+                "    'authors': 'Authors of the Paper',"
+                "    'abstract': 'Abstract of the Paper',"
+                "    'publication_date': 'Date of Publication',"
+                "    'keywords': 'Keywords of the Paper',"
+                "    'source_link': 'Source Link of the Paper',"
+                "    'summary': 'Summary of the Paper',"
+                "    'review': 'Literature Review of the Paper',"
+                "    'pdf_path': 'Path to the Downloaded Paper'"
+                "}",
+            "The response MUST be in proper JSON format with keys and values in double quotes.",
+            "The final response MUST not include anything else other than the JSON response."
+        ],
+        markdown=True,
+        show_tool_calls=VERBOSE_LOGGING,
+        debug_mode=VERBOSE_LOGGING
+    )
@@ -0,0 +1,42 @@
+from agno.agent import Agent
+from llm_scheduler import ScheduledTogether
+from telemetry import VERBOSE_LOGGING
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# Model writing the summaries
+MODEL_ID = "meta-llama/Llama-3.3-70B-Instruct-Turbo-Free"
+# Version of the instructions below; bump it when they change so cached summaries are not reused
+PROMPT_VERSION = "1"
+
+def create_paper_summary_agent(session_id=None):
+    """Creates a paper summary agent that summarizes papers whose metadata was already fetched from arXiv."""
+    return Agent(
+        session_id=session_id,
+        name="paper-summary-agent",
+        model=ScheduledTogether(id=MODEL_ID, api_key=os.getenv("TOGETHER_API_KEY")),
+        description=
+        '''
+            You are a summarization agent that will write concise summaries of research papers
+            from their titles and abstracts.
+        ''',
+        instructions=[
+            "You will receive a JSON list of papers, each with an arxiv_id, a title, and an abstract.",
+            "Write a concise summary of each paper covering its problem, approach, and main results.",
+            "Important: Your final response must be in JSON format with the following structure:",
+                "{"
+                "    'summaries': ["
+                "        {'arxiv_id': 'arXiv ID of the Paper', 'summary': 'Summary of the Paper'},"
+                "        {...}"
+                "    ]"
+                "}",
+            "The response must include a summary for every paper, using the arxiv_id exactly as given.",
+            "The response MUST be in proper JSON format with keys and values in double quotes.",
+            "The final response MUST not include anything else other than the JSON response."
+        ],
+        markdown=True,
+        show_tool_calls=VERBOSE_LOGGING,
+        debug_mode=VERBOSE_LOGGING
+    )
@@ -0,0 +1,34 @@
+from agno.agent import Agent
+from llm_scheduler import ScheduledTogether
+from telemetry import VERBOSE_LOGGING
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+def create_review_synthesis_agent(session_id=None):
+    """Creates a review synthesis agent that writes the conclusion and references of a literature review."""
+    return Agent(
+        session_id=session_id,
+        name="review-synthesis-agent",
+        model=ScheduledTogether(id="meta-llama/Llama-3.3-70B-Instruct-Turbo-Free", api_key=os.getenv("TOGETHER_API_KEY")),
+        description=
+        '''
+            You are a review synthesis agent that will complete a literature review using the reviews of
+            individual research papers generated by the Paper Review Agent.
+        ''',
+        instructions=[
+            "Write a conclusion providing a combined summary of all the reviewed papers.",
+            "Write a references section which includes a list of citations with source links, one per paper.",
+            "Important: Your final response must be in JSON format with the following structure:",
+                "{"
+                "    'conclusion': 'Combined summary of all papers',"
+                "    'references': ['Citation with source link', ...]"
+                "}",
+            "The response MUST be in proper JSON format with keys and values in double quotes.",
+            "The final response MUST not include anything else other than the JSON response."
+        ],
+        markdown=True,
+        show_tool_calls=VERBOSE_LOGGING,
+        debug_mode=VERBOSE_LOGGING
+    )
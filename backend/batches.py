@@ -0,0 +1,114 @@
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+import threading
+import time
+import os
+
+from pipeline import generate_literature_reviews
+from telemetry import span
+from utils import normalize_topic
+
+# Number of batches processed at the same time (the topics of a batch are reviewed concurrently)
+MAX_WORKERS = int(os.getenv("BATCH_WORKERS", "2"))
+# Maximum number of topics in a batch
+MAX_BATCH_TOPICS = int(os.getenv("MAX_BATCH_TOPICS", "100"))
+# Seconds a finished batch is kept around for polling
+BATCH_RETENTION_SECONDS = int(os.getenv("BATCH_RETENTION_SECONDS", "3600"))
+
+
+class BatchManager:
+    """
+    Runs batches of literature reviews in the background and tracks the status and result of each topic.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS, retention_seconds: int = BATCH_RETENTION_SECONDS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="review-batch")
+        self.retention_seconds = retention_seconds
+        self.batches = {}
+        self.lock = threading.Lock()
+        self.papers_found = 0
+        self.papers_processed = 0
+
+    def submit(self, topics: list, max_papers: int = 5, force_refresh: bool = False, review_mode: str = "single") -> str:
+        """
+        Queues the reviews of a batch of topics. Topics repeated in the batch (ignoring case and spacing) are reviewed once.
+
+        Returns:
+            str: The id of the new batch.
+        """
+        self._prune()
+
+        unique = {}
+        for topic in topics:
+            unique.setdefault(normalize_topic(topic), topic.strip())
+        topics = list(unique.values())
+
+        batch_id = uuid4().hex
+        with self.lock:
+            self.batches[batch_id] = {
+                "id": batch_id,
+                "status": "queued",
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "papers_found": None,
+                "papers_processed": None,
+                "topics": {topic: {"status": "queued", "result": None, "error": None} for topic in topics},
+                "error": None,
+            }
+
+        self.executor.submit(self._run, batch_id, topics, max_papers, force_refresh, review_mode)
+        return batch_id
+
+    def get(self, batch_id: str):
+        """Returns a snapshot of a batch, or None if it does not exist."""
+        with self.lock:
+            batch = self.batches.get(batch_id)
+            if batch is None:
+                return None
+            return {**batch, "topics": {topic: dict(status) for topic, status in batch["topics"].items()}}
+
+    def stats(self):
+        with self.lock:
+            return {"batches": len(self.batches), "papers_found": self.papers_found, "papers_processed": self.papers_processed}
+
+    def _run(self, batch_id, topics, max_papers, force_refresh, review_mode):
+        self._update(batch_id, status="running", started_at=time.time())
+
+        try:
+            with span("batch.run", topics=len(topics)):
+                counts = generate_literature_reviews(topics, max_papers, force_refresh, review_mode,
+                                                     report=lambda topic, **fields: self._update_topic(batch_id, topic, **fields))
+        except Exception as e:
+            # Topics that were not done when the batch failed fail with it
+            with self.lock:
+                for status in self.batches[batch_id]["topics"].values():
+                    if status["status"] not in ("completed", "failed", "timed_out"):
+                        status.update(status="failed", error=str(e))
+            self._update(batch_id, status="failed", error=str(e), finished_at=time.time())
+        else:
+            with self.lock:
+                self.papers_found += counts["papers_found"]
+                self.papers_processed += counts["papers_processed"]
+            self._update(batch_id, status="completed", finished_at=time.time(), **counts)
+
+    def _update_topic(self, batch_id, topic, **fields):
+        with self.lock:
+            self.batches[batch_id]["topics"][topic].update(fields)
+
+    def _update(self, batch_id, **fields):
+        with self.lock:
+            self.batches[batch_id].update(fields)
+
+    def _prune(self):
+        """Drops finished batches older than the retention period so memory stays bounded."""
+        cutoff = time.time() - self.retention_seconds
+        with self.lock:
+            expired = [batch_id for batch_id, batch in self.batches.items()
+                       if batch["finished_at"] is not None and batch["finished_at"] < cutoff]
+            for batch_id in expired:
+                del self.batches[batch_id]
+
+
+# Shared batch manager used by the API
+batch_manager = BatchManager()
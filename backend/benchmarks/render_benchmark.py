@@ -0,0 +1,117 @@
+"""
+Benchmark of rendering a very large literature review.
+
+A synthetic review (500 papers and references by default) is rendered in each output mode, each in a fresh
+process so their peak memory can be told apart:
+
+- `pdf`: all the flowables created upfront, with the references in a single table.
+- `pdf_streaming`: flowables created as the pages are laid out, with the references in chunked tables.
+- `markdown` and `html`: the previews, written without ReportLab.
+
+Run it from the backend directory:
+
+    python -m benchmarks.render_benchmark --papers 500
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Output modes and the extension of the file they write
+MODES = {"pdf": "pdf", "pdf_streaming": "pdf", "markdown": "md", "html": "html"}
+# Words the synthetic reviews are made of
+VOCABULARY = (
+    "graph neural network transformer attention diffusion model molecule protein retrieval language "
+    "reinforcement learning policy benchmark dataset robust efficient sparse scaling optimization"
+).split()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark of rendering a very large literature review.")
+    parser.add_argument("--papers", type=int, default=500, help="Papers (and references) in the synthetic review.")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--output-dir", help="Directory of the rendered files (a temporary directory by default).")
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    return parser.parse_args(argv)
+
+
+def synthetic_review(papers, seed=0):
+    """A deterministic review of `papers` papers with a summary and review of a few sentences each."""
+    rng = random.Random(seed)
+
+    def text(sentences):
+        return " ".join(" ".join(rng.choice(VOCABULARY) for _ in range(14)).capitalize() + "." for _ in range(sentences))
+
+    return {
+        "papers": [{
+            "title": " ".join(rng.choice(VOCABULARY) for _ in range(8)).title(),
+            "authors": ", ".join(f"Author {rng.randrange(1000)}" for _ in range(rng.randint(1, 6))),
+            "publication_date": f"2024-{index % 12 + 1:02d}-{index % 28 + 1:02d}",
+            "keywords": rng.sample(["cs.LG", "cs.CL", "cs.CV", "cs.AI", "stat.ML"], 2),
+            "source_link": f"http://arxiv.org/abs/2401.{index:05d}v1",
+            "summary": text(4),
+            "review": text(6),
+        } for index in range(papers)],
+        "conclusion": text(10),
+        "references": [f"Author {index}, '{text(1)[:60]}', arXiv:2401.{index:05d}, 2024." for index in range(papers)],
+    }
+
+
+def render(mode, papers, path):
+    """Renders a synthetic review in one mode. Runs in a fresh process."""
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    from pdf_from_json import generate_pdf_from_json
+    from preview_from_json import generate_markdown_from_json, generate_html_from_json
+    from review_model import parse_review
+
+    review = parse_review(synthetic_review(papers))
+    # ru_maxrss is in KiB on Linux; the memory of the imports and the review itself is not counted
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started_at = time.perf_counter()
+
+    if mode == "pdf":
+        generate_pdf_from_json("Benchmark", review, path, streaming=False)
+    elif mode == "pdf_streaming":
+        generate_pdf_from_json("Benchmark", review, path, streaming=True)
+    elif mode == "markdown":
+        generate_markdown_from_json("Benchmark", review, path)
+    else:
+        generate_html_from_json("Benchmark", review, path)
+
+    return {
+        "seconds": time.perf_counter() - started_at,
+        "peak_rss_growth_mb": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024,
+        "output_kb": os.path.getsize(path) / 1024,
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output_dir = os.path.abspath(args.output_dir or tempfile.mkdtemp(prefix="research-copilot-render-"))
+    os.makedirs(output_dir, exist_ok=True)
+
+    results = {"config": {"papers": args.papers}, "modes": {}}
+    for mode in args.modes:
+        path = os.path.join(output_dir, f"review_{mode}.{MODES[mode]}")
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            results["modes"][mode] = executor.submit(render, mode, args.papers, path).result()
+
+    print(f"\nRendering a review of {args.papers} papers ({output_dir})")
+    for mode, result in results["modes"].items():
+        print(f"  {mode:14} {result['seconds']:8.3f}s  peak RSS +{result['peak_rss_growth_mb']:7.1f} MB  {result['output_kb']:9.0f} KB")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
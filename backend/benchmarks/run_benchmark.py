@@ -0,0 +1,363 @@
+"""
+Hermetic end-to-end benchmark of the literature review pipeline.
+
+The backend runs against a local stub LLM and a local stub arXiv server, in a temporary working
+directory, with every connection outside the loopback interface refused. Two phases are measured:
+
+1. Pipeline: `generate_literature_review` (and so `ResearchCopilot.run`) for fresh topics, one at a time,
+   timing each stage of the review plus the background PDF render.
+2. Endpoint: N concurrent clients posting reviews to `/fetch_papers/` on a local server.
+
+Run it from the backend directory:
+
+    python -m benchmarks.run_benchmark --save-baseline
+    python -m benchmarks.run_benchmark --compare
+"""
+import argparse
+import json
+import os
+import resource
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Baseline results that later runs are compared against
+BASELINE_FILE = os.path.join(BACKEND_DIR, "benchmarks", "baseline.json")
+
+# Metrics compared against the baseline, and whether higher values are better
+TRACKED_METRICS = {
+    "pipeline.total_seconds": False,
+    "pipeline.stages.searching": False,
+    "pipeline.stages.downloading": False,
+    "pipeline.stages.extracting": False,
+    "pipeline.stages.indexing": False,
+    "pipeline.stages.summarizing": False,
+    "pipeline.stages.reviewing": False,
+    "pipeline.stages.metadata": False,
+    "pipeline.stages.pdf_render": False,
+    "pipeline.download_mb_per_second": True,
+    "endpoint.throughput_per_second": True,
+    "endpoint.latency_p95_seconds": False,
+    "memory.peak_rss_mb": False,
+}
+# Changes of timings smaller than this many seconds are noise, whatever their relative size
+NOISE_SECONDS = 0.05
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Hermetic end-to-end benchmark of the literature review pipeline.")
+    parser.add_argument("--papers", type=int, default=10, help="Papers per review.")
+    parser.add_argument("--runs", type=int, default=3, help="Reviews generated one at a time in the pipeline phase.")
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent clients in the endpoint phase (0 skips it).")
+    parser.add_argument("--requests", type=int, default=2, help="Reviews requested by each client.")
+    parser.add_argument("--review-mode", choices=["single", "map_reduce"], default="map_reduce")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds each stub LLM completion takes.")
+    parser.add_argument("--llm-jitter", type=float, default=0.05, help="Random variation of the LLM latency in seconds.")
+    parser.add_argument("--corpus", type=int, default=1000, help="Papers in the stub arXiv corpus.")
+    parser.add_argument("--pdf-pages", type=int, default=8, help="Pages of each fixture paper.")
+    parser.add_argument("--pdf-image-kb", type=int, default=512, help="Incompressible image size in each fixture paper.")
+    parser.add_argument("--workdir", help="Working directory of the backend (a temporary directory by default).")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_FILE, help="Save the results as the baseline.")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_FILE, help="Compare the results with a baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Relative change reported as a regression.")
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    return parser.parse_args(argv)
+
+
+def guard_network():
+    """Refuses every connection that does not stay on this machine, so the benchmark cannot reach the internet."""
+    connect = socket.socket.connect
+
+    def loopback_only(sock, address):
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            host = address[0]
+            if not (host == "localhost" or host.startswith("127.") or host == "::1"):
+                raise ConnectionRefusedError(f"Network access is disabled in the benchmark (tried {host})")
+        return connect(sock, address)
+
+    socket.socket.connect = loopback_only
+
+
+def configure_environment(workdir, llm, arxiv):
+    """
+    Points the backend at the stubs and at a fresh working directory. Must run before the backend modules
+    are imported, since their settings and shared instances are created at import time.
+    """
+    os.environ.update({
+        "LLM_BASE_URL": llm.url,
+        "ARXIV_API_URL": arxiv.query_url_format,
+        "TOGETHER_API_KEY": "benchmark",
+        "AGNO_TELEMETRY": "false",
+        # The scheduler's provider limits would dominate the results, so they are lifted
+        "LLM_REQUESTS_PER_MINUTE": os.getenv("LLM_REQUESTS_PER_MINUTE", "100000"),
+        "LLM_TOKENS_PER_MINUTE": os.getenv("LLM_TOKENS_PER_MINUTE", "1000000000"),
+        "NO_PROXY": "127.0.0.1,localhost",
+        "no_proxy": "127.0.0.1,localhost",
+    })
+
+    # Relative paths used by the backend (stores, caches, databases) resolve inside the working directory
+    backend_dir = os.path.join(workdir, "backend")
+    os.makedirs(os.path.join(backend_dir, "workflows", "db"), exist_ok=True)
+    os.chdir(backend_dir)
+
+
+def peak_rss_mb():
+    """Peak resident memory of the benchmark process and of its finished child processes, in MiB."""
+    # ru_maxrss is in KiB on Linux
+    return {
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "children_peak_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+class StageTimer:
+    """Progress listener recording how long each stage of a review takes."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = {}
+        self.durations = {}
+
+    def __call__(self, event, data):
+        if event != "stage":
+            return
+        now = time.perf_counter()
+        with self.lock:
+            if data["status"] == "started":
+                self.started[data["name"]] = now
+            elif data["name"] in self.started:
+                duration = now - self.started.pop(data["name"])
+                self.durations[data["name"]] = self.durations.get(data["name"], 0.0) + duration
+
+
+def run_pipeline_phase(args, arxiv):
+    """Generates reviews of fresh topics one at a time and times each stage."""
+    import progress
+    from pipeline import generate_literature_review
+    from storage.review_pdfs import review_pdf_store
+
+    stages = {}
+    totals = []
+    errors = 0
+    download_seconds = 0.0
+    bytes_before = arxiv.stats()["bytes_served"]
+
+    for run in range(args.runs):
+        timer = StageTimer()
+        started_at = time.perf_counter()
+        with progress.listen(timer):
+            result = generate_literature_review(f"benchmark pipeline topic {run}", args.papers,
+                                                force_refresh=True, review_mode=args.review_mode)
+        if "error" in result:
+            errors += 1
+            print(f"  run {run + 1}: {result['error']}")
+            continue
+
+        # Rendering happens off the request path; time it until the PDF is on disk
+        render_started_at = time.perf_counter()
+        review_pdf_store.wait(result["review_id"])
+        timer.durations["pdf_render"] = time.perf_counter() - render_started_at
+        totals.append(time.perf_counter() - started_at)
+
+        for name, duration in timer.durations.items():
+            stages.setdefault(name, []).append(duration)
+        download_seconds += timer.durations.get("downloading", 0.0)
+        print(f"  run {run + 1}/{args.runs}: {totals[-1]:.2f}s")
+
+    downloaded = arxiv.stats()["bytes_served"] - bytes_before
+    return {
+        "runs": args.runs,
+        "errors": errors,
+        "total_seconds": statistics.mean(totals) if totals else 0.0,
+        "stages": {name: statistics.mean(durations) for name, durations in stages.items()},
+        "downloaded_mb": downloaded / 1024 ** 2,
+        "download_mb_per_second": downloaded / 1024 ** 2 / download_seconds if download_seconds else 0.0,
+    }
+
+
+def run_endpoint_phase(args):
+    """Serves the API locally and measures the throughput of concurrent clients requesting reviews."""
+    import requests
+    import uvicorn
+    from main import app
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="benchmark-api", daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    def client(number):
+        latencies, errors = [], 0
+        with requests.Session() as session:
+            for request in range(args.requests):
+                started_at = time.perf_counter()
+                response = session.post(f"http://127.0.0.1:{port}/fetch_papers/", json={
+                    "topic": f"benchmark client {number} topic {request}",
+                    "max_papers": args.papers,
+                    "force_refresh": True,
+                    "review_mode": args.review_mode,
+                })
+                latencies.append(time.perf_counter() - started_at)
+                if response.status_code != 200 or "error" in response.json():
+                    errors += 1
+        return latencies, errors
+
+    started_at = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.clients) as executor:
+            results = list(executor.map(client, range(args.clients)))
+    finally:
+        elapsed = time.perf_counter() - started_at
+        server.should_exit = True
+        thread.join()
+
+    latencies = [latency for client_latencies, _ in results for latency in client_latencies]
+    return {
+        "clients": args.clients,
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in results),
+        "seconds": elapsed,
+        "throughput_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_p50_seconds": percentile(latencies, 0.5),
+        "latency_p95_seconds": percentile(latencies, 0.95),
+    }
+
+
+def lookup(results, path):
+    for key in path.split("."):
+        if not isinstance(results, dict) or key not in results:
+            return None
+        results = results[key]
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares results with a baseline.
+
+    Returns:
+        list: (metric, baseline value, value, relative change) of each metric that got worse by more than `tolerance`.
+    """
+    if baseline.get("config") != results.get("config"):
+        print("Warning: the baseline was recorded with different settings")
+
+    regressions = []
+    for metric, higher_is_better in TRACKED_METRICS.items():
+        before, after = lookup(baseline, metric), lookup(results, metric)
+        if not before or after is None:
+            continue
+        change = (after - before) / before
+        worse = -change if higher_is_better else change
+        if (metric.startswith("pipeline.stages.") or metric.endswith("seconds")) and abs(after - before) < NOISE_SECONDS:
+            worse = 0.0
+        marker = "REGRESSION" if worse > tolerance else ""
+        print(f"  {metric:40} {before:10.3f} -> {after:10.3f}  {change:+7.1%}  {marker}")
+        if worse > tolerance:
+            regressions.append((metric, before, after, change))
+    return regressions
+
+
+def print_report(results):
+    pipeline = results["pipeline"]
+    print(f"\nPipeline ({pipeline['runs']} reviews of {results['config']['papers']} papers, {pipeline['errors']} errors)")
+    for name, seconds in pipeline["stages"].items():
+        print(f"  {name:20} {seconds:8.3f}s")
+    print(f"  {'total':20} {pipeline['total_seconds']:8.3f}s")
+    print(f"  download             {pipeline['download_mb_per_second']:8.1f} MB/s ({pipeline['downloaded_mb']:.1f} MB)")
+
+    if results.get("endpoint"):
+        endpoint = results["endpoint"]
+        print(f"\nEndpoint ({endpoint['clients']} clients, {endpoint['requests']} reviews, {endpoint['errors']} errors)")
+        print(f"  throughput           {endpoint['throughput_per_second']:8.3f} reviews/s")
+        print(f"  latency p50 / p95    {endpoint['latency_p50_seconds']:8.2f}s / {endpoint['latency_p95_seconds']:.2f}s")
+
+    llm = results["llm"]
+    print(f"\nLLM: {llm['requests']} calls {llm['by_agent']}, {llm['average_latency_seconds']:.3f}s on average")
+    memory = results["memory"]
+    print(f"Memory: peak RSS {memory['peak_rss_mb']:.0f} MB (render processes {memory['children_peak_rss_mb']:.0f} MB)")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="research-copilot-benchmark-"))
+    baseline_path = os.path.abspath(args.save_baseline or args.compare) if (args.save_baseline or args.compare) else None
+
+    guard_network()
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    from benchmarks.stub_arxiv import StubArxiv
+    from benchmarks.stub_llm import StubLLM
+
+    llm = StubLLM(latency=args.llm_latency, jitter=args.llm_jitter).start()
+    arxiv = StubArxiv(os.path.join(workdir, "fixtures"), corpus_size=args.corpus,
+                      pdf_pages=args.pdf_pages, pdf_image_kb=args.pdf_image_kb).start()
+    configure_environment(workdir, llm, arxiv)
+    print(f"Working directory: {workdir}")
+
+    print("Rendering fixture papers...")
+    arxiv.prepare([f"benchmark pipeline topic {run}" for run in range(args.runs)]
+                  + [f"benchmark client {number} topic {request}"
+                     for number in range(args.clients) for request in range(args.requests)], args.papers)
+
+    try:
+        print("Pipeline phase...")
+        results = {
+            "config": {key: value for key, value in vars(args).items()
+                       if key not in ("workdir", "save_baseline", "compare", "tolerance", "output")},
+            "pipeline": run_pipeline_phase(args, arxiv),
+        }
+        if args.clients > 0:
+            print("Endpoint phase...")
+            results["endpoint"] = run_endpoint_phase(args)
+    finally:
+        # Collect the render processes so their memory is counted
+        from storage.review_pdfs import review_pdf_store
+        if review_pdf_store.executor is not None:
+            review_pdf_store.executor.shutdown()
+        llm_stats = llm.stats()
+        llm.stop()
+        arxiv.stop()
+
+    results["llm"] = llm_stats
+    results["memory"] = peak_rss_mb()
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(baseline_path) as file:
+            baseline = json.load(file)
+        print(f"\nCompared with {baseline_path}:")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} metrics regressed by more than {args.tolerance:.0%}")
+            return 1
+
+    if args.save_baseline:
+        with open(baseline_path, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"\nBaseline saved to {baseline_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
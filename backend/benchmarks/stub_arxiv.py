@@ -0,0 +1,260 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+import argparse
+import hashlib
+import io
+import os
+import random
+import re
+import threading
+
+# Words the fixture titles, abstracts and papers are made of
+VOCABULARY = (
+    "graph neural network transformer attention diffusion model molecule protein retrieval language "
+    "reinforcement learning policy benchmark dataset robust efficient sparse scaling optimization "
+    "generalization contrastive representation inference training evaluation multimodal vision"
+).split()
+# Sections of the fixture papers, so text extraction finds the methods and results
+SECTIONS = ["Introduction", "Related Work", "Method", "Experiments", "Results", "Conclusion"]
+# Date range clause of a query, as sent by incremental refreshes
+SUBMITTED_DATE = re.compile(r"\s*AND\s+submittedDate:\[(\d{12}) TO (\d{12})\]")
+
+
+def paper_id(index):
+    """arXiv id of the `index`-th paper of the fixture corpus."""
+    return f"24{index // 99999 % 12 + 1:02d}.{index % 99999 + 1:05d}"
+
+
+def sentence(rng, words=12):
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words)).capitalize() + "."
+
+
+def fixture_paper(index):
+    """Deterministic metadata of the `index`-th paper of the corpus."""
+    rng = random.Random(index)
+    return {
+        "arxiv_id": paper_id(index),
+        "title": " ".join(rng.choice(VOCABULARY) for _ in range(6)).title(),
+        "authors": [f"Author {rng.randrange(1000)}" for _ in range(rng.randint(1, 5))],
+        "abstract": " ".join(sentence(rng) for _ in range(6)),
+        "published": f"20{24 + index % 2}-{index % 12 + 1:02d}-{index % 28 + 1:02d}T00:00:00Z",
+        "categories": rng.sample(["cs.LG", "cs.CL", "cs.CV", "cs.AI", "stat.ML", "q-bio.BM"], 2),
+    }
+
+
+def render_fixture_pdf(index, pages, image_kb):
+    """
+    Renders the PDF of a fixture paper: pages of text under the usual section headings, plus a noise
+    image of about `image_kb` KiB that does not compress, so downloads move realistic amounts of data.
+    """
+    from PIL import Image
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+
+    paper = fixture_paper(index)
+    rng = random.Random(index)
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter, invariant=1)  # Invariant output: same bytes on every run
+
+    for page in range(pages):
+        y = 740
+        if page == 0:
+            pdf.setFont("Helvetica-Bold", 14)
+            pdf.drawString(72, y, paper["title"])
+            y -= 30
+        pdf.setFont("Helvetica-Bold", 12)
+        pdf.drawString(72, y, f"{page % len(SECTIONS) + 1} {SECTIONS[page % len(SECTIONS)]}")
+        y -= 20
+        pdf.setFont("Helvetica", 10)
+        while y > 72:
+            pdf.drawString(72, y, sentence(rng, 14))
+            y -= 14
+        if page == 0 and image_kb:
+            side = max(1, int((image_kb * 1024 / 3) ** 0.5))
+            image = Image.frombytes("RGB", (side, side), rng.randbytes(side * side * 3))
+            pdf.drawImage(ImageReader(image), 72, 72, width=200, height=200)
+        pdf.showPage()
+
+    pdf.save()
+    return buffer.getvalue()
+
+
+class StubArxiv:
+    """
+    Local stand-in for the arXiv API and PDF server, serving a deterministic corpus of fixture papers.
+    Searches rank the whole corpus by a hash of the query and paper, so a topic always returns the
+    same papers and different topics share some of them. PDFs are rendered on first request and
+    kept on disk under `fixture_dir`.
+    """
+
+    def __init__(self, fixture_dir, corpus_size=1000, pdf_pages=8, pdf_image_kb=512, host="127.0.0.1", port=0):
+        self.fixture_dir = fixture_dir
+        self.corpus_size = corpus_size
+        self.pdf_pages = pdf_pages
+        self.pdf_image_kb = pdf_image_kb
+        self.lock = threading.Lock()
+        self.render_locks = {}
+        self.searches = 0
+        self.pdf_requests = 0
+        self.bytes_served = 0
+
+        os.makedirs(fixture_dir, exist_ok=True)
+        self.ids = {paper_id(index): index for index in range(corpus_size)}
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def query_url_format(self):
+        """Value of ARXIV_API_URL pointing at this server."""
+        return self.url + "/api/query?{}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="stub-arxiv", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stats(self):
+        with self.lock:
+            return {"searches": self.searches, "pdf_requests": self.pdf_requests, "bytes_served": self.bytes_served}
+
+    def search(self, query, start, max_results):
+        """
+        Indexes of the corpus papers on a page of the results of a query. A `submittedDate:[from TO to]`
+        clause keeps the papers published in that range, ranked as for the query without it.
+        """
+        return self.matches(query)[start:start + max_results]
+
+    def matches(self, query):
+        """Indexes of all the corpus papers matching a query, in the order they are ranked."""
+        papers = range(self.corpus_size)
+        date_range = SUBMITTED_DATE.search(query)
+        if date_range:
+            query = SUBMITTED_DATE.sub("", query).strip()
+            if query.startswith("(") and query.endswith(")"):
+                query = query[1:-1]
+            published = lambda index: fixture_paper(index)["published"][:10].replace("-", "")
+            papers = [index for index in papers
+                      if date_range.group(1)[:8] <= published(index) <= date_range.group(2)[:8]]
+        return sorted(papers, key=lambda index: hashlib.sha1(f"{query}\0{index}".encode("utf-8")).digest())
+
+    def pdf_path(self, index):
+        """Path of the PDF of a fixture paper, rendering it if needed."""
+        path = os.path.join(self.fixture_dir, f"{paper_id(index)}.pdf")
+        with self.lock:
+            lock = self.render_locks.setdefault(index, threading.Lock())
+        with lock:
+            if not os.path.exists(path):
+                with open(path + ".part", "wb") as file:
+                    file.write(render_fixture_pdf(index, self.pdf_pages, self.pdf_image_kb))
+                os.replace(path + ".part", path)
+        return path
+
+    def prepare(self, queries, max_results):
+        """Renders the PDFs of the results of some queries ahead of time, so rendering is not timed as download."""
+        for query in queries:
+            for index in self.search(query, 0, max_results):
+                self.pdf_path(index)
+
+    def feed(self, indexes, total):
+        """Atom feed of the given papers, in the format of the arXiv API."""
+        entries = []
+        for index in indexes:
+            paper = fixture_paper(index)
+            authors = "".join(f"<author><name>{escape(name)}</name></author>" for name in paper["authors"])
+            categories = "".join(f'<category term="{category}"/>' for category in paper["categories"])
+            entries.append(
+                f"<entry><id>http://arxiv.org/abs/{paper['arxiv_id']}v1</id>"
+                f"<updated>{paper['published']}</updated><published>{paper['published']}</published>"
+                f"<title>{escape(paper['title'])}</title><summary>{escape(paper['abstract'])}</summary>{authors}"
+                f'<arxiv:primary_category term="{paper["categories"][0]}"/>{categories}'
+                f'<link href="http://arxiv.org/abs/{paper["arxiv_id"]}v1" rel="alternate" type="text/html"/>'
+                f'<link title="pdf" href="{self.url}/pdf/{paper["arxiv_id"]}v1" rel="related" type="application/pdf"/>'
+                f"</entry>"
+            )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom" '
+            'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+            f"<opensearch:totalResults>{total}</opensearch:totalResults>"
+            f"<opensearch:itemsPerPage>{len(entries)}</opensearch:itemsPerPage>"
+            + "".join(entries) + "</feed>"
+        ).encode("utf-8")
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/api/query":
+                    self.send_feed(parse_qs(url.query))
+                elif url.path.startswith("/pdf/"):
+                    self.send_pdf(url.path[len("/pdf/"):].removesuffix(".pdf"))
+                else:
+                    self.send_error(404)
+
+            def send_feed(self, args):
+                start = int(args.get("start", ["0"])[0])
+                max_results = int(args.get("max_results", ["10"])[0])
+                id_list = [item for item in args.get("id_list", [""])[0].split(",") if item]
+                if id_list:
+                    indexes = [stub.ids[item.split("v")[0]] for item in id_list if item.split("v")[0] in stub.ids]
+                    total = len(indexes)
+                else:
+                    matches = stub.matches(args.get("search_query", [""])[0])
+                    indexes = matches[start:start + max_results]
+                    total = len(matches)
+                with stub.lock:
+                    stub.searches += 1
+                self.send_body(stub.feed(indexes, total), "application/atom+xml")
+
+            def send_pdf(self, name):
+                index = stub.ids.get(name.rpartition("v")[0] or name)
+                if index is None:
+                    self.send_error(404)
+                    return
+                with open(stub.pdf_path(index), "rb") as file:
+                    body = file.read()
+                with stub.lock:
+                    stub.pdf_requests += 1
+                    stub.bytes_served += len(body)
+                self.send_body(body, "application/pdf")
+
+            def send_body(self, body, content_type):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+if __name__ == "__main__":
+    # Serve the fixture corpus on its own, e.g. for running the backend against it by hand
+    parser = argparse.ArgumentParser(description="Local stand-in for the arXiv API and PDF server.")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--fixture-dir", default="benchmark_fixtures")
+    parser.add_argument("--corpus", type=int, default=1000, help="Number of papers in the corpus.")
+    parser.add_argument("--pdf-pages", type=int, default=8)
+    parser.add_argument("--pdf-image-kb", type=int, default=512, help="Size of the incompressible image in each PDF.")
+    args = parser.parse_args()
+
+    stub = StubArxiv(args.fixture_dir, args.corpus, args.pdf_pages, args.pdf_image_kb, port=args.port)
+    print(f"Serving {args.corpus} papers; set ARXIV_API_URL={stub.query_url_format}")
+    stub.server.serve_forever()
@@ -0,0 +1,203 @@
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+
+from benchmarks.stub_arxiv import VOCABULARY, sentence
+
+
+def parse_prompt(content):
+    """The JSON the workflow sends as the user message, or None for free-form prompts."""
+    try:
+        return json.loads(content)
+    except (TypeError, ValueError):
+        return None
+
+
+class StubLLM:
+    """
+    Local OpenAI-compatible chat completions server standing in for the LLM provider.
+    It recognizes the agents of the workflow by their instructions and answers each with JSON of the
+    expected shape. Answers and latencies are derived from a hash of the request, so runs are repeatable.
+    Like the provider, it can reject requests with HTTP 429: every `rate_limit_every`-th request, and every
+    request above `requests_per_minute` in the last minute. Rejections carry a Retry-After header of
+    `retry_after` seconds, unless it is None.
+    """
+
+    def __init__(self, latency=0.2, jitter=0.1, review_words=120, rate_limit_every=0, requests_per_minute=None,
+                 retry_after=1.0, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.review_words = review_words
+        self.rate_limit_every = rate_limit_every
+        self.requests_per_minute = requests_per_minute
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.received = 0
+        self.accepted = deque()  # Times of the requests accepted in the last minute
+        self.rate_limited = 0
+        self.requests = 0
+        self.busy_seconds = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.by_agent = {}
+
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        """Value of LLM_BASE_URL pointing at this server."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="stub-llm", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "rate_limited": self.rate_limited,
+                "by_agent": dict(self.by_agent),
+                "average_latency_seconds": self.busy_seconds / self.requests if self.requests else 0.0,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+            }
+
+    def complete(self, messages):
+        """
+        Answers a chat completion request.
+
+        Returns:
+            tuple: (agent, content) where agent names the workflow agent the request came from.
+        """
+        system = " ".join(str(message.get("content") or "") for message in messages if message["role"] in ("system", "developer"))
+        user = next((str(message.get("content") or "") for message in reversed(messages) if message["role"] == "user"), "")
+        prompt = parse_prompt(user)
+        rng = random.Random(hashlib.sha1(user.encode("utf-8")).digest())
+
+        def text(words):
+            return " ".join(sentence(rng, 12) for _ in range(max(1, words // 12)))
+
+        if "summarization agent that will write concise summaries" in system and isinstance(prompt, list):
+            return "paper-summary", {"summaries": [{"arxiv_id": paper["arxiv_id"], "summary": text(60)} for paper in prompt]}
+        if "paper review agent" in system and isinstance(prompt, dict):
+            return "paper-review", {"title": prompt.get("title", ""), "review": text(self.review_words)}
+        if "review synthesis agent" in system and isinstance(prompt, list):
+            return "review-synthesis", {
+                "conclusion": text(self.review_words),
+                "references": [f"{paper.get('authors', '')}. {paper.get('title', '')}. {paper.get('source_link', '')}" for paper in prompt],
+            }
+        if "review generation agent" in system and isinstance(prompt, list):
+            papers = [{**paper, "review": text(self.review_words)} for paper in prompt]
+            return "review-generation", {
+                "papers": papers,
+                "conclusion": text(self.review_words),
+                "references": [f"{paper.get('authors', '')}. {paper.get('title', '')}. {paper.get('source_link', '')}" for paper in papers],
+            }
+        return "other", {"answer": " ".join(rng.choice(VOCABULARY) for _ in range(20))}
+
+    def admit(self):
+        """Counts a request and decides whether it is rate-limited."""
+        now = time.monotonic()
+        with self.lock:
+            self.received += 1
+            while self.accepted and self.accepted[0] <= now - 60:
+                self.accepted.popleft()
+            limited = ((self.rate_limit_every and self.received % self.rate_limit_every == 0)
+                       or (self.requests_per_minute is not None and len(self.accepted) >= self.requests_per_minute))
+            if limited:
+                self.rate_limited += 1
+            else:
+                self.accepted.append(now)
+            return not limited
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                if not self.path.endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+
+                started_at = time.monotonic()
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if not stub.admit():
+                    self.send_rate_limited()
+                    return
+                agent, answer = stub.complete(request["messages"])
+                content = json.dumps(answer)
+
+                # Latency is deterministic per request: the same prompt always takes the same time
+                seed = hashlib.sha1(json.dumps(request["messages"], sort_keys=True).encode("utf-8")).digest()
+                time.sleep(max(0.0, stub.latency + random.Random(seed).uniform(-stub.jitter, stub.jitter)))
+
+                prompt_tokens = sum(len(str(message.get("content") or "")) for message in request["messages"]) // 4
+                completion_tokens = len(content) // 4
+                body = json.dumps({
+                    "id": "stub-" + seed.hex()[:16],
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "stub"),
+                    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens},
+                }).encode("utf-8")
+
+                with stub.lock:
+                    stub.requests += 1
+                    stub.by_agent[agent] = stub.by_agent.get(agent, 0) + 1
+                    stub.busy_seconds += time.monotonic() - started_at
+                    stub.prompt_tokens += prompt_tokens
+                    stub.completion_tokens += completion_tokens
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def send_rate_limited(self):
+                body = json.dumps({"error": {"message": "Rate limit exceeded", "type": "rate_limit_error"}}).encode("utf-8")
+                self.send_response(429)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if stub.retry_after is not None:
+                    self.send_header("Retry-After", f"{stub.retry_after:g}")
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+if __name__ == "__main__":
+    # Serve the stub on its own, e.g. for running the backend against it by hand
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stand-in for the LLM provider.")
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds each completion takes.")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Random variation of the latency in seconds.")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer every Nth request with HTTP 429.")
+    parser.add_argument("--requests-per-minute", type=int, help="Answer requests above this rate with HTTP 429.")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of the 429 responses in seconds.")
+    args = parser.parse_args()
+
+    stub = StubLLM(args.latency, args.jitter, rate_limit_every=args.rate_limit_every,
+                   requests_per_minute=args.requests_per_minute, retry_after=args.retry_after, port=args.port)
+    print(f"Serving completions; set LLM_BASE_URL={stub.url}")
+    stub.server.serve_forever()
@@ -0,0 +1,46 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import time
+
+# Monotonic time by which the work running in this context must finish, if any
+_deadline = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when work runs past the deadline of its stage or request."""
+
+
+@contextmanager
+def deadline(seconds: float, name: str = None):
+    """
+    Limits the work inside the `with` block to `seconds`. Nested deadlines can only shorten the current one.
+    Like progress listeners, deadlines reach worker threads started with `progress.bind`.
+
+    Args:
+        seconds (float): Time allowed for the block, or None/0 for no limit.
+        name (str): Name of the stage or request, used in the error message.
+    """
+    current = _deadline.get()
+    if seconds:
+        limit = time.monotonic() + seconds
+        if current is None or limit < current[0]:
+            current = (limit, name)
+
+    token = _deadline.set(current)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """Seconds left before the current deadline, or None if there is no deadline."""
+    current = _deadline.get()
+    return None if current is None else current[0] - time.monotonic()
+
+
+def check():
+    """Raises DeadlineExceeded if the current deadline has passed."""
+    current = _deadline.get()
+    if current is not None and time.monotonic() >= current[0]:
+        raise DeadlineExceeded(f"Deadline of the {current[1] or 'request'} exceeded")
@@ -0,0 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+import threading
+import time
+import os
+
+import progress
+
+# Number of literature reviews processed at the same time
+MAX_WORKERS = int(os.getenv("JOB_WORKERS", "8"))
+# Seconds a finished job is kept around for polling
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+
+
+class JobManager:
+    """
+    Runs blocking work on a bounded worker pool and tracks its status, per-stage progress and result.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS, retention_seconds: int = JOB_RETENTION_SECONDS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="review-job")
+        self.retention_seconds = retention_seconds
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs) -> str:
+        """
+        Queues a function on the worker pool.
+
+        Returns:
+            str: The id of the new job.
+        """
+        self._prune()
+
+        job_id = uuid4().hex
+        with self.lock:
+            self.jobs[job_id] = {
+                "id": job_id,
+                "status": "queued",
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "stages": {},
+                "papers_reviewed": 0,
+                "papers": [],  # Papers reviewed so far, shown while the review is running
+                "result": None,
+                "error": None,
+            }
+
+        self.executor.submit(self._run, job_id, fn, *args, **kwargs)
+        return job_id
+
+    def get(self, job_id: str):
+        """Returns a snapshot of a job, or None if it does not exist."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            return {**job, "stages": {name: dict(stage) for name, stage in job["stages"].items()}, "papers": list(job["papers"])}
+
+    def _run(self, job_id, fn, *args, **kwargs):
+        self._update(job_id, status="running", started_at=time.time())
+
+        try:
+            with progress.listen(lambda event, data: self._on_progress(job_id, event, data)):
+                result = fn(*args, **kwargs)
+        except Exception as e:
+            self._update(job_id, status="failed", error=str(e), finished_at=time.time())
+        else:
+            self._update(job_id, status="completed", result=result, finished_at=time.time())
+
+    def _on_progress(self, job_id, event, data):
+        if event == "paper":
+            with self.lock:
+                self.jobs[job_id]["papers_reviewed"] += 1
+                self.jobs[job_id]["papers"].append(data["paper"])
+            return
+        if event != "stage":
+            return
+
+        with self.lock:
+            stages = self.jobs[job_id]["stages"]
+            stage = stages.setdefault(data["name"], {"status": None, "started_at": None, "finished_at": None})
+            stage["status"] = data["status"]
+            if data["status"] == "started":
+                stage["started_at"] = time.time()
+            else:
+                stage["finished_at"] = time.time()
+
+    def _update(self, job_id, **fields):
+        with self.lock:
+            self.jobs[job_id].update(fields)
+
+    def _prune(self):
+        """Drops finished jobs older than the retention period so memory stays bounded."""
+        cutoff = time.time() - self.retention_seconds
+        with self.lock:
+            expired = [job_id for job_id, job in self.jobs.items()
+                       if job["finished_at"] is not None and job["finished_at"] < cutoff]
+            for job_id in expired:
+                del self.jobs[job_id]
+
+
+# Shared job manager used by the API
+job_manager = JobManager()
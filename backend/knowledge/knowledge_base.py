@@ -0,0 +1,47 @@
+import json
+import os
+
+from knowledge.paper_index import PaperIndex
+from storage.pdf_store import paper_key
+from tools.paper_download_tool import get_pdf_url
+from tools.pdf_text_extractor import read_pages
+from telemetry import traced
+
+# Directory of the local retrieval index over the downloaded papers
+KNOWLEDGE_INDEX_DIR = os.getenv("KNOWLEDGE_INDEX_DIR", "knowledge/index")
+
+
+def index_papers(papers):
+    """
+    Adds the full text of extracted papers to the knowledge base. Papers already indexed are skipped.
+
+    Args:
+        papers (list): Paper records with `pdf_url`, `title`, `source_link` and `text_path`.
+
+    Returns:
+        int: Number of chunks added.
+    """
+    return pdf_knowledge_base.add_papers(
+        (paper_key(get_pdf_url(paper["pdf_url"])), paper.get("title", ""), read_pages(paper["text_path"]),
+         {"source_link": paper.get("source_link", "")})
+        for paper in papers if paper.get("text_path")
+    )
+
+
+@traced("tool.search_papers")
+def search_papers(query: str, top_k: int = 5) -> str:
+    """
+    Searches the full text of the downloaded papers for passages relevant to a question.
+
+    Args:
+        query (str): Search query.
+        top_k (int): Number of passages to return.
+
+    Returns:
+        str: JSON list of passages with the title, page and source link of their paper.
+    """
+    return json.dumps(pdf_knowledge_base.search(query, top_k=top_k))
+
+
+# Knowledge base of all downloaded papers, used by the chat agent
+pdf_knowledge_base = PaperIndex(KNOWLEDGE_INDEX_DIR)
@@ -0,0 +1,297 @@
+from collections import Counter
+import json
+import math
+import os
+import pickle
+import re
+import threading
+
+import numpy as np
+
+# Number of words per chunk, and number of words shared by consecutive chunks
+CHUNK_WORDS = 200
+CHUNK_OVERLAP = 40
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+# Seconds between snapshots of the index; papers added in between share one snapshot
+SNAPSHOT_INTERVAL = float(os.getenv("KNOWLEDGE_SNAPSHOT_INTERVAL", "30"))
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on",
+    "or", "that", "the", "this", "to", "was", "we", "were", "with", "which", "our", "can", "also",
+}
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 1 and token not in STOPWORDS]
+
+
+def chunk_pages(pages, chunk_words=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    """
+    Splits the pages of a paper into overlapping chunks of words.
+
+    Yields:
+        tuple: (page number of the chunk start, chunk text).
+    """
+    window = []  # (page, word) pairs not yet emitted
+    for page_number, page in enumerate(pages, 1):
+        window.extend((page_number, word) for word in page.split())
+        while len(window) >= chunk_words:
+            yield window[0][0], " ".join(word for _, word in window[:chunk_words])
+            window = window[chunk_words - overlap:]
+
+    if window:
+        yield window[0][0], " ".join(word for _, word in window)
+
+
+class PaperIndex:
+    """
+    Local retrieval index over the full text of downloaded papers.
+
+    Chunks are appended to a JSON Lines file and indexed in a BM25 inverted index kept in memory.
+    Optionally, chunk embeddings computed by `embedder` are appended to a float32 matrix that is
+    memory-mapped for queries. New papers are added incrementally, without rebuilding the index.
+
+    Writers (adding papers, saving snapshots) are serialized by `write_lock`, while `lock` is only held
+    to update or read the in-memory index, so searches never wait for a snapshot to be written.
+    """
+
+    def __init__(self, index_dir, embedder=None, snapshot_interval=SNAPSHOT_INTERVAL):
+        """
+        Args:
+            index_dir (str): Directory holding the index files.
+            embedder (callable): Optional function mapping a list of texts to an array of
+                                 L2-normalized embeddings of shape (len(texts), dim).
+            snapshot_interval (float): Seconds between snapshots of the index (0 to save after every batch).
+        """
+        self.index_dir = index_dir
+        self.embedder = embedder
+        self.chunks_path = os.path.join(index_dir, "chunks.jsonl")
+        self.snapshot_path = os.path.join(index_dir, "postings.pkl")
+        self.embeddings_path = os.path.join(index_dir, "embeddings.f32")
+        self.snapshot_interval = snapshot_interval
+        self.lock = threading.RLock()
+        self.write_lock = threading.RLock()
+        self.snapshot_timer = None
+
+        self.papers = set()  # Keys of the indexed papers
+        self.offsets = []  # Byte offset of each chunk in the chunks file
+        self.lengths = []  # Number of tokens of each chunk
+        self.postings = {}  # term -> ([chunk ids], [term frequencies])
+        self.arrays = {}  # term -> (chunk ids, term frequencies) as NumPy arrays, built on demand
+        self.length_array = None  # self.lengths as a NumPy array, built on demand
+        self.total_length = 0
+        self.embedding_dim = None
+
+        os.makedirs(index_dir, exist_ok=True)
+        self._load()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def add_paper(self, key, title, pages, metadata=None):
+        """
+        Adds a paper to the index unless it is already indexed.
+
+        Args:
+            key (str): Unique key of the paper (e.g., arXiv id and version).
+            title (str): Title of the paper.
+            pages (iterable): Text of each page of the paper.
+            metadata (dict): Extra fields returned with the search results (e.g., source link).
+
+        Returns:
+            int: Number of chunks added.
+        """
+        with self.write_lock:
+            if key in self.papers:
+                return 0
+
+            chunks = [{"paper": key, "title": title, "page": page, "text": text, **(metadata or {})}
+                      for page, text in chunk_pages(pages)]
+
+            offsets = []
+            with open(self.chunks_path, "ab") as file:
+                for chunk in chunks:
+                    offsets.append(file.tell())
+                    file.write((json.dumps(chunk) + "\n").encode("utf-8"))
+
+            if self.embedder is not None and chunks:
+                self._append_embeddings([chunk["text"] for chunk in chunks])
+
+            # Searches only see the paper once it is fully written
+            with self.lock:
+                for offset, chunk in zip(offsets, chunks):
+                    self.offsets.append(offset)
+                    self._index_chunk(len(self.offsets) - 1, chunk["text"])
+                self.papers.add(key)
+            return len(chunks)
+
+    def add_papers(self, papers):
+        """
+        Adds a batch of papers and schedules a snapshot of the index.
+
+        Args:
+            papers (iterable): (key, title, pages, metadata) tuples.
+
+        Returns:
+            int: Number of chunks added.
+        """
+        with self.write_lock:
+            added = sum(self.add_paper(key, title, pages, metadata) for key, title, pages, metadata in papers)
+        if added:
+            self.schedule_save()
+        return added
+
+    def schedule_save(self):
+        """Saves a snapshot once `snapshot_interval` seconds have passed, unless one is already scheduled."""
+        if self.snapshot_interval <= 0:
+            self.save()
+            return
+
+        with self.write_lock:
+            if self.snapshot_timer is None:
+                self.snapshot_timer = threading.Timer(self.snapshot_interval, self._save_scheduled)
+                self.snapshot_timer.daemon = True
+                self.snapshot_timer.start()
+
+    def save(self):
+        """
+        Saves the in-memory index so it does not have to be rebuilt from the chunks on startup.
+        Chunks added after the last snapshot are re-indexed when the index is loaded.
+        Only papers being added wait for the snapshot; searches go on while it is written.
+        """
+        with self.write_lock:
+            state = {
+                "papers": self.papers,
+                "offsets": self.offsets,
+                "lengths": self.lengths,
+                "postings": self.postings,
+                "total_length": self.total_length,
+                "embedding_dim": self.embedding_dim,
+            }
+            tmp_path = self.snapshot_path + ".tmp"
+            with open(tmp_path, "wb") as file:
+                pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.snapshot_path)
+
+    def search(self, query, top_k=5, dense_weight=0.0):
+        """
+        Returns the chunks most relevant to a query.
+
+        Args:
+            query (str): Search query.
+            top_k (int): Number of chunks to return.
+            dense_weight (float): Weight of the embedding similarity in the score, between 0 (BM25 only)
+                                  and 1 (embeddings only). Requires an embedder.
+
+        Returns:
+            list: Chunks (paper, title, page, text, ...) with their score, best first.
+        """
+        with self.lock:
+            count = len(self.offsets)
+            if count == 0:
+                return []
+
+            scores = np.zeros(count, dtype=np.float32)
+            if dense_weight < 1:
+                scores += (1 - dense_weight) * normalize(self._bm25_scores(query, count))
+            if dense_weight > 0 and self.has_embeddings():
+                scores += dense_weight * normalize(self._dense_scores(query, count))
+
+            top_k = min(top_k, count)
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+            best = best[np.argsort(-scores[best])]
+            return [{**self._read_chunk(i), "score": float(scores[i])} for i in best if scores[i] > 0]
+
+    def _save_scheduled(self):
+        with self.write_lock:
+            self.snapshot_timer = None
+            self.save()
+
+    def has_embeddings(self):
+        """Whether every chunk has an embedding that can be searched."""
+        if self.embedder is None or not self.embedding_dim or not os.path.exists(self.embeddings_path):
+            return False
+        return os.path.getsize(self.embeddings_path) == len(self.offsets) * self.embedding_dim * 4
+
+    def _bm25_scores(self, query, count):
+        scores = np.zeros(count, dtype=np.float32)
+        if self.length_array is None or len(self.length_array) != count:
+            self.length_array = np.asarray(self.lengths, dtype=np.float32)
+        lengths = self.length_array
+        average_length = self.total_length / count
+
+        for term in set(tokenize(query)):
+            if term not in self.postings:
+                continue
+            ids, frequencies = self._term_arrays(term)
+            idf = math.log(1 + (count - len(ids) + 0.5) / (len(ids) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[ids] / average_length)
+            scores[ids] += idf * frequencies * (BM25_K1 + 1) / (frequencies + norm)
+
+        return scores
+
+    def _dense_scores(self, query, count):
+        query_embedding = np.asarray(self.embedder([query]), dtype=np.float32)[0]
+        embeddings = np.memmap(self.embeddings_path, dtype=np.float32, mode="r", shape=(count, self.embedding_dim))
+        return embeddings @ query_embedding
+
+    def _term_arrays(self, term):
+        if term not in self.arrays:
+            ids, frequencies = self.postings[term]
+            self.arrays[term] = (np.asarray(ids, dtype=np.int64), np.asarray(frequencies, dtype=np.float32))
+        return self.arrays[term]
+
+    def _index_chunk(self, chunk_id, text):
+        tokens = tokenize(text)
+        for term, frequency in Counter(tokens).items():
+            ids, frequencies = self.postings.setdefault(term, ([], []))
+            ids.append(chunk_id)
+            frequencies.append(frequency)
+            self.arrays.pop(term, None)
+        self.lengths.append(len(tokens))
+        self.total_length += len(tokens)
+
+    def _append_embeddings(self, texts):
+        embeddings = np.asarray(self.embedder(texts), dtype=np.float32)
+        self.embedding_dim = embeddings.shape[1]
+        with open(self.embeddings_path, "ab") as file:
+            file.write(embeddings.tobytes())
+
+    def _read_chunk(self, chunk_id):
+        with open(self.chunks_path, "rb") as file:
+            file.seek(self.offsets[chunk_id])
+            return json.loads(file.readline())
+
+    def _load(self):
+        """Loads the latest snapshot, then indexes any chunks appended after it."""
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "rb") as file:
+                state = pickle.load(file)
+            self.papers = state["papers"]
+            self.offsets = state["offsets"]
+            self.lengths = state["lengths"]
+            self.postings = state["postings"]
+            self.total_length = state["total_length"]
+            self.embedding_dim = state["embedding_dim"]
+
+        if not os.path.exists(self.chunks_path):
+            return
+
+        with open(self.chunks_path, "rb") as file:
+            file.seek(self.offsets[-1] if self.offsets else 0)
+            if self.offsets:
+                file.readline()  # Skip the last chunk covered by the snapshot
+            while line := file.readline():
+                chunk = json.loads(line)
+                self.offsets.append(file.tell() - len(line))
+                self._index_chunk(len(self.offsets) - 1, chunk["text"])
+                self.papers.add(chunk["paper"])
+
+
+def normalize(scores):
+    """Scales scores to [0, 1] so BM25 and embedding similarities can be combined."""
+    high = scores.max()
+    return scores / high if high > 0 else scores
@@ -0,0 +1,370 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+
+from agno.models.together import Together
+from agno.utils.log import logger
+
+import deadlines
+import progress
+import telemetry
+
+# OpenAI-compatible endpoint of the LLM provider; point it at a local server (e.g., the benchmark stub) for offline runs
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.together.xyz/v1")
+# Provider limits shared by every LLM call of the process
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "60000"))
+# Number of times a rate-limited call is retried, and the bounds of the backoff between retries
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "60.0"))
+
+# Seconds after which a slow LLM call is duplicated, the first response winning (0 disables hedging)
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "30"))
+# Timeout of a single LLM request, so abandoned requests do not hold their thread forever
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "300"))
+# Number of LLM requests (including hedges) in flight at the same time
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "64"))
+# Completion tokens assumed for calls that do not set max_tokens
+LLM_COMPLETION_TOKENS_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKENS_ESTIMATE", "1024"))
+
+# Priority classes, most urgent first: interactive calls (e.g., chat) go ahead of batch work (e.g., reviews)
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+
+def backoff_delay(attempt, base=LLM_BACKOFF_BASE, maximum=LLM_BACKOFF_MAX):
+    """Exponential backoff with full jitter: a random delay up to base * 2^attempt, capped at `maximum`."""
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+def is_rate_limited(error):
+    """Whether an error from the provider (or agno's wrapper of it) is a 429 response."""
+    while error is not None:
+        if getattr(error, "status_code", None) == 429:
+            return True
+        error = error.__cause__
+    return False
+
+
+def retry_after(error):
+    """Seconds the provider asked to wait before retrying, if it sent a Retry-After header."""
+    while error is not None:
+        response = getattr(error, "response", None)
+        value = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+        error = error.__cause__
+    return None
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate_per_minute`, holding at most one minute of tokens."""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = rate_per_minute
+        self.rate = rate_per_minute / 60
+        self.tokens = rate_per_minute
+        self.updated_at = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount):
+        """Seconds until `amount` tokens are available (0 if they are available now)."""
+        self.refill()
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def consume(self, amount):
+        # The balance may go negative when a call used more tokens than estimated; later calls wait for it
+        self.refill()
+        self.tokens -= amount
+
+
+class LLMScheduler:
+    """
+    Process-wide scheduler of LLM calls. Calls wait for capacity in a requests-per-minute and a
+    tokens-per-minute bucket, and are admitted by priority class, then in arrival order.
+    Calls rejected with a 429 are retried with exponential backoff and jitter.
+    """
+
+    def __init__(self, requests_per_minute: float = LLM_REQUESTS_PER_MINUTE, tokens_per_minute: float = LLM_TOKENS_PER_MINUTE,
+                 max_retries: int = LLM_MAX_RETRIES):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.condition = threading.Condition()
+        self.waiting = []  # Heap of (priority, arrival order) of the calls waiting for capacity
+        self.arrivals = itertools.count()
+
+        self.calls = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.failures = 0
+        self.wait_seconds = {name: 0.0 for name in PRIORITIES}
+        self.max_wait_seconds = {name: 0.0 for name in PRIORITIES}
+        self.admitted = {name: 0 for name in PRIORITIES}
+
+    def call(self, fn, estimated_tokens: int = 0, priority: str = "batch", usage=None, hedger=None, hedge_delay: float = LLM_HEDGE_DELAY):
+        """
+        Runs an LLM call once the rate limits allow it, retrying it if the provider rate-limits it.
+
+        Args:
+            fn (callable): Function making the LLM call.
+            estimated_tokens (int): Tokens the call is expected to use (prompt and completion).
+            priority (str): "interactive" or "batch".
+            usage (callable): Optional function returning the tokens actually used, given the result of `fn`,
+                              so the tokens-per-minute bucket is corrected after the call.
+            hedger (HedgedCaller): Optional hedging of the call. Only admitted calls are handed to it, so its
+                                   pool never holds calls waiting for capacity, and its hedges need admission too.
+            hedge_delay (float): Seconds after admission before the call is hedged.
+
+        Returns:
+            The result of `fn`.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.acquire(estimated_tokens, priority)
+            try:
+                if hedger is None:
+                    result = fn()
+                else:
+                    result = hedger.call(fn, delay=hedge_delay, admit=lambda: self.try_acquire(estimated_tokens))
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == self.max_retries:
+                    with self.condition:
+                        self.failures += 1
+                    raise
+
+                delay = retry_after(e) or backoff_delay(attempt)
+                left = deadlines.remaining()
+                if left is not None and delay >= left:
+                    raise deadlines.DeadlineExceeded("Deadline exceeded while backing off from a rate-limited LLM call") from e
+                with self.condition:
+                    self.rate_limited += 1
+                    self.retries += 1
+                logger.warning(f"LLM call rate-limited, retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+                continue
+
+            with self.condition:
+                self.calls += 1
+                if usage is not None:
+                    try:
+                        self.tokens.consume(usage(result) - estimated_tokens)
+                    except Exception:
+                        pass  # Usage is optional in provider responses
+            return result
+
+    def acquire(self, estimated_tokens: int = 0, priority: str = "batch"):
+        """
+        Blocks until the call may be sent: it is the most urgent waiting call and both buckets have capacity.
+        Raises DeadlineExceeded if the current deadline passes while waiting.
+        """
+        entry = (PRIORITIES[priority], next(self.arrivals))
+        started_at = time.monotonic()
+
+        with self.condition:
+            heapq.heappush(self.waiting, entry)
+            try:
+                while True:
+                    if self.waiting[0] == entry:
+                        delay = max(self.requests.wait_time(1), self.tokens.wait_time(estimated_tokens))
+                        if delay == 0:
+                            self.requests.consume(1)
+                            self.tokens.consume(min(estimated_tokens, self.tokens.capacity))
+                            break
+                    else:
+                        delay = None  # Wait for the calls ahead to be admitted
+
+                    left = deadlines.remaining()
+                    if left is not None:
+                        if left <= 0:
+                            deadlines.check()
+                        delay = left if delay is None else min(delay, left)
+                    self.condition.wait(timeout=delay)
+            finally:
+                self.waiting.remove(entry)
+                heapq.heapify(self.waiting)
+                self.condition.notify_all()
+
+            waited = time.monotonic() - started_at
+            self.admitted[priority] += 1
+            self.wait_seconds[priority] += waited
+            self.max_wait_seconds[priority] = max(self.max_wait_seconds[priority], waited)
+
+    def try_acquire(self, estimated_tokens: int = 0):
+        """
+        Admits a call only if no other call is waiting and both buckets have capacity right now.
+        Used for optional requests such as hedges, which must neither wait nor go ahead of waiting calls.
+
+        Returns:
+            bool: Whether the call was admitted.
+        """
+        with self.condition:
+            if self.waiting or max(self.requests.wait_time(1), self.tokens.wait_time(estimated_tokens)) > 0:
+                return False
+            self.requests.consume(1)
+            self.tokens.consume(min(estimated_tokens, self.tokens.capacity))
+            return True
+
+    def stats(self):
+        with self.condition:
+            return {
+                "queue_depth": {name: sum(1 for level, _ in self.waiting if level == value) for name, value in PRIORITIES.items()},
+                "admitted": dict(self.admitted),
+                "average_wait_seconds": {
+                    name: self.wait_seconds[name] / self.admitted[name] if self.admitted[name] else 0.0 for name in PRIORITIES
+                },
+                "max_wait_seconds": dict(self.max_wait_seconds),
+                "calls": self.calls,
+                "rate_limited": self.rate_limited,
+                "retries": self.retries,
+                "failures": self.failures,
+                "requests_per_minute": self.requests.capacity,
+                "tokens_per_minute": self.tokens.capacity,
+            }
+
+
+# Shared scheduler of all LLM calls
+llm_scheduler = LLMScheduler()
+
+
+class HedgedCaller:
+    """
+    Cuts the tail latency of LLM calls: a call still running after a delay is duplicated,
+    and whichever response arrives first is used. Waiting stops at the current deadline.
+    Calls must already be admitted by the scheduler, since the pool runs them in arrival order.
+    """
+
+    def __init__(self, max_in_flight: int = LLM_MAX_IN_FLIGHT):
+        self.executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="llm-call")
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.fired = 0  # Calls that were duplicated
+        self.skipped = 0  # Hedges not sent because the scheduler had no capacity for them
+        self.hedge_wins = 0  # Duplicated calls won by the duplicate
+        self.primary_wins = 0  # Duplicated calls won by the original request anyway
+
+    def call(self, fn, delay: float = LLM_HEDGE_DELAY, admit=None):
+        """
+        Runs `fn`, duplicating it if it has not returned after `delay` seconds.
+
+        Args:
+            fn (callable): The call, already admitted by the scheduler.
+            delay (float): Seconds before the call is duplicated (0 disables hedging).
+            admit (callable): Optional function admitting the duplicate; if it returns False, no duplicate is sent.
+
+        Returns:
+            The result of the first attempt that succeeds.
+
+        Raises:
+            DeadlineExceeded: If no attempt returns before the current deadline.
+        """
+        deadlines.check()
+        attempt = progress.bind(fn)  # Attempts run on the pool, with the deadline of the caller
+        started_at = time.monotonic()
+        primary = self.executor.submit(attempt)
+        hedge = None
+        hedge_due = delay > 0
+        pending = {primary}
+
+        with self.lock:
+            self.calls += 1
+
+        while True:
+            timeouts = []
+            if hedge_due:
+                timeouts.append(max(0.0, started_at + delay - time.monotonic()))
+            left = deadlines.remaining()
+            if left is not None:
+                timeouts.append(max(0.0, left))
+
+            done, pending = wait(pending, timeout=min(timeouts) if timeouts else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if hedge is not None:
+                        with self.lock:
+                            if future is hedge:
+                                self.hedge_wins += 1
+                            else:
+                                self.primary_wins += 1
+                    return future.result()
+
+            # Every attempt failed: report the error of the last one
+            if not pending:
+                raise next(iter(done)).exception()
+
+            deadlines.check()
+
+            if hedge_due and time.monotonic() >= started_at + delay:
+                hedge_due = False
+                # A provider that is already throttling is not sent extra requests
+                if admit is not None and not admit():
+                    with self.lock:
+                        self.skipped += 1
+                    continue
+                logger.warning(f"LLM call still running after {delay:g}s, sending a hedged request")
+                hedge = self.executor.submit(attempt)
+                pending.add(hedge)
+                with self.lock:
+                    self.fired += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "calls": self.calls,
+                "hedges_fired": self.fired,
+                "hedges_skipped": self.skipped,
+                "hedge_wins": self.hedge_wins,
+                "primary_wins": self.primary_wins,
+            }
+
+
+# Shared hedging of all LLM calls
+llm_hedger = HedgedCaller()
+
+
+def estimate_tokens(messages, max_tokens=None):
+    """Rough token count of a call: about 4 characters per prompt token, plus the completion budget."""
+    prompt_chars = sum(len(str(message.content or "")) for message in messages)
+    return prompt_chars // 4 + (max_tokens or LLM_COMPLETION_TOKENS_ESTIMATE)
+
+
+@dataclass
+class ScheduledTogether(Together):
+    """Together model whose calls go through the shared LLM scheduler and are hedged when slow."""
+
+    base_url: str = LLM_BASE_URL
+    priority: str = "batch"  # "interactive" or "batch"
+    max_retries: int = 0  # Rate-limited calls are retried by the scheduler, not by the client
+    timeout: float = LLM_REQUEST_TIMEOUT
+    hedge_delay: float = LLM_HEDGE_DELAY
+
+    def invoke(self, messages):
+        estimated_tokens = estimate_tokens(messages, self.max_tokens)
+        with telemetry.span("llm.call", model=self.id, priority=self.priority):
+            try:
+                # Admission comes first, so slow or throttled batch calls never hold the pool ahead of interactive ones
+                response = llm_scheduler.call(
+                    lambda: super(ScheduledTogether, self).invoke(messages),
+                    estimated_tokens=estimated_tokens,
+                    priority=self.priority,
+                    usage=lambda response: response.usage.total_tokens,
+                    hedger=llm_hedger,
+                    hedge_delay=self.hedge_delay,
+                )
+            except Exception:
+                telemetry.metrics.inc("llm_calls_total", model=self.id, agent=telemetry.current_attribute("agent") or "unknown", status="error")
+                raise
+            telemetry.record_llm_usage(self.id, response)
+            return response
@@ -1,44 +1,290 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-from agents.chat_agent import chat_agent
-from workflows.research_workflow import research_workflow
-from agno.agent import RunResponse
-from knowledge.knowledge_base import pdf_knowledge_base
-from utils import extract_metadata, save_paper_metadata, generate_pdf
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Literal
+import asyncio
+import json
 import os
+import re
+from agents.chat_agent import create_chat_agent
+from knowledge.knowledge_base import pdf_knowledge_base
+from pipeline import generate_literature_review, review_flights
+from jobs import job_manager
+from batches import batch_manager, MAX_BATCH_TOPICS
+from storage.pdf_store import pdf_store
+from storage.result_cache import result_cache
+from storage.review_pdfs import review_pdf_store, PDF_RENDER_DEADLINE
+from storage.paper_catalog import paper_catalog
+from storage.summary_cache import summary_cache
+from llm_scheduler import llm_scheduler, llm_hedger
+from telemetry import metrics, render_stats, run_agent
+import progress
 
 # Initialize FastAPI application
 app = FastAPI()
 
+# Size of the chunks in which PDFs are sent
+PDF_CHUNK_SIZE = 256 * 1024
+# Review ids are hex content hashes
+REVIEW_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+# Media types of the previews of a review
+PREVIEW_MEDIA_TYPES = {"md": "text/markdown; charset=utf-8", "html": "text/html; charset=utf-8"}
+
 # Define request model for research paper fetching
 class ResearchRequest(BaseModel):
     topic: str  # Research topic to fetch papers for
     max_papers: int = 5  # Default number of papers to fetch
+    force_refresh: bool = False  # Regenerate the review instead of serving a cached one
+    review_mode: Literal["single", "map_reduce"] = "single"  # Review all papers in one call, or each paper in parallel
+    search_mode: Literal["direct", "agent"] = "direct"  # Search arXiv directly, or through the summarization agent's tools
+    incremental: bool = False  # Only add the papers submitted since the topic's previous review to it
+
+# Define request model for generating the reviews of several topics at once
+class BatchRequest(BaseModel):
+    topics: list[str] = Field(min_length=1, max_length=MAX_BATCH_TOPICS)  # Research topics to generate reviews for
+    max_papers: int = 5  # Number of papers to fetch per topic
+    force_refresh: bool = False  # Regenerate the reviews instead of serving cached ones
+    review_mode: Literal["single", "map_reduce"] = "single"  # Review all papers of a topic in one call, or each paper in parallel
+
+# Define request model for chatting with the downloaded papers
+class ChatRequest(BaseModel):
+    question: str  # Question about the papers
+    session_id: str | None = None  # Conversation to continue, if any
 
 @app.post("/fetch_papers/")
 async def fetch_papers(request: ResearchRequest):
     """
     Endpoint to fetch research papers and generate a literature review.
     Executes the research workflow and processes the retrieved papers.
+    A review that misses its deadline is answered with 504 and the papers completed so far.
+    """
+    # Run the blocking workflow in a worker thread so the event loop keeps serving other requests
+    result = await run_in_threadpool(generate_literature_review, **request.model_dump())
+    if result.get("timed_out"):
+        return JSONResponse(status_code=504, content=result)
+    return result
+
+@app.post("/fetch_papers/stream")
+async def fetch_papers_stream(request: ResearchRequest):
+    """
+    Streaming variant of /fetch_papers/ that sends newline-delimited JSON events as the review progresses:
+    stage updates, each paper as soon as its review is ready, the conclusion, and finally the complete result.
+    """
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+
+    def emit(event):
+        loop.call_soon_threadsafe(events.put_nowait, event)
+
+    def run():
+        try:
+            with progress.listen(lambda event, data: emit({"event": event, **data})):
+                result = generate_literature_review(**request.model_dump())
+            emit({"event": "completed", "result": result})
+        except Exception as e:
+            emit({"event": "error", "detail": str(e)})
+        finally:
+            emit(None)  # End of the stream
+
+    loop.run_in_executor(None, run)
+
+    async def event_stream():
+        while (event := await events.get()) is not None:
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+@app.post("/jobs", status_code=202)
+async def create_job(request: ResearchRequest):
+    """
+    Endpoint to start a literature review in the background.
+    Returns a job id immediately; poll /jobs/{job_id} for progress and the result.
+    """
+    job_id = job_manager.submit(generate_literature_review, **request.model_dump())
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Endpoint to check the status, per-stage progress and result of a literature review job.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/batches", status_code=202)
+async def create_batch(request: BatchRequest):
+    """
+    Endpoint to generate the literature reviews of several topics in the background.
+    Papers found for several topics are downloaded and summarized once for the whole batch.
+    Returns a batch id immediately; poll /batches/{batch_id} for the status and result of each topic.
+    """
+    batch_id = batch_manager.submit(**request.model_dump())
+    return {"batch_id": batch_id, "status": "queued", "topics": len(batch_manager.get(batch_id)["topics"])}
+
+@app.get("/batches/{batch_id}")
+async def get_batch(batch_id: str):
+    """
+    Endpoint to check the status of a batch and the status and result of each of its topics.
+    """
+    batch = batch_manager.get(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch
+
+@app.get("/reviews/{review_id}.pdf")
+async def get_review_pdf(review_id: str, request: Request, wait: float = PDF_RENDER_DEADLINE):
+    """
+    Endpoint to download the PDF of a literature review, waiting up to `wait` seconds (at most PDF_RENDER_DEADLINE)
+    for it if it is still being rendered. With `wait=0`, a PDF that is not ready is answered with HTTP 504 right away.
+    Review ids are content hashes, so the id doubles as a strong ETag and the PDF can be cached forever.
+    Single byte ranges are supported so large PDFs can be resumed.
+    """
+    if not REVIEW_ID_PATTERN.fullmatch(review_id):
+        raise HTTPException(status_code=404, detail="Review not found")
+
+    future = review_pdf_store.pending(review_id)
+    if future is not None:
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), min(max(wait, 0), PDF_RENDER_DEADLINE))
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="The PDF is still being rendered, try again later")
+        except Exception:
+            raise HTTPException(status_code=500, detail="The PDF could not be rendered")
+
+    path = review_pdf_store.path(review_id)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Review not found")
+
+    etag = f'"{review_id}"'
+    headers = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": "public, max-age=31536000, immutable"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    size = os.path.getsize(path)
+    start, end = 0, size - 1
+    status_code = 200
+
+    # Serve the whole file if the range is for another version (If-Range) or spans several ranges
+    range_header = request.headers.get("range")
+    if range_header and request.headers.get("if-range", etag) == etag:
+        match = re.fullmatch(r"bytes=(\d*)-(\d*)", range_header.strip())
+        if match and any(match.groups()):
+            first, last = match.groups()
+            if first:
+                start, end = int(first), min(int(last), size - 1) if last else size - 1
+            else:
+                start = max(size - int(last), 0)
+            if start >= size or start > end:
+                return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(read_file_range(path, start, end), status_code=status_code,
+                             media_type="application/pdf", headers=headers)
+
+@app.get("/reviews/{review_id}.{extension}")
+async def get_review_preview(review_id: str, extension: Literal["md", "html"]):
+    """
+    Endpoint to view a literature review as Markdown or HTML. Previews are written with the review,
+    so they are available right away, even while its PDF is still being rendered.
+    """
+    path = review_pdf_store.preview_path(review_id, extension)
+    if not REVIEW_ID_PATTERN.fullmatch(review_id) or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Review not found")
+    return FileResponse(path, media_type=PREVIEW_MEDIA_TYPES[extension],
+                        headers={"ETag": f'"{review_id}.{extension}"', "Cache-Control": "public, max-age=31536000, immutable"})
+
+def read_file_range(path, start, end):
+    """Yields the bytes of a file from `start` to `end` (inclusive) in chunks."""
+    with open(path, "rb") as file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = file.read(min(PDF_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+@app.get("/papers")
+async def search_papers(keyword: str | None = None, since: str | None = None, author: str | None = None,
+                        topic: str | None = None, limit: int = 50):
+    """
+    Endpoint to search the catalog of fetched papers by keyword, publication date (ISO 8601), author and/or topic.
+    Papers are returned newest first.
+    """
+    limit = max(1, min(limit, 500))
+    return await run_in_threadpool(paper_catalog.search_papers, keyword=keyword, since=since,
+                                   author=author, topic=topic, limit=limit)
+
+@app.get("/papers/{arxiv_id:path}")
+async def get_paper(arxiv_id: str):
+    """
+    Endpoint to look up a paper of the catalog and the topics it was fetched for.
+    """
+    paper = await run_in_threadpool(paper_catalog.get_paper, arxiv_id)
+    if paper is None:
+        raise HTTPException(status_code=404, detail="Paper not found")
+    return paper
+
+@app.get("/topics")
+async def get_topics(paper: str):
+    """
+    Endpoint to list the topics whose reviews contain a paper (given by its arXiv id).
+    """
+    topics = await run_in_threadpool(paper_catalog.topics_for_paper, paper)
+    if topics is None:
+        raise HTTPException(status_code=404, detail="Paper not found")
+    return topics
+
+@app.post("/chat")
+async def chat(request: ChatRequest):
+    """
+    Endpoint to ask a question about the downloaded papers.
+    The chat agent answers from passages retrieved from the local knowledge base.
+    """
+    agent = create_chat_agent(session_id=request.session_id)
+    response = await run_in_threadpool(run_agent, agent, request.question)
+    return {"session_id": agent.session_id, "response": response.content}
+
+@app.get("/knowledge/search")
+async def search_knowledge(query: str, top_k: int = 5):
+    """
+    Endpoint to search the full text of the downloaded papers.
     """
-    print("Executing workflow...")
-    
-    # Run the research workflow to fetch relevant papers
-    response: RunResponse = research_workflow.run(topic=request.topic, max_papers=request.max_papers)
-
-    if response:
-        # Extract metadata from the response
-        metadata = extract_metadata(response.content)
-        metadata_file = save_paper_metadata(request.topic, metadata)
-        
-        # Generate and save the literature review PDF
-        generate_pdf(request.topic, response.content)
-        pdf_path = os.path.join("../literature_reviews", f"{request.topic.replace(' ', '_')}_literature_review.pdf")
-
-        return {
-            "message": "Literature review generated!",
-            "pdf_path": pdf_path,
-            "response": response.content
-        }
-    else:
-        return {"error": "No papers found"}
+    results = await run_in_threadpool(pdf_knowledge_base.search, query, top_k=top_k)
+    return {"papers": len(pdf_knowledge_base.papers), "results": results}
+
+@app.get("/stats")
+async def get_stats():
+    """
+    Endpoint to report cache hit/miss counters and how many requests were coalesced.
+    """
+    return collect_stats()
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Endpoint exporting metrics in the Prometheus text format: span durations (stages, agent runs, LLM calls,
+    tools, downloads, JSON parsing, PDF rendering), token and download counters, and the stats of /stats as gauges.
+    """
+    stats = await run_in_threadpool(collect_stats)
+    return PlainTextResponse(metrics.render() + render_stats(stats), media_type="text/plain; version=0.0.4")
+
+def collect_stats():
+    """Stats of the caches, stores and schedulers."""
+    return {
+        "result_cache": result_cache.stats(),
+        "pdf_store": pdf_store.stats(),
+        "review_pdfs": review_pdf_store.stats(),
+        "paper_catalog": paper_catalog.stats(),
+        "summary_cache": summary_cache.stats(),
+        "llm_scheduler": llm_scheduler.stats(),
+        "llm_hedging": llm_hedger.stats(),
+        "single_flight": review_flights.stats(),
+        "batches": batch_manager.stats()
+    }
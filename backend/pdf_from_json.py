@@ -2,18 +2,54 @@ from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from xml.sax.saxutils import escape
+from preview_from_json import is_web_link
 
-def generate_pdf_from_json(topic, json_data, output_filename="research_report.pdf"):
+# Entities of the quotes, which escape() leaves as they are, for text inside attribute values
+QUOTE_ENTITIES = {"'": "&apos;", '"': "&quot;"}
+
+# Number of flowables laid out ahead of the current page when streaming
+FLOWABLE_WINDOW = 64
+# Number of references per table when streaming; each table also splits across pages
+REFERENCE_CHUNK_ROWS = 50
+
+
+class LazyFlowables(list):
+    """
+    List of flowables filled from an iterator as ReportLab consumes it, so only a window of the document
+    is held in memory while it is built. ReportLab only reads, removes and reinserts flowables at the front.
     """
-    Generate a PDF from a JSON response containing research papers, a conclusion, and references.
 
-    Args:
-        json_data (dict): JSON response with papers, conclusion, and references.
-        output_filename (str): Name of the output PDF file.
+    def __init__(self, flowables, window=FLOWABLE_WINDOW):
+        super().__init__()
+        self.source = iter(flowables)
+        self.window = window
+
+    def _fill(self, size):
+        while self.source is not None and list.__len__(self) < size:
+            try:
+                self.append(next(self.source))
+            except StopIteration:
+                self.source = None
+
+    def __len__(self):
+        self._fill(self.window)
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._fill(index + 1 if isinstance(index, int) and index >= 0 else self.window)
+        return list.__getitem__(self, index)
+
+
+def review_flowables(topic, review, reference_chunk_rows=None):
     """
-    doc = SimpleDocTemplate(output_filename, pagesize=A4)
-    elements = []
+    Yields the flowables of a literature review section by section.
 
+    Args:
+        topic (str): Research topic of the review.
+        review (LiteratureReview): Parsed review with papers, conclusion, and references.
+        reference_chunk_rows (int): Number of references per table, or None for a single table.
+    """
     # Define styles with Unicode font
     styles = getSampleStyleSheet()
     title_style = ParagraphStyle(name="Title", fontName="Helvetica-Bold", fontSize=16, spaceAfter=10)
@@ -23,69 +59,99 @@ def generate_pdf_from_json(topic, json_data, output_filename="research_report.pd
 
 
     # Add Title
-    elements.append(Paragraph(f"Literature Review: {topic}", title_style))
-    elements.append(Spacer(1, 12))
+    yield Paragraph(f"Literature Review: {escape(topic)}", title_style)
+    yield Spacer(1, 12)
 
     # Process Papers Section
-    if "papers" in json_data:
-        elements.append(Paragraph("Papers", heading_style))
-        elements.append(Spacer(1, 6))
-
-        for idx, paper in enumerate(json_data["papers"], 1):
-            elements.append(Paragraph(f"{idx}. {paper['title']}", bold_style))
-            elements.append(Paragraph(f"Authors: {paper['authors']}", body_style))
-            elements.append(Paragraph(f"Publication Date: {paper['publication_date'][:10]}", body_style))
-            elements.append(Paragraph(f"Keywords: {', '.join(paper['keywords'])}", body_style))
-            elements.append(Paragraph(f"Source: <a href='{paper['source_link']}'>{paper['source_link']}</a>", body_style))
-            elements.append(Spacer(1, 6))
+    if review.papers:
+        yield Paragraph("Papers", heading_style)
+        yield Spacer(1, 6)
+
+        for idx, paper in enumerate(review.papers, 1):
+            yield Paragraph(f"{idx}. {escape(paper.title)}", bold_style)
+            yield Paragraph(f"Authors: {escape(paper.authors)}", body_style)
+            yield Paragraph(f"Publication Date: {escape(paper.publication_date[:10])}", body_style)
+            yield Paragraph(f"Keywords: {escape(', '.join(paper.keywords))}", body_style)
+            source = escape(paper.source_link)
+            if is_web_link(paper.source_link):
+                source = f"<a href='{escape(paper.source_link, QUOTE_ENTITIES)}'>{source}</a>"
+            yield Paragraph(f"Source: {source}", body_style)
+            yield Spacer(1, 6)
 
             # Add Abstract
-            # elements.append(Paragraph("Abstract:", bold_style))
-            # elements.append(Paragraph(paper["abstract"], body_style))
-            # elements.append(Spacer(1, 6))
+            # yield Paragraph("Abstract:", bold_style)
+            # yield Paragraph(escape(paper.abstract), body_style)
+            # yield Spacer(1, 6)
 
             # Add Summary
-            elements.append(Paragraph("Summary:", bold_style))
-            elements.append(Paragraph(paper["summary"], body_style))
-            elements.append(Spacer(1, 12))
+            yield Paragraph("Summary:", bold_style)
+            yield Paragraph(escape(paper.summary), body_style)
+            yield Spacer(1, 12)
 
             # Add Review (if available)
-            if "review" in paper and paper["review"]:
-                elements.append(Paragraph("Review:", bold_style))
-                elements.append(Paragraph(paper["review"], body_style))
-                elements.append(Spacer(1, 12))
+            if paper.review:
+                yield Paragraph("Review:", bold_style)
+                yield Paragraph(escape(paper.review), body_style)
+                yield Spacer(1, 12)
 
     # Conclusion Section
-    if "conclusion" in json_data:
-        elements.append(Paragraph("Conclusion", heading_style))
-        elements.append(Spacer(1, 6))
-        elements.append(Paragraph(json_data["conclusion"], body_style))
-        elements.append(Spacer(1, 12))
+    if review.conclusion:
+        yield Paragraph("Conclusion", heading_style)
+        yield Spacer(1, 6)
+        yield Paragraph(escape(review.conclusion), body_style)
+        yield Spacer(1, 12)
 
     # References Section
-    if "references" in json_data:
-        elements.append(Paragraph("References", heading_style))
-        elements.append(Spacer(1, 6))
-
-        # Format references as a table
-        ref_data = [[f"{idx}. {ref}"] for idx, ref in enumerate(json_data["references"], 1)]
-        ref_table = Table(ref_data, colWidths=[500])
+    if review.references:
+        yield Paragraph("References", heading_style)
+        yield Spacer(1, 6)
 
-        # Style the table
-        ref_table.setStyle(TableStyle([
+        # Style the tables
+        ref_style = TableStyle([
             ("TEXTCOLOR", (0, 0), (-1, -1), colors.black),
             ("ALIGN", (0, 0), (-1, -1), "LEFT"),
             ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),  # ✅ Change to built-in font
             ("FONTSIZE", (0, 0), (-1, -1), 10),
             ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
             ("GRID", (0, 0), (-1, -1), 1, colors.black),
-        ]))
+        ])
+
+        # Format references as tables; splitting one huge table page by page takes quadratic time
+        chunk_rows = reference_chunk_rows or len(review.references)
+        for start in range(0, len(review.references), chunk_rows):
+            ref_data = [[f"{idx}. {ref}"] for idx, ref in enumerate(review.references[start:start + chunk_rows], start + 1)]
+            ref_table = Table(ref_data, colWidths=[500])
+            ref_table.setStyle(ref_style)
+            yield ref_table
+
+
+def generate_pdf_from_json(topic, review, output_filename="research_report.pdf", streaming=True):
+    """
+    Generate a PDF from a literature review containing research papers, a conclusion, and references.
+
+    Args:
+        topic (str): Research topic of the review.
+        review (LiteratureReview | dict): Parsed review with papers, conclusion, and references.
+        output_filename (str): Name of the output PDF file.
+        streaming (bool): Create the flowables as the pages are laid out and split the references into
+                          tables of REFERENCE_CHUNK_ROWS, so memory stays bounded for very large reviews.
+                          Otherwise all the flowables are created upfront with a single reference table.
+    """
+    from review_model import parse_review
+
+    # Accept decoded JSON (e.g., the sample below) by validating it into the review model
+    if isinstance(review, dict):
+        review = parse_review(review)
+
+    doc = SimpleDocTemplate(output_filename, pagesize=A4)
 
-        elements.append(ref_table)
+    if streaming:
+        elements = LazyFlowables(review_flowables(topic, review, REFERENCE_CHUNK_ROWS))
+    else:
+        elements = list(review_flowables(topic, review))
 
     # Build PDF
     doc.build(elements)
-    print(f"✅ PDF generated successfully: {output_filename}")
 
 
 # Example Usage
@@ -120,4 +186,5 @@ if __name__ == "__main__":
         ]
     }
 
-    generate_pdf_from_json(sample_json, "research_summary.pdf")
\ No newline at end of file
+    generate_pdf_from_json("Deep Learning", sample_json, "research_summary.pdf")
+    print("✅ PDF generated successfully: research_summary.pdf")
\ No newline at end of file
@@ -0,0 +1,234 @@
+from agno.workflow import RunResponse
+from agno.utils.log import logger
+from workflows.research_workflow import create_research_workflow
+from tools.arxiv_search import create_client
+from tools.paper_download_tool import download_topic_papers, pinned_papers
+from storage.result_cache import result_cache
+from singleflight import SingleFlight
+from storage.review_pdfs import review_pdf_store
+from storage.paper_catalog import paper_catalog
+from utils import normalize_topic, extract_metadata
+from review_model import parse_review
+from deadlines import DeadlineExceeded
+from telemetry import record_cache_lookup, span
+import deadlines
+import progress
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Seconds allowed for generating a review from scratch, including the workflow and the metadata
+REVIEW_DEADLINE = float(os.getenv("REVIEW_DEADLINE", "900"))
+
+# Days an incremental refresh looks back before the previous review, since arXiv lists papers a few days after submission
+REFRESH_OVERLAP_DAYS = float(os.getenv("REFRESH_OVERLAP_DAYS", "3"))
+
+# Number of topics of a batch whose reviews are generated at the same time
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+# Concurrent requests for the same review share a single workflow run
+review_flights = SingleFlight()
+
+
+def flight_key(topic: str, max_papers: int, review_mode: str, search_mode: str, incremental: bool = False):
+    """Key of a review in `review_flights`: only requests for the same topic with the same options share a run."""
+    return normalize_topic(topic), max_papers, review_mode, search_mode, incremental
+
+
+def generate_literature_review(topic: str, max_papers: int = 5, force_refresh: bool = False,
+                               review_mode: str = "single", search_mode: str = "direct", incremental: bool = False):
+    """
+    Runs the research workflow for a topic and turns its output into a downloadable literature review.
+    This call is blocking and is meant to be executed off the event loop.
+
+    Args:
+        topic (str): Research topic to fetch papers for.
+        max_papers (int): Number of papers to fetch.
+        force_refresh (bool): Regenerate the review even if a cached one is available.
+        review_mode (str): "single" to review all papers in one LLM call, or "map_reduce" to review them in parallel.
+        search_mode (str): "direct" to search arXiv without the LLM, or "agent" to let the summarization agent search.
+        incremental (bool): Refresh the previous review of the topic with the papers submitted since it was generated,
+                            instead of generating it again. Falls back to a full run if the topic has no review yet.
+
+    Returns:
+        dict: The API response with the structured review and the URL of its PDF, or an error if the review could not be generated.
+    """
+    # Update the previous review of the topic with its new papers only
+    if incremental:
+        previous = result_cache.latest(topic, max_papers)
+        if previous:
+            result, coalesced = review_flights.do(flight_key(topic, max_papers, review_mode, "direct", incremental=True),
+                                                  run_review_workflow, topic, max_papers, review_mode, "direct", previous)
+            return {**result, "coalesced": coalesced}
+
+    # Serve a previously generated review of the same topic if it is still fresh
+    if not force_refresh and not incremental:
+        cached = cached_review(topic, max_papers)
+        if cached:
+            return {**cached, "coalesced": False}
+
+    # Wait for an identical review that is already being generated instead of starting another one
+    result, coalesced = review_flights.do(flight_key(topic, max_papers, review_mode, search_mode), run_review_workflow,
+                                          topic, max_papers, review_mode, search_mode)
+    return {**result, "coalesced": coalesced}
+
+
+def cached_review(topic: str, max_papers: int):
+    """Returns the API response of the cached review of a topic if it is still fresh, or None."""
+    cached = result_cache.get(topic, max_papers)
+    record_cache_lookup("result_cache", int(bool(cached)), int(not cached))
+    if not cached:
+        return None
+
+    review = parse_review(cached["review"])
+    # Rendering is skipped if the PDF of this review already exists
+    review_id = review_pdf_store.submit(topic, review)
+    return {
+        "message": "Literature review generated!",
+        "review_id": review_id,
+        "pdf_url": f"/reviews/{review_id}.pdf",
+        "preview_url": f"/reviews/{review_id}.html",
+        "response": review.model_dump(),
+        "cached": True
+    }
+
+
+def run_review_workflow(topic: str, max_papers: int, review_mode: str = "single", search_mode: str = "direct",
+                        previous: dict = None, papers: list = None):
+    """
+    Generates a literature review and stores it in the result cache: from scratch, or by merging the papers
+    submitted since a `previous` result cache entry into its review (the PDF is then rendered again).
+    Paper records that are already summarized (e.g., shared by a batch of topics) skip the search.
+    If the review misses its deadline, an error is returned with the papers summarized or reviewed so far.
+    """
+    previous_review, since = None, None
+    if previous:
+        previous_review = parse_review(previous["review"]).model_dump()
+        since = previous["created_at"] - REFRESH_OVERLAP_DAYS * 24 * 3600
+
+    # Run the research workflow to fetch relevant papers in a session of its own
+    research_workflow = create_research_workflow()
+    try:
+        with deadlines.deadline(REVIEW_DEADLINE, "literature review"), span("workflow.run", topic=topic, review_mode=review_mode,
+                                                                             incremental=previous is not None):
+            response: RunResponse = research_workflow.run(topic=topic, max_papers=max_papers,
+                                                          review_mode=review_mode, search_mode=search_mode,
+                                                          previous_review=previous_review, since=since, papers=papers)
+    except DeadlineExceeded as e:
+        logger.error(f"Literature review of {topic} timed out: {str(e)}")
+        return {"error": str(e), "timed_out": True, "partial_result": research_workflow.partial_result()}
+
+    if not response or not response.content:
+        return {"error": "No papers found"}
+
+    # Parse the review once; the metadata, the PDF and the API response all use the parsed model
+    try:
+        review = parse_review(response.content)
+    except ValueError as e:
+        logger.error(f"Could not parse the literature review: {str(e)}")
+        return {"error": "The literature review could not be parsed"}
+
+    # Add the metadata of the papers to the catalog in one transaction
+    with progress.stage("metadata"):
+        paper_catalog.add_papers(topic, extract_metadata(review))
+
+    # Render the literature review PDF in the background; it is downloaded from /reviews/{review_id}.pdf
+    with progress.stage("pdf"):
+        review_id = review_pdf_store.submit(topic, review)
+
+    result_cache.put(topic, max_papers, review.model_dump_json(), review_pdf_store.path(review_id))
+
+    result = {
+        "message": "Literature review generated!",
+        "review_id": review_id,
+        "pdf_url": f"/reviews/{review_id}.pdf",
+        "preview_url": f"/reviews/{review_id}.html",
+        "response": review.model_dump(),
+        "cached": False
+    }
+    if previous_review is not None:
+        result["new_papers"] = len(review.papers) - len(previous_review["papers"])
+    return result
+
+
+def generate_literature_reviews(topics: list, max_papers: int = 5, force_refresh: bool = False,
+                                review_mode: str = "single", report=None):
+    """
+    Generates the literature reviews of a batch of topics, doing the work on the papers they share only once:
+    1. Topics with a fresh cached review are answered from the cache.
+    2. arXiv is searched for the other topics on one client, so its requests stay spaced as arXiv asks.
+    3. Papers found for several topics are downloaded, extracted, indexed and summarized once for the batch.
+    4. The reviews of the topics are generated concurrently, up to BATCH_CONCURRENCY at a time.
+    This call is blocking and is meant to be executed off the event loop.
+
+    Args:
+        topics (list): Research topics, without duplicates.
+        max_papers (int): Number of papers to fetch per topic.
+        force_refresh (bool): Regenerate the reviews even if cached ones are available.
+        review_mode (str): "single" to review all papers of a topic in one LLM call, or "map_reduce" to review them in parallel.
+        report (callable): Called as report(topic, **fields) when the status of a topic changes, with the
+                           same result as /fetch_papers/ once the topic is done.
+
+    Returns:
+        dict: Number of papers found for all the topics and number of distinct papers processed.
+    """
+    report = report or (lambda topic, **fields: None)
+
+    def finish(topic, result):
+        if result.get("timed_out"):
+            report(topic, status="timed_out", result=result, error=result["error"])
+        elif "error" in result:
+            report(topic, status="failed", result=result, error=result["error"])
+        else:
+            report(topic, status="completed", result=result)
+
+    pending = []
+    for topic in topics:
+        cached = None if force_refresh else cached_review(topic, max_papers)
+        if cached:
+            finish(topic, {**cached, "coalesced": False})
+        else:
+            pending.append(topic)
+
+    # Search every topic before any download, so papers found for several topics are known upfront
+    workflow = create_research_workflow()
+    client = create_client(page_size=max_papers)
+    found = {}
+    for topic in pending:
+        report(topic, status="searching")
+        papers = workflow.search_papers(topic, max_papers, client=client)
+        if papers:
+            found[topic] = papers
+        else:
+            finish(topic, {"error": "No papers found" if papers is not None else "The arXiv search failed"})
+
+    # Each paper is processed once, as found by the first topic; the other topics only get a link to its PDF
+    for topic in found:
+        report(topic, status="preparing")
+    links_by_topic = {topic: [paper["pdf_url"] for paper in papers] for topic, papers in found.items()}
+    with pinned_papers([link for links in links_by_topic.values() for link in links]):
+        downloads = download_topic_papers(links_by_topic)
+        unique = {}
+        for topic, papers in found.items():
+            for paper, download in zip(papers, downloads[topic]):
+                paper["pdf_path"] = download.get("file_path", "")
+                unique.setdefault(paper["arxiv_id"], paper)
+        logger.info(f"Batch of {len(topics)} topics: {sum(map(len, found.values()))} papers found, {len(unique)} distinct")
+        workflow.process_papers(list(unique.values()))
+
+    def review_topic(topic):
+        # Every topic gets its own copies of the shared records, with the path of the PDF in its directory
+        papers = [{**unique[paper["arxiv_id"]], "pdf_path": paper["pdf_path"]} for paper in found[topic]]
+        report(topic, status="reviewing")
+        try:
+            result, coalesced = review_flights.do(flight_key(topic, max_papers, review_mode, "direct"), run_review_workflow,
+                                                  topic, max_papers, review_mode, "direct", None, papers)
+        except Exception as e:
+            logger.error(f"Literature review of {topic} failed: {str(e)}")
+            result, coalesced = {"error": str(e)}, False
+        finish(topic, {**result, "coalesced": coalesced})
+
+    if found:
+        with ThreadPoolExecutor(max_workers=min(BATCH_CONCURRENCY, len(found)), thread_name_prefix="batch-review") as executor:
+            list(executor.map(progress.bind(review_topic), found))
+
+    return {"papers_found": sum(map(len, found.values())), "papers_processed": len(unique)}
@@ -0,0 +1,109 @@
+from html import escape
+from urllib.parse import urlparse
+
+# Schemes of the source links rendered as links; other links (e.g., javascript:) are rendered as text
+LINK_SCHEMES = ("http", "https")
+# Styles of the HTML preview
+HTML_STYLE = (
+    "body{font-family:Helvetica,Arial,sans-serif;max-width:50em;margin:2em auto;padding:0 1em;line-height:1.5}"
+    "h2{color:darkblue}ol.references li{margin-bottom:.4em}"
+)
+
+
+def markdown_text(text):
+    """Escapes the characters that Markdown would turn into formatting or markup."""
+    for char in "\\`*_[]<>#|":
+        text = text.replace(char, "\\" + char)
+    return text
+
+
+def is_web_link(url):
+    """Whether a link is an http(s) URL, safe to render as a clickable link."""
+    return urlparse(url.strip()).scheme.lower() in LINK_SCHEMES
+
+
+def generate_markdown_from_json(topic, review, output_filename="research_report.md"):
+    """
+    Writes a literature review as Markdown, paper by paper, for quick previews without rendering a PDF.
+
+    Args:
+        topic (str): Research topic of the review.
+        review (LiteratureReview | dict): Parsed review with papers, conclusion, and references.
+        output_filename (str): Name of the output Markdown file.
+    """
+    from review_model import parse_review
+
+    if isinstance(review, dict):
+        review = parse_review(review)
+
+    with open(output_filename, "w", encoding="utf-8") as file:
+        file.write(f"# Literature Review: {markdown_text(topic)}\n\n")
+
+        if review.papers:
+            file.write("## Papers\n\n")
+            for idx, paper in enumerate(review.papers, 1):
+                file.write(f"### {idx}. {markdown_text(paper.title)}\n\n")
+                file.write(f"- **Authors:** {markdown_text(paper.authors)}\n")
+                file.write(f"- **Publication Date:** {paper.publication_date[:10]}\n")
+                file.write(f"- **Keywords:** {markdown_text(', '.join(paper.keywords))}\n")
+                source = f"<{paper.source_link}>" if is_web_link(paper.source_link) else markdown_text(paper.source_link)
+                file.write(f"- **Source:** {source}\n\n")
+                file.write(f"**Summary:** {markdown_text(paper.summary)}\n\n")
+                if paper.review:
+                    file.write(f"**Review:** {markdown_text(paper.review)}\n\n")
+
+        if review.conclusion:
+            file.write(f"## Conclusion\n\n{markdown_text(review.conclusion)}\n\n")
+
+        if review.references:
+            file.write("## References\n\n")
+            for idx, ref in enumerate(review.references, 1):
+                file.write(f"{idx}. {markdown_text(ref)}\n")
+
+
+def generate_html_from_json(topic, review, output_filename="research_report.html"):
+    """
+    Writes a literature review as a standalone HTML page, paper by paper, for quick previews without rendering a PDF.
+
+    Args:
+        topic (str): Research topic of the review.
+        review (LiteratureReview | dict): Parsed review with papers, conclusion, and references.
+        output_filename (str): Name of the output HTML file.
+    """
+    from review_model import parse_review
+
+    if isinstance(review, dict):
+        review = parse_review(review)
+
+    with open(output_filename, "w", encoding="utf-8") as file:
+        title = f"Literature Review: {escape(topic)}"
+        file.write(f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{title}</title>'
+                   f"<style>{HTML_STYLE}</style></head><body>\n<h1>{title}</h1>\n")
+
+        if review.papers:
+            file.write("<h2>Papers</h2>\n")
+            for idx, paper in enumerate(review.papers, 1):
+                source = escape(paper.source_link)
+                if is_web_link(paper.source_link):
+                    source = f'<a href="{source}">{source}</a>'
+                file.write(
+                    f"<h3>{idx}. {escape(paper.title)}</h3>\n"
+                    f"<p><b>Authors:</b> {escape(paper.authors)}<br>"
+                    f"<b>Publication Date:</b> {escape(paper.publication_date[:10])}<br>"
+                    f"<b>Keywords:</b> {escape(', '.join(paper.keywords))}<br>"
+                    f"<b>Source:</b> {source}</p>\n"
+                    f"<p><b>Summary:</b> {escape(paper.summary)}</p>\n"
+                )
+                if paper.review:
+                    file.write(f"<p><b>Review:</b> {escape(paper.review)}</p>\n")
+
+        if review.conclusion:
+            file.write(f"<h2>Conclusion</h2>\n<p>{escape(review.conclusion)}</p>\n")
+
+        if review.references:
+            file.write('<h2>References</h2>\n<ol class="references">\n')
+            for ref in review.references:
+                file.write(f"<li>{escape(ref)}</li>\n")
+            file.write("</ol>\n")
+
+        file.write("</body></html>\n")
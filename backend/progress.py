@@ -0,0 +1,55 @@
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+
+import telemetry
+
+# Listener receiving progress events for the review currently running in this context
+_listener = ContextVar("progress_listener", default=None)
+
+
+def report(event: str, **data):
+    """
+    Sends a progress event to the listener registered for the current context, if any.
+
+    Args:
+        event (str): Name of the event (e.g., "stage").
+        **data: Event payload (e.g., name="reviewing", status="started").
+    """
+    listener = _listener.get()
+    if listener is not None:
+        listener(event, data)
+
+
+@contextmanager
+def listen(callback):
+    """
+    Registers a callback for every progress event reported inside the `with` block.
+
+    Args:
+        callback (callable): Function called as callback(event, data).
+    """
+    token = _listener.set(callback)
+    try:
+        yield
+    finally:
+        _listener.reset(token)
+
+
+def bind(fn):
+    """Wraps a function so it reports to the current listener when run on another thread."""
+    context = copy_context()
+    # A context can only be entered by one thread at a time, so every call runs in its own copy
+    return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
+
+
+@contextmanager
+def stage(name: str):
+    """Reports the start and completion (or failure) of a workflow stage, and times it as a span."""
+    report("stage", name=name, status="started")
+    try:
+        with telemetry.span(f"stage.{name}"):
+            yield
+    except Exception:
+        report("stage", name=name, status="failed")
+        raise
+    report("stage", name=name, status="completed")
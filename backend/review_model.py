@@ -0,0 +1,105 @@
+from pydantic import BaseModel, ConfigDict, field_validator
+from typing import List
+
+from utils import parse_json_response
+
+
+class PaperMetadata(BaseModel):
+    """Metadata of a reviewed paper, as saved alongside the literature review."""
+
+    model_config = ConfigDict(extra="ignore", coerce_numbers_to_str=True)
+
+    title: str = ""
+    authors: str = ""
+    abstract: str = ""
+    publication_date: str = ""
+    keywords: List[str] = []
+    journal: str = ""
+    source_link: str = ""
+
+    @field_validator("title", "authors", "abstract", "publication_date", "journal", "source_link", mode="before")
+    @classmethod
+    def join_text(cls, value):
+        # The LLM sometimes returns lists (e.g., of authors) or null instead of strings
+        if value is None:
+            return ""
+        if isinstance(value, (list, tuple)):
+            return ", ".join(str(item) for item in value if item is not None)
+        return value
+
+    @field_validator("keywords", mode="before")
+    @classmethod
+    def split_keywords(cls, value):
+        # Keywords come either as a list or as a single comma-separated string
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [keyword.strip() for keyword in value.split(",") if keyword.strip()]
+        return [str(keyword).strip() for keyword in value if keyword is not None]
+
+
+class Paper(PaperMetadata):
+    """A paper of the literature review with its summary and review."""
+
+    summary: str = ""
+    review: str = ""
+    pdf_path: str = ""
+
+    @field_validator("summary", "review", "pdf_path", mode="before")
+    @classmethod
+    def text_or_empty(cls, value):
+        return "" if value is None else value
+
+    def metadata(self):
+        """Returns the metadata of the paper without its summary and review."""
+        return PaperMetadata.model_validate(self.model_dump())
+
+
+class LiteratureReview(BaseModel):
+    """A literature review generated by the research workflow: the reviewed papers, a conclusion and references."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    papers: List[Paper] = []
+    conclusion: str = ""
+    references: List[str] = []
+
+    @field_validator("conclusion", mode="before")
+    @classmethod
+    def text_or_empty(cls, value):
+        return "" if value is None else value
+
+    @field_validator("references", mode="before")
+    @classmethod
+    def split_references(cls, value):
+        # A single string of references is split into one reference per line
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [line.strip() for line in value.splitlines() if line.strip()]
+        return [format_reference(ref) for ref in value if ref]
+
+
+def format_reference(reference):
+    """Formats a reference the LLM returned as an object (e.g., with authors, title and link) as a single line."""
+    if isinstance(reference, dict):
+        return ", ".join(str(part) for part in reference.values() if part)
+    return str(reference)
+
+
+def parse_review(content):
+    """
+    Parses and validates the literature review returned by the LLM. This is done once per review;
+    everything downstream (metadata, PDF, API response) works on the returned model.
+
+    Args:
+        content (str | dict): Review as returned by the LLM, or already decoded.
+
+    Returns:
+        LiteratureReview: The validated literature review.
+
+    Raises:
+        ValueError: If the content is not a literature review.
+    """
+    data = parse_json_response(content) if isinstance(content, str) else content
+    return LiteratureReview.model_validate(data)
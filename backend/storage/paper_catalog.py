@@ -0,0 +1,331 @@
+import os
+import time
+
+from sqlalchemy import (Column, Float, ForeignKey, Index, Integer, MetaData, String, Table, Text,
+                        create_engine, delete, event, func, select)
+from sqlalchemy.dialects.sqlite import insert
+
+from storage.pdf_store import normalize_arxiv_id, paper_key
+from storage.workflow_storage import configure_connection
+from utils import normalize_topic
+
+# SQLite file of the paper catalog
+PAPER_CATALOG_DB = os.getenv("PAPER_CATALOG_DB", "workflows/db/catalog.db")
+# SQLite limits the number of parameters per statement, so large IN clauses are split
+SQL_BATCH_SIZE = 500
+
+metadata = MetaData()
+
+papers_table = Table(
+    "papers", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("arxiv_id", String, nullable=False, unique=True),  # arXiv id without version, or a hash of the link for other sources
+    Column("version", String),
+    Column("title", Text, nullable=False),
+    Column("abstract", Text),
+    Column("publication_date", String, index=True),  # ISO 8601
+    Column("journal", Text),
+    Column("source_link", Text),
+    Column("updated_at", Float, nullable=False),
+)
+
+authors_table = Table(
+    "authors", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, nullable=False, unique=True),
+)
+
+paper_authors_table = Table(
+    "paper_authors", metadata,
+    Column("paper_id", Integer, ForeignKey("papers.id"), primary_key=True),
+    Column("author_id", Integer, ForeignKey("authors.id"), primary_key=True, index=True),
+    Column("position", Integer, nullable=False),
+)
+
+keywords_table = Table(
+    "keywords", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, nullable=False, unique=True),  # Lowercase
+)
+
+paper_keywords_table = Table(
+    "paper_keywords", metadata,
+    Column("keyword_id", Integer, ForeignKey("keywords.id"), primary_key=True),
+    Column("paper_id", Integer, ForeignKey("papers.id"), primary_key=True, index=True),
+    # Copied from the paper so "papers by keyword since date" is a single index range scan
+    Column("publication_date", String),
+    Index("ix_paper_keywords_keyword_date", "keyword_id", "publication_date"),
+)
+
+topics_table = Table(
+    "topics", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, nullable=False, unique=True),  # Normalized topic
+)
+
+topic_papers_table = Table(
+    "topic_papers", metadata,
+    Column("topic_id", Integer, ForeignKey("topics.id"), primary_key=True),
+    Column("paper_id", Integer, ForeignKey("papers.id"), primary_key=True, index=True),
+    Column("added_at", Float, nullable=False),
+)
+
+
+def catalog_id(paper):
+    """Returns the catalog key of a paper (its arXiv id without version) and its version."""
+    link = paper.get("source_link") or paper.get("pdf_url") or ""
+    arxiv_id = normalize_arxiv_id(paper.get("arxiv_id") or link)
+    if arxiv_id is None:
+        return paper_key(link or paper.get("title", "")), None
+    paper_id, version = arxiv_id
+    if version is None:
+        # The id may be unversioned while the link is versioned
+        version = paper.get("version") or (normalize_arxiv_id(link) or (None, None))[1]
+    return paper_id, version
+
+
+def split_authors(authors):
+    if isinstance(authors, str):
+        authors = authors.split(",")
+    return [author.strip() for author in authors or [] if author and author.strip()]
+
+
+def batched(items, size=SQL_BATCH_SIZE):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class PaperCatalog:
+    """
+    Catalog of every paper fetched for any topic, deduplicated by arXiv id.
+    Papers, authors, keywords and the topics they were fetched for are stored in indexed SQLite tables,
+    so papers can be looked up by keyword, date, author or topic without scanning.
+    """
+
+    def __init__(self, db_file: str = PAPER_CATALOG_DB):
+        db_path = os.path.abspath(db_file)
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.engine = create_engine(f"sqlite:///{db_path}")
+        event.listen(self.engine, "connect", configure_connection)
+        metadata.create_all(self.engine)
+
+    def add_papers(self, topic, papers):
+        """
+        Adds the papers fetched for a topic in a single transaction. Papers already in the catalog
+        are updated in place and linked to the topic.
+
+        Args:
+            topic (str): Research topic the papers were fetched for.
+            papers (list): Paper metadata (dicts or PaperMetadata) with title, authors, publication_date,
+                           keywords, journal and source_link.
+
+        Returns:
+            int: Number of papers added or updated.
+        """
+        now = time.time()
+        records = {}
+        for paper in papers:
+            paper = paper if isinstance(paper, dict) else paper.model_dump()
+            arxiv_id, version = catalog_id(paper)
+            records[arxiv_id] = {
+                "row": {
+                    "arxiv_id": arxiv_id,
+                    "version": version,
+                    "title": paper.get("title", ""),
+                    "abstract": paper.get("abstract", ""),
+                    "publication_date": paper.get("publication_date", "") or None,
+                    "journal": paper.get("journal", ""),
+                    "source_link": paper.get("source_link", ""),
+                    "updated_at": now,
+                },
+                "authors": split_authors(paper.get("authors")),
+                "keywords": sorted({keyword.strip().lower() for keyword in paper.get("keywords") or [] if keyword.strip()}),
+            }
+
+        if not records:
+            return 0
+
+        with self.engine.begin() as conn:
+            # Upsert the papers, then look up their ids
+            statement = insert(papers_table)
+            conn.execute(statement.on_conflict_do_update(
+                index_elements=["arxiv_id"],
+                set_={
+                    **{name: statement.excluded[name] for name in
+                       ("title", "abstract", "publication_date", "journal", "source_link", "updated_at")},
+                    # Keep the known version if the new metadata has none
+                    "version": func.coalesce(statement.excluded.version, papers_table.c.version),
+                },
+            ), [record["row"] for record in records.values()])
+            paper_ids = self._ids(conn, papers_table, papers_table.c.arxiv_id, records)
+
+            author_ids = self._upsert_names(conn, authors_table, {a for r in records.values() for a in r["authors"]})
+            keyword_ids = self._upsert_names(conn, keywords_table, {k for r in records.values() for k in r["keywords"]})
+            topic_ids = self._upsert_names(conn, topics_table, {normalize_topic(topic)})
+
+            # Replace the author and keyword links, which may change with a new version of a paper
+            ids = list(paper_ids.values())
+            for batch in batched(ids):
+                conn.execute(delete(paper_authors_table).where(paper_authors_table.c.paper_id.in_(batch)))
+                conn.execute(delete(paper_keywords_table).where(paper_keywords_table.c.paper_id.in_(batch)))
+
+            author_links = [
+                {"paper_id": paper_ids[arxiv_id], "author_id": author_ids[name], "position": position}
+                for arxiv_id, record in records.items()
+                for position, name in enumerate(dict.fromkeys(record["authors"]))
+            ]
+            keyword_links = [
+                {"paper_id": paper_ids[arxiv_id], "keyword_id": keyword_ids[name],
+                 "publication_date": record["row"]["publication_date"]}
+                for arxiv_id, record in records.items()
+                for name in record["keywords"]
+            ]
+            topic_links = [
+                {"topic_id": topic_ids[normalize_topic(topic)], "paper_id": paper_id, "added_at": now}
+                for paper_id in ids
+            ]
+
+            if author_links:
+                conn.execute(insert(paper_authors_table), author_links)
+            if keyword_links:
+                conn.execute(insert(paper_keywords_table), keyword_links)
+            conn.execute(insert(topic_papers_table).on_conflict_do_nothing(), topic_links)
+
+        return len(records)
+
+    def search_papers(self, keyword=None, since=None, author=None, topic=None, limit=50):
+        """
+        Finds papers by keyword, publication date, author and/or topic, newest first.
+
+        Args:
+            keyword (str): Keyword (e.g., arXiv category) of the papers.
+            since (str): Earliest publication date (ISO 8601, e.g., "2024-01-01").
+            author (str): Exact name of one of the authors.
+            topic (str): Topic the papers were fetched for.
+            limit (int): Maximum number of papers to return.
+
+        Returns:
+            list: Papers with their authors and keywords.
+        """
+        date = papers_table.c.publication_date
+        query = select(papers_table.c.id)
+
+        if keyword:
+            # Filter and sort on the keyword links, which carry the date, before touching the papers
+            links = paper_keywords_table
+            date = links.c.publication_date
+            keyword_id = select(keywords_table.c.id).where(keywords_table.c.name == keyword.strip().lower())
+            query = select(links.c.paper_id.label("id")).where(links.c.keyword_id == keyword_id.scalar_subquery())
+            id_column = links.c.paper_id
+        else:
+            query = query.select_from(papers_table)
+            id_column = papers_table.c.id
+
+        if since:
+            query = query.where(date >= since)
+        if author:
+            query = query.where(id_column.in_(
+                select(paper_authors_table.c.paper_id)
+                .join(authors_table, authors_table.c.id == paper_authors_table.c.author_id)
+                .where(authors_table.c.name == author.strip())))
+        if topic:
+            query = query.where(id_column.in_(
+                select(topic_papers_table.c.paper_id)
+                .join(topics_table, topics_table.c.id == topic_papers_table.c.topic_id)
+                .where(topics_table.c.name == normalize_topic(topic))))
+
+        query = query.order_by(date.desc()).limit(limit)
+
+        with self.engine.connect() as conn:
+            ids = [row.id for row in conn.execute(query)]
+            return self._papers(conn, ids)
+
+    def get_paper(self, arxiv_id):
+        """
+        Returns a paper with its authors, keywords and the topics it was fetched for, or None.
+        """
+        key, _ = catalog_id({"arxiv_id": arxiv_id})
+        with self.engine.connect() as conn:
+            paper_id = conn.execute(select(papers_table.c.id).where(papers_table.c.arxiv_id == key)).scalar()
+            if paper_id is None:
+                return None
+            paper = self._papers(conn, [paper_id])[0]
+            paper["topics"] = self._topics(conn, paper_id)
+            return paper
+
+    def topics_for_paper(self, arxiv_id):
+        """Returns the topics a paper was fetched for, or None if the paper is not in the catalog."""
+        key, _ = catalog_id({"arxiv_id": arxiv_id})
+        with self.engine.connect() as conn:
+            paper_id = conn.execute(select(papers_table.c.id).where(papers_table.c.arxiv_id == key)).scalar()
+            return None if paper_id is None else self._topics(conn, paper_id)
+
+    def stats(self):
+        with self.engine.connect() as conn:
+            return {
+                name: conn.execute(select(func.count()).select_from(table)).scalar()
+                for name, table in (("papers", papers_table), ("authors", authors_table),
+                                    ("keywords", keywords_table), ("topics", topics_table))
+            }
+
+    def _topics(self, conn, paper_id):
+        query = (select(topics_table.c.name, topic_papers_table.c.added_at)
+                 .join(topic_papers_table, topic_papers_table.c.topic_id == topics_table.c.id)
+                 .where(topic_papers_table.c.paper_id == paper_id)
+                 .order_by(topic_papers_table.c.added_at))
+        return [{"topic": row.name, "added_at": row.added_at} for row in conn.execute(query)]
+
+    def _papers(self, conn, ids):
+        """Loads papers with their authors and keywords, in the order of `ids`."""
+        if not ids:
+            return []
+
+        papers, authors, keywords = {}, {}, {}
+        for batch in batched(ids):
+            for row in conn.execute(select(papers_table).where(papers_table.c.id.in_(batch))):
+                papers[row.id] = {
+                    "arxiv_id": row.arxiv_id,
+                    "version": row.version,
+                    "title": row.title,
+                    "abstract": row.abstract,
+                    "publication_date": row.publication_date,
+                    "journal": row.journal,
+                    "source_link": row.source_link,
+                }
+            for row in conn.execute(
+                select(paper_authors_table.c.paper_id, authors_table.c.name)
+                .join(authors_table, authors_table.c.id == paper_authors_table.c.author_id)
+                .where(paper_authors_table.c.paper_id.in_(batch))
+                .order_by(paper_authors_table.c.position)
+            ):
+                authors.setdefault(row.paper_id, []).append(row.name)
+            for row in conn.execute(
+                select(paper_keywords_table.c.paper_id, keywords_table.c.name)
+                .join(keywords_table, keywords_table.c.id == paper_keywords_table.c.keyword_id)
+                .where(paper_keywords_table.c.paper_id.in_(batch))
+            ):
+                keywords.setdefault(row.paper_id, []).append(row.name)
+
+        return [
+            {**papers[paper_id], "authors": ", ".join(authors.get(paper_id, [])), "keywords": sorted(keywords.get(paper_id, []))}
+            for paper_id in ids if paper_id in papers
+        ]
+
+    def _upsert_names(self, conn, table, names):
+        """Inserts the missing names of a lookup table (authors, keywords, topics) and returns the id of each name."""
+        if not names:
+            return {}
+        conn.execute(insert(table).on_conflict_do_nothing(), [{"name": name} for name in names])
+        return self._ids(conn, table, table.c.name, names)
+
+    def _ids(self, conn, table, column, values):
+        ids = {}
+        for batch in batched(values):
+            for row in conn.execute(select(column, table.c.id).where(column.in_(batch))):
+                ids[row[0]] = row[1]
+        return ids
+
+
+# Shared catalog of fetched papers
+paper_catalog = PaperCatalog()
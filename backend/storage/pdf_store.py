@@ -0,0 +1,235 @@
+from collections import Counter
+from contextlib import contextmanager
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+
+# Directory of the shared paper store
+PDF_STORE_DIR = os.getenv("PDF_STORE_DIR", "pdf_store")
+# Disk budget of the store in bytes (5 GiB by default)
+PDF_STORE_MAX_BYTES = int(os.getenv("PDF_STORE_MAX_BYTES", str(5 * 1024 ** 3)))
+
+# New-style (2403.12345v2) and old-style (hep-th/9901001v1) arXiv identifiers
+ARXIV_ID_PATTERN = re.compile(r"(\d{4}\.\d{4,5}|[a-z\-]+(?:\.[a-z]{2})?/\d{7})(v\d+)?", re.IGNORECASE)
+
+
+def normalize_arxiv_id(link):
+    """
+    Extracts a normalized arXiv identifier and version from a link or id.
+
+    Args:
+        link (str): arXiv URL or id (e.g., "https://arxiv.org/abs/2403.12345v2", "arXiv:2403.12345").
+
+    Returns:
+        tuple: (arxiv_id, version), where version is None if the link is unversioned,
+               or None if the link does not contain an arXiv id.
+    """
+    match = ARXIV_ID_PATTERN.search(link)
+    if match is None:
+        return None
+    return match.group(1).lower(), match.group(2)
+
+
+def paper_key(link):
+    """Returns the store key of a paper: its arXiv id and version, or a hash of the link for other sources."""
+    arxiv_id = normalize_arxiv_id(link)
+    if arxiv_id is None:
+        return "url-" + hashlib.sha1(link.encode("utf-8")).hexdigest()
+
+    paper_id, version = arxiv_id
+    return paper_id.replace("/", "_") + (version or "")
+
+
+def entry_bytes(entry):
+    """Bytes taken by a stored paper: its PDF and its extracted text, if any."""
+    return entry["size"] + entry.get("text_size", 0)
+
+
+class PdfStore:
+    """
+    Content store of downloaded papers shared by all topics.
+    Each paper is stored once under its arXiv id and version; topics get hardlinked views of it.
+    The least recently used papers are evicted to keep the store (PDFs and their extracted text) under its
+    byte budget; papers pinned by a running review are never evicted.
+    """
+
+    def __init__(self, root: str = PDF_STORE_DIR, max_bytes: int = PDF_STORE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(root, "index.json")
+        self.lock = threading.Lock()
+        self.key_locks = {}  # key -> (lock, number of threads holding or waiting for it)
+        self.pins = Counter()  # key -> number of reviews using the paper
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(root, exist_ok=True)
+        self.entries = self._load_index()
+
+    def path(self, key):
+        """Path of a paper inside the store."""
+        return os.path.join(self.root, f"{key}.pdf")
+
+    def text_path(self, key):
+        """Path of the text extracted from a paper, cached next to its PDF."""
+        return os.path.join(self.root, f"{key}.pages.jsonl")
+
+    @contextmanager
+    def key_lock(self, key):
+        """Serializes downloads of the same paper across topics. The lock is dropped once no thread needs it."""
+        with self.lock:
+            lock, users = self.key_locks.get(key, (None, 0))
+            lock = lock or threading.Lock()
+            self.key_locks[key] = (lock, users + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self.lock:
+                lock, users = self.key_locks[key]
+                if users == 1:
+                    del self.key_locks[key]
+                else:
+                    self.key_locks[key] = (lock, users - 1)
+
+    @contextmanager
+    def pinned(self, keys):
+        """Keeps papers from being evicted while they are in use (downloaded, extracted, indexed)."""
+        keys = list(keys)
+        with self.lock:
+            self.pins.update(keys)
+        try:
+            yield
+        finally:
+            with self.lock:
+                for key in keys:
+                    self.pins[key] -= 1
+                    if not self.pins[key]:
+                        del self.pins[key]
+                # Papers added while others were pinned may have left the store over its budget
+                if self._evict():
+                    self._save_index()
+
+    def get(self, key):
+        """
+        Looks up a paper and marks it as recently used.
+
+        Returns:
+            str: Path of the stored paper, or None on a miss.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or not os.path.exists(self.path(key)):
+                self.entries.pop(key, None)
+                self.misses += 1
+                return None
+
+            entry["last_access"] = time.time()
+            self.hits += 1
+            return self.path(key)
+
+    def add(self, key):
+        """Registers a paper that was written to `self.path(key)` and evicts old papers if needed."""
+        with self.lock:
+            self.entries[key] = {
+                "size": os.path.getsize(self.path(key)),
+                "last_access": time.time(),
+                "views": self.entries.get(key, {}).get("views", []),
+            }
+            self._evict(keep=key)
+            self._save_index()
+
+    def add_text(self, key):
+        """Counts the text extracted from a paper (at `self.text_path(key)`) in the byte budget."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or not os.path.exists(self.text_path(key)):
+                return
+            entry["text_size"] = os.path.getsize(self.text_path(key))
+            self._evict(keep=key)
+            self._save_index()
+
+    def link(self, key, view_path):
+        """
+        Exposes a stored paper at `view_path` (e.g., inside a topic directory).
+        A hardlink is used when possible so the paper takes no extra space.
+        """
+        os.makedirs(os.path.dirname(view_path) or ".", exist_ok=True)
+
+        if not os.path.exists(view_path):
+            try:
+                os.link(self.path(key), view_path)
+            except OSError:
+                # Hardlinks are not supported across devices or on some filesystems
+                shutil.copyfile(self.path(key), view_path)
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and view_path not in entry["views"]:
+                entry["views"].append(view_path)
+                self._save_index()
+
+        return view_path
+
+    def stats(self):
+        with self.lock:
+            return {
+                "papers": len(self.entries),
+                "bytes": sum(map(entry_bytes, self.entries.values())),
+                "pinned": len(self.pins),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _evict(self, keep=None):
+        """
+        Removes least recently used papers (with their topic views and text) until the store fits its budget.
+
+        Returns:
+            int: Number of papers evicted.
+        """
+        total = sum(map(entry_bytes, self.entries.values()))
+        evicted = 0
+        if total <= self.max_bytes:
+            return evicted
+        for key in sorted(self.entries, key=lambda k: self.entries[k]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep or key in self.pins:
+                continue
+
+            entry = self.entries.pop(key)
+            for path in [self.path(key), self.text_path(key)] + entry["views"]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+            total -= entry_bytes(entry)
+            self.evictions += 1
+            evicted += 1
+        return evicted
+
+    def _load_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.index_path)
+
+
+# Shared paper store used by the download tool
+pdf_store = PdfStore()
@@ -0,0 +1,101 @@
+from contextlib import contextmanager
+import os
+import sqlite3
+import threading
+import time
+
+from utils import normalize_topic
+
+# SQLite file holding the generated literature reviews
+RESULT_CACHE_DB = os.getenv("RESULT_CACHE_DB", "workflows/db/results.db")
+# Seconds a generated literature review is served from the cache (7 days by default)
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", str(7 * 24 * 3600)))
+
+
+class ResultCache:
+    """
+    Persistent cache of finished literature reviews keyed by normalized topic and number of papers.
+    Each entry holds the review JSON and the path of its rendered PDF.
+    """
+
+    def __init__(self, db_file: str = RESULT_CACHE_DB, ttl: int = RESULT_CACHE_TTL):
+        self.db_file = db_file
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(db_file) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS topic_results (
+                    topic TEXT NOT NULL,
+                    max_papers INTEGER NOT NULL,
+                    review TEXT NOT NULL,
+                    metadata_file TEXT,  -- Unused since paper metadata moved to the paper catalog
+                    pdf_path TEXT,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (topic, max_papers)
+                )
+                """
+            )
+
+    def get(self, topic: str, max_papers: int):
+        """
+        Returns the cached review for a topic, or None if it is missing or expired.
+        The PDF is not checked, since it can be rendered again from the review.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT review, pdf_path, created_at FROM topic_results WHERE topic = ? AND max_papers = ?",
+                (normalize_topic(topic), max_papers),
+            ).fetchone()
+
+        fresh = row is not None and time.time() - row[2] < self.ttl
+
+        with self.lock:
+            if not fresh:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        return {"review": row[0], "pdf_path": row[1], "created_at": row[2]}
+
+    def latest(self, topic: str, max_papers: int):
+        """
+        Returns the last review stored for a topic even if it expired, or None.
+        Used to refresh a review incrementally instead of generating it again.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT review, pdf_path, created_at FROM topic_results WHERE topic = ? AND max_papers = ?",
+                (normalize_topic(topic), max_papers),
+            ).fetchone()
+        return None if row is None else {"review": row[0], "pdf_path": row[1], "created_at": row[2]}
+
+    def put(self, topic: str, max_papers: int, review: str, pdf_path: str):
+        """Stores a finished review, replacing any previous entry for the topic."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO topic_results (topic, max_papers, review, pdf_path, created_at) VALUES (?, ?, ?, ?, ?)",
+                (normalize_topic(topic), max_papers, review, pdf_path, time.time()),
+            )
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "ttl": self.ttl}
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file, timeout=30)
+        try:
+            with conn:  # Commits on success, rolls back on error
+                yield conn
+        finally:
+            conn.close()
+
+
+# Shared cache of generated literature reviews
+result_cache = ResultCache()
@@ -0,0 +1,187 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+from preview_from_json import generate_markdown_from_json, generate_html_from_json
+from telemetry import record_duration
+
+# Directory of the rendered literature review PDFs
+REVIEW_PDF_DIR = os.getenv("REVIEW_PDF_DIR", "../literature_reviews")
+# Number of processes rendering PDFs at the same time
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+# Seconds a download waits for a PDF that is still being rendered
+PDF_RENDER_DEADLINE = float(os.getenv("PDF_RENDER_DEADLINE", "120"))
+
+
+def review_id(topic, review):
+    """
+    Returns the id of a rendered review: a hash of its topic and content,
+    so identical reviews share one PDF and different reviews never overwrite each other.
+    """
+    content = json.dumps({"topic": topic, "review": review.model_dump()}, sort_keys=True)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+
+
+def render_review_pdf(topic, review, pdf_path):
+    """
+    Renders a literature review to a PDF. Runs in a worker process.
+
+    Args:
+        topic (str): Research topic of the review.
+        review (dict): The review, as dumped from a LiteratureReview.
+        pdf_path (str): Path of the PDF to write.
+    """
+    from pdf_from_json import generate_pdf_from_json
+
+    # Render to a per-process temporary file so readers never see a partial PDF
+    part_path = f"{pdf_path}.{os.getpid()}.part"
+    try:
+        generate_pdf_from_json(topic, review, part_path)
+    except Exception:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+
+    os.replace(part_path, pdf_path)
+
+
+# Writers of the previews of a review by file extension
+PREVIEW_WRITERS = {"md": generate_markdown_from_json, "html": generate_html_from_json}
+
+
+class ReviewPdfStore:
+    """
+    Content-addressed store of rendered literature reviews.
+    Rendering runs on a process pool off the request path; a review that is already rendered,
+    or being rendered, is never rendered again.
+    """
+
+    def __init__(self, root: str = REVIEW_PDF_DIR, max_workers: int = RENDER_WORKERS):
+        self.root = root
+        self.max_workers = max_workers
+        self.executor = None
+        self.lock = threading.Lock()
+        self.renders = {}  # review id -> Future of the render in flight
+        self.rendered = 0
+        self.hits = 0
+        self.failures = 0
+
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, review_id):
+        """Path of a rendered review."""
+        return os.path.join(self.root, f"{review_id}.pdf")
+
+    def preview_path(self, review_id, extension):
+        """Path of the Markdown ("md") or HTML ("html") preview of a review."""
+        return os.path.join(self.root, f"{review_id}.{extension}")
+
+    def write_previews(self, review_id, topic, review):
+        """Writes the missing previews of a review. Unlike the PDF they take milliseconds, even for large reviews."""
+        for extension, writer in PREVIEW_WRITERS.items():
+            path = self.preview_path(review_id, extension)
+            if os.path.exists(path):
+                continue
+            part_path = f"{path}.{threading.get_ident()}.part"
+            started_at = time.perf_counter()
+            writer(topic, review, part_path)
+            os.replace(part_path, path)
+            record_duration("preview.render", time.perf_counter() - started_at, format=extension)
+
+    def submit(self, topic, review):
+        """
+        Writes the previews of a review, and starts rendering its PDF unless it already exists or is being rendered.
+
+        Args:
+            topic (str): Research topic of the review.
+            review (LiteratureReview): The parsed review.
+
+        Returns:
+            str: The id of the review, used to download its PDF.
+        """
+        key = review_id(topic, review)
+        self.write_previews(key, topic, review)
+        with self.lock:
+            if key in self.renders or os.path.exists(self.path(key)):
+                self.hits += 1
+                return key
+
+            executor = self._get_executor()
+            try:
+                future = executor.submit(render_review_pdf, topic, review.model_dump(), self.path(key))
+            except BrokenProcessPool:
+                self._reset_executor(executor)
+                executor = self._get_executor()
+                future = executor.submit(render_review_pdf, topic, review.model_dump(), self.path(key))
+            self.renders[key] = future
+
+        started_at = time.perf_counter()
+        future.add_done_callback(lambda done: self._finish(key, executor, done, time.perf_counter() - started_at))
+        return key
+
+    def pending(self, review_id):
+        """Returns the Future of a render in flight, or None."""
+        with self.lock:
+            return self.renders.get(review_id)
+
+    def wait(self, review_id, timeout=None):
+        """
+        Waits for a review to be rendered.
+
+        Returns:
+            str: Path of the PDF, or None if it does not exist or could not be rendered.
+        """
+        future = self.pending(review_id)
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                return None
+
+        path = self.path(review_id)
+        return path if os.path.exists(path) else None
+
+    def stats(self):
+        with self.lock:
+            return {
+                "rendered": self.rendered,
+                "hits": self.hits,
+                "failures": self.failures,
+                "in_flight": len(self.renders),
+            }
+
+    def _finish(self, key, executor, future, duration):
+        succeeded = not future.cancelled() and future.exception() is None
+        with self.lock:
+            self.renders.pop(key, None)
+            if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+                self._reset_executor(executor)
+            if succeeded:
+                self.rendered += 1
+            else:
+                self.failures += 1
+        record_duration("pdf.render", duration, "ok" if succeeded else "error", review_id=key)
+
+    def _get_executor(self):
+        if self.executor is None:
+            # Spawned workers do not inherit the locks held by the server's threads
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self.executor
+
+    def _reset_executor(self, executor):
+        """
+        Drops a pool broken by a worker that died (e.g., killed while rendering a huge review),
+        so the next render creates a new one. Must be called with the lock held.
+        """
+        if self.executor is executor:
+            self.executor = None
+            executor.shutdown(wait=False)
+
+
+# Shared store of rendered literature reviews
+review_pdf_store = ReviewPdfStore()
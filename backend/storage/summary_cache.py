@@ -0,0 +1,150 @@
+from contextlib import contextmanager
+import os
+import sqlite3
+import threading
+import time
+
+# SQLite file holding the summaries of individual papers
+SUMMARY_CACHE_DB = os.getenv("SUMMARY_CACHE_DB", "workflows/db/summaries.db")
+# Size budget of the cached summaries in bytes (64 MiB by default)
+SUMMARY_CACHE_MAX_BYTES = int(os.getenv("SUMMARY_CACHE_MAX_BYTES", str(64 * 1024 ** 2)))
+# SQLite limits the number of parameters per statement
+SQL_BATCH_SIZE = 200
+
+
+class SummaryCache:
+    """
+    Persistent cache of the LLM summaries of individual papers, shared by all topics.
+    Entries are keyed by arXiv id and version, plus the model and prompt version that produced them,
+    so a new model or prompt never reuses stale summaries. The least recently used summaries
+    are evicted to keep the cache under its byte budget.
+    """
+
+    def __init__(self, db_file: str = SUMMARY_CACHE_DB, max_bytes: int = SUMMARY_CACHE_MAX_BYTES):
+        self.db_file = db_file
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(db_file) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS paper_summaries (
+                    arxiv_id TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (arxiv_id, version, model, prompt_version)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_paper_summaries_last_access ON paper_summaries (last_access)")
+
+    def get_many(self, keys, model: str, prompt_version: str):
+        """
+        Looks up the summaries of several papers and marks the hits as recently used.
+
+        Args:
+            keys (list): (arxiv_id, version) of each paper.
+            model (str): Id of the model that writes the summaries.
+            prompt_version (str): Version of the summarization prompt.
+
+        Returns:
+            dict: Summary of each paper found, by (arxiv_id, version).
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._connect() as conn:
+            for i in range(0, len(keys), SQL_BATCH_SIZE):
+                batch = keys[i:i + SQL_BATCH_SIZE]
+                rows = conn.execute(
+                    f"""
+                    SELECT arxiv_id, version, summary FROM paper_summaries
+                    WHERE model = ? AND prompt_version = ? AND (arxiv_id, version) IN (VALUES {", ".join(["(?, ?)"] * len(batch))})
+                    """,
+                    [model, prompt_version] + [part for key in batch for part in key],
+                ).fetchall()
+                found.update({(arxiv_id, version): summary for arxiv_id, version, summary in rows})
+
+            if found:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE paper_summaries SET last_access = ? WHERE arxiv_id = ? AND version = ? AND model = ? AND prompt_version = ?",
+                    [(now, arxiv_id, version, model, prompt_version) for arxiv_id, version in found],
+                )
+
+        with self.lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, summaries, model: str, prompt_version: str):
+        """
+        Stores the summaries of several papers and evicts old summaries if needed.
+
+        Args:
+            summaries (dict): Summary of each paper by (arxiv_id, version).
+            model (str): Id of the model that wrote the summaries.
+            prompt_version (str): Version of the summarization prompt.
+        """
+        if not summaries:
+            return
+
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO paper_summaries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(arxiv_id, version, model, prompt_version, summary, len(summary.encode("utf-8")), now)
+                 for (arxiv_id, version), summary in summaries.items()],
+            )
+            self._evict(conn)
+
+    def stats(self):
+        with self._connect() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM paper_summaries").fetchone()
+        with self.lock:
+            return {
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _evict(self, conn):
+        """Removes the least recently used summaries until the cache fits its budget."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM paper_summaries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = []
+        for rowid, size in conn.execute("SELECT rowid, size FROM paper_summaries ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((rowid,))
+            total -= size
+
+        conn.executemany("DELETE FROM paper_summaries WHERE rowid = ?", evicted)
+        with self.lock:
+            self.evictions += len(evicted)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file, timeout=30)
+        try:
+            with conn:  # Commits on success, rolls back on error
+                yield conn
+        finally:
+            conn.close()
+
+
+# Shared cache of paper summaries
+summary_cache = SummaryCache()
@@ -0,0 +1,144 @@
+import atexit
+import os
+import threading
+import time
+
+from agno.storage.workflow.sqlite import SqliteWorkflowStorage
+from agno.utils.log import logger
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.dialects import sqlite
+
+# Seconds concurrent writes are accumulated before they are committed together
+WORKFLOW_BATCH_INTERVAL = float(os.getenv("WORKFLOW_BATCH_INTERVAL", "0.05"))
+# Sessions inactive for longer than this are pruned (7 days by default)
+WORKFLOW_SESSION_RETENTION = int(os.getenv("WORKFLOW_SESSION_RETENTION", str(7 * 24 * 3600)))
+# Maximum number of sessions kept in the database
+WORKFLOW_MAX_SESSIONS = int(os.getenv("WORKFLOW_MAX_SESSIONS", "1000"))
+# Number of committed batches between two pruning passes
+PRUNE_EVERY_BATCHES = 100
+
+
+def configure_connection(dbapi_connection, connection_record):
+    """Enables WAL so readers never block on the writer, and waits on locks instead of failing."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.close()
+
+
+class PooledSqliteWorkflowStorage(SqliteWorkflowStorage):
+    """
+    SQLite workflow storage that can be shared by many concurrent workflow sessions.
+    Reads use pooled WAL connections, while every write goes through a single writer thread
+    that commits the sessions updated in the meantime as one batch and prunes old sessions.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        db_file: str,
+        batch_interval: float = WORKFLOW_BATCH_INTERVAL,
+        retention_seconds: int = WORKFLOW_SESSION_RETENTION,
+        max_sessions: int = WORKFLOW_MAX_SESSIONS,
+    ):
+        db_path = os.path.abspath(db_file)
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        super().__init__(table_name=table_name, db_url=f"sqlite:///{db_path}", mode="workflow")
+
+        event.listen(self.db_engine, "connect", configure_connection)
+        self.db_engine.dispose()  # Drop connections opened before the pragmas were registered
+        self.create()  # Create the table up front so concurrent sessions never race to create it
+
+        self.batch_interval = batch_interval
+        self.retention_seconds = retention_seconds
+        self.max_sessions = max_sessions
+
+        self.condition = threading.Condition()
+        self.pending = {}  # Sessions waiting to be written, by session id
+        self.writing = {}  # Sessions of the batch being committed
+        self.batches_written = 0
+
+        self.writer = threading.Thread(target=self._write_loop, name="workflow-storage-writer", daemon=True)
+        self.writer.start()
+        atexit.register(self.flush)
+
+    @property
+    def mode(self):
+        return super().mode
+
+    @mode.setter
+    def mode(self, value):
+        # Workflows set the mode on every run; only rebuild the table definition when it changes
+        if value != getattr(self, "_mode", None):
+            SqliteWorkflowStorage.mode.fset(self, value)
+
+    def upsert(self, session, create_and_retry: bool = True):
+        """Queues a session for the writer thread. Later updates of the same session replace earlier ones."""
+        with self.condition:
+            self.pending[session.session_id] = session
+            self.condition.notify_all()
+        return session
+
+    def read(self, session_id: str, user_id=None):
+        """Reads a session, including updates that are not committed yet."""
+        with self.condition:
+            session = self.pending.get(session_id) or self.writing.get(session_id)
+        if session is not None:
+            return session
+        return super().read(session_id=session_id, user_id=user_id)
+
+    def flush(self, timeout: float = 30):
+        """Blocks until every queued session has been committed."""
+        with self.condition:
+            self.condition.wait_for(lambda: not self.pending and not self.writing, timeout=timeout)
+
+    def prune(self):
+        """Deletes sessions older than the retention period and all but the most recent `max_sessions`."""
+        last_active = func.coalesce(self.table.c.updated_at, self.table.c.created_at)
+        cutoff = int(time.time()) - self.retention_seconds
+
+        with self.SqlSession() as sess, sess.begin():
+            sess.execute(delete(self.table).where(last_active < cutoff))
+
+            recent = select(self.table.c.session_id).order_by(last_active.desc()).limit(self.max_sessions)
+            sess.execute(delete(self.table).where(self.table.c.session_id.not_in(recent)))
+
+    def _write_loop(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending)
+
+            # Let writes from concurrent sessions accumulate so they share one commit
+            time.sleep(self.batch_interval)
+
+            with self.condition:
+                self.writing, self.pending = self.pending, {}
+
+            try:
+                self._commit(list(self.writing.values()))
+                self.batches_written += 1
+                if self.batches_written % PRUNE_EVERY_BATCHES == 1:
+                    self.prune()
+            except Exception as e:
+                logger.error(f"Failed to write {len(self.writing)} workflow sessions: {e}")
+
+            with self.condition:
+                self.writing = {}
+                self.condition.notify_all()
+
+    def _commit(self, sessions):
+        now = int(time.time())
+        with self.SqlSession() as sess, sess.begin():
+            for session in sessions:
+                values = dict(
+                    workflow_id=session.workflow_id,
+                    user_id=session.user_id,
+                    memory=session.memory,
+                    workflow_data=session.workflow_data,
+                    session_data=session.session_data,
+                    extra_data=session.extra_data,
+                )
+                stmt = sqlite.insert(self.table).values(session_id=session.session_id, **values)
+                stmt = stmt.on_conflict_do_update(index_elements=["session_id"], set_=dict(values, updated_at=now))
+                sess.execute(stmt)
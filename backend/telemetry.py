@@ -0,0 +1,238 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+
+from agno.utils.log import logger, set_log_level_to_debug
+
+# Log agent prompts and responses, tool calls, workflow payloads and every span (off by default: megabytes per review)
+VERBOSE_LOGGING = os.getenv("VERBOSE_LOGGING", "false").lower() in ("1", "true", "yes")
+# Upper bounds of the buckets of the duration histograms, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+# Prefix of the exported metric names
+METRIC_PREFIX = "research_copilot"
+
+if VERBOSE_LOGGING:
+    set_log_level_to_debug()
+
+# Innermost span open in this context
+_current_span = ContextVar("current_span", default=None)
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for value in labels.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+
+class Metrics:
+    """Process-wide counters and duration histograms, rendered in the Prometheus text format."""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.help = {}
+        self.counters = {}  # name -> {labels: value}
+        self.histograms = {}  # name -> {labels: [bucket counts..., sum, count]}
+
+    def describe(self, name, help_text):
+        self.help[name] = help_text
+
+    def inc(self, name, value=1, **labels):
+        """Adds `value` to a counter."""
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """Adds an observation to a histogram."""
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            state = series.setdefault(key, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for name, series in sorted(self.counters.items()):
+                full_name = f"{METRIC_PREFIX}_{name}"
+                lines.append(f"# HELP {full_name} {self.help.get(name, name)}")
+                lines.append(f"# TYPE {full_name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{full_name}{format_labels(dict(key))} {value}")
+
+            for name, series in sorted(self.histograms.items()):
+                full_name = f"{METRIC_PREFIX}_{name}"
+                lines.append(f"# HELP {full_name} {self.help.get(name, name)}")
+                lines.append(f"# TYPE {full_name} histogram")
+                for key, state in sorted(series.items()):
+                    labels = dict(key)
+                    for bound, count in zip(self.buckets, state):
+                        lines.append(f"{full_name}_bucket{format_labels({**labels, 'le': bound})} {count}")
+                    lines.append(f"{full_name}_bucket{format_labels({**labels, 'le': '+Inf'})} {state[-1]}")
+                    lines.append(f"{full_name}_sum{format_labels(labels)} {state[-2]}")
+                    lines.append(f"{full_name}_count{format_labels(labels)} {state[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+def render_stats(stats):
+    """
+    Renders the stats of the caches and stores (as reported by /stats) as Prometheus gauges.
+    Numbers become `research_copilot_<component>_<key>`; dicts of numbers get a `name` label.
+    """
+    lines = []
+    for component, values in stats.items():
+        for key, value in values.items():
+            name = f"{METRIC_PREFIX}_{component}_{key}"
+            if isinstance(value, bool) or value is None:
+                continue
+            if isinstance(value, (int, float)):
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value}")
+            elif isinstance(value, dict) and all(isinstance(item, (int, float)) for item in value.values()):
+                lines.append(f"# TYPE {name} gauge")
+                lines.extend(f"{name}{format_labels({'name': label})} {item}" for label, item in value.items())
+    return "\n".join(lines) + "\n"
+
+
+# Shared registry of all metrics
+metrics = Metrics()
+metrics.describe("span_duration_seconds", "Duration of the spans of a review (stages, agent runs, LLM calls, tools, downloads, parsing, rendering)")
+metrics.describe("llm_calls_total", "LLM calls by model, agent and outcome")
+metrics.describe("llm_tokens_total", "Tokens used by LLM calls by model, agent and type (prompt or completion)")
+metrics.describe("download_bytes_total", "Bytes of papers downloaded from arXiv")
+metrics.describe("downloads_total", "Papers requested for download by outcome (downloaded, cached or failed)")
+metrics.describe("cache_lookups_total", "Cache lookups by cache and result (hit or miss)")
+
+
+class Span:
+    """A timed unit of work. Counts recorded inside it (tokens, bytes, cache hits) are added to it and its parents."""
+
+    def __init__(self, name, parent=None, **attributes):
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:8]
+        self.attributes = attributes
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def find(self, attribute):
+        """Value of an attribute on this span or its closest ancestor that has it."""
+        span = self
+        while span is not None:
+            if attribute in span.attributes:
+                return span.attributes[attribute]
+            span = span.parent
+        return None
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Times the work inside the `with` block as a span, exported as a duration histogram on /metrics.
+    Spans nest, including across worker threads started with `progress.bind`.
+
+    Args:
+        name (str): Kind of work (e.g., "stage.reviewing", "llm.call"), used as a metric label.
+        **attributes: Details logged with the span (e.g., agent="paper-review-agent").
+    """
+    current = Span(name, _current_span.get(), **attributes)
+    token = _current_span.set(current)
+    started_at = time.perf_counter()
+    status = "ok"
+    try:
+        yield current
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        _current_span.reset(token)
+        finish(current, time.perf_counter() - started_at, status)
+
+
+def finish(current, duration, status):
+    """Exports a finished span."""
+    metrics.observe("span_duration_seconds", duration, span=current.name, status=status)
+    if VERBOSE_LOGGING:
+        logger.debug(json.dumps({
+            "span": current.name,
+            "trace_id": current.trace_id,
+            "span_id": current.span_id,
+            "parent_id": current.parent.span_id if current.parent is not None else None,
+            "duration_ms": round(duration * 1000, 3),
+            "status": status,
+            **current.attributes,
+            **current.counts,
+        }, default=str))
+
+
+def record_duration(name: str, duration: float, status: str = "ok", **attributes):
+    """Exports a span timed elsewhere, e.g. in another process."""
+    finish(Span(name, _current_span.get(), **attributes), duration, status)
+
+
+def traced(name: str):
+    """Decorator running every call of a function (e.g., an agent tool) in a span."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(**values):
+    """Adds counts (e.g., prompt_tokens=120) to the current span and all its parents."""
+    current = _current_span.get()
+    while current is not None:
+        with current.lock:
+            for key, value in values.items():
+                current.counts[key] = current.counts.get(key, 0) + value
+        current = current.parent
+
+
+def current_attribute(attribute):
+    """Value of an attribute of the innermost span that has it (e.g., the agent making an LLM call)."""
+    current = _current_span.get()
+    return current.find(attribute) if current is not None else None
+
+
+def run_agent(agent, message):
+    """Runs an agent in a span named after it."""
+    with span("agent.run", agent=agent.name):
+        return agent.run(message)
+
+
+def record_llm_usage(model: str, response):
+    """Accounts the tokens of an LLM response to the current span and the token counters."""
+    agent = current_attribute("agent") or "unknown"
+    usage = getattr(response, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    metrics.inc("llm_calls_total", model=model, agent=agent, status="ok")
+    metrics.inc("llm_tokens_total", prompt_tokens, model=model, agent=agent, type="prompt")
+    metrics.inc("llm_tokens_total", completion_tokens, model=model, agent=agent, type="completion")
+    count(llm_calls=1, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+
+def record_cache_lookup(cache: str, hits: int, misses: int):
+    """Accounts cache hits and misses to the current span and the cache counters."""
+    if hits:
+        metrics.inc("cache_lookups_total", hits, cache=cache, result="hit")
+    if misses:
+        metrics.inc("cache_lookups_total", misses, cache=cache, result="miss")
+    count(**{f"{cache}_hits": hits, f"{cache}_misses": misses})
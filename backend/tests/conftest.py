@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# The backend modules import each other as top-level modules, as when the server runs from the backend directory
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Keep the stores created when the backend modules are imported out of the source tree
+os.environ.setdefault("PDF_STORE_DIR", tempfile.mkdtemp(prefix="research-copilot-tests-"))
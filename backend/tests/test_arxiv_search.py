@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+
+import arxiv
+import pytest
+
+import tools.arxiv_search as arxiv_search
+from benchmarks.stub_arxiv import StubArxiv, fixture_paper, paper_id
+
+
+@pytest.fixture
+def stub(tmp_path):
+    server = StubArxiv(str(tmp_path), corpus_size=200).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(stub, monkeypatch):
+    monkeypatch.setattr(arxiv_search, "ARXIV_REQUEST_DELAY", 0)
+    client = arxiv_search.create_client(page_size=10)
+    client.query_url_format = stub.query_url_format
+    return client
+
+
+def test_search_returns_paper_records_in_ranking_order(stub, client):
+    records = arxiv_search.search_arxiv_papers("graph neural networks", max_papers=5, client=client)
+
+    expected = stub.matches("graph neural networks")[:5]
+    assert [record["arxiv_id"] for record in records] == [paper_id(index) for index in expected]
+
+    record, paper = records[0], fixture_paper(expected[0])
+    assert record["version"] == "v1"
+    assert record["title"] == paper["title"]
+    assert record["authors"] == ", ".join(paper["authors"])
+    assert record["keywords"] == paper["categories"]
+    assert record["publication_date"].startswith(paper["published"][:10])
+    assert record["source_link"] == f"http://arxiv.org/abs/{paper_id(expected[0])}v1"
+    assert record["pdf_url"] == f"{stub.url}/pdf/{paper_id(expected[0])}v1"
+
+
+def test_search_since_only_returns_papers_submitted_after(stub, client):
+    since = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    records = arxiv_search.search_arxiv_papers("graph neural networks", max_papers=5, client=client, since=since.timestamp())
+
+    expected = [index for index in stub.matches("graph neural networks") if fixture_paper(index)["published"][:10] >= "2025-06-01"][:5]
+    assert records
+    assert [record["arxiv_id"] for record in records] == [paper_id(index) for index in expected]
+    assert all(record["publication_date"] >= since.isoformat() for record in records)
+
+
+@pytest.mark.parametrize("entry_id, arxiv_id, version", [
+    ("http://arxiv.org/abs/2403.12345v12", "2403.12345", "v12"),
+    ("http://arxiv.org/abs/hep-th/9901001v2", "hep-th/9901001", "v2"),
+])
+def test_record_splits_id_and_version(entry_id, arxiv_id, version):
+    published = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    result = arxiv.Result(entry_id=entry_id, updated=published, published=published, title="A  Title",
+                          authors=[arxiv.Result.Author("A. Author")], summary="An\\nabstract.", categories=["cs.LG"])
+
+    record = arxiv_search.to_paper_record(result)
+
+    assert (record["arxiv_id"], record["version"]) == (arxiv_id, version)
+    assert record["title"] == "A Title"
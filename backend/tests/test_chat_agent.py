@@ -0,0 +1,31 @@
+import pytest
+from agno.storage.agent.sqlite import SqliteAgentStorage
+
+import agents.chat_agent as chat_agent
+from benchmarks.stub_llm import StubLLM
+
+
+@pytest.fixture
+def stub():
+    server = StubLLM(latency=0.01, jitter=0).start()
+    yield server
+    server.stop()
+
+
+def ask(stub, session_id, question):
+    agent = chat_agent.create_chat_agent(session_id=session_id)
+    agent.model.base_url = stub.url
+    agent.model.api_key = "test"
+    return agent.run(question)
+
+
+def test_conversation_continues_across_agent_instances(stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(chat_agent, "chat_storage", SqliteAgentStorage(table_name="chat", db_file=str(tmp_path / "chat.db")))
+
+    first = ask(stub, "conversation", "Which papers use graph networks?")
+    second = ask(stub, "conversation", "What datasets do they evaluate on?")
+    other = ask(stub, "other-conversation", "What datasets do they evaluate on?")
+
+    assert "Which papers use graph networks?" in [message.content for message in second.messages]
+    assert first.content in [message.content for message in second.messages]
+    assert "Which papers use graph networks?" not in [message.content for message in other.messages]
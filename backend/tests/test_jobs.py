@@ -0,0 +1,31 @@
+import threading
+
+import progress
+from jobs import JobManager
+
+
+def test_reviewed_papers_are_in_the_job_snapshot():
+    manager = JobManager(max_workers=1)
+    reviewed, finish = threading.Event(), threading.Event()
+
+    def review():
+        for index in range(2):
+            progress.report("paper", paper={"title": f"Paper {index}", "review": "Review."})
+        reviewed.set()
+        finish.wait(10)
+        return {"papers": 2}
+
+    job_id = manager.submit(review)
+    assert reviewed.wait(10)
+
+    job = manager.get(job_id)
+    assert job["status"] == "running"
+    assert job["papers_reviewed"] == 2
+    assert [paper["title"] for paper in job["papers"]] == ["Paper 0", "Paper 1"]
+
+    job["papers"].clear()  # Snapshots do not share the job's list
+    assert len(manager.get(job_id)["papers"]) == 2
+
+    finish.set()
+    manager.executor.shutdown(wait=True)
+    assert manager.get(job_id)["status"] == "completed"
@@ -0,0 +1,168 @@
+import threading
+import time
+
+import pytest
+from agno.models.message import Message
+
+from benchmarks.stub_llm import StubLLM
+from deadlines import DeadlineExceeded, deadline
+from llm_scheduler import HedgedCaller, LLMScheduler, ScheduledTogether, backoff_delay, llm_scheduler
+
+
+class RateLimited(Exception):
+    """Stand-in for the provider's 429 error, with the attributes the scheduler reads."""
+
+    status_code = 429
+
+    def __init__(self, retry_after=None):
+        super().__init__("Rate limit exceeded")
+        self.response = type("Response", (), {"headers": {"retry-after": str(retry_after)} if retry_after is not None else {}})()
+
+
+@pytest.fixture
+def stub_llm():
+    servers = []
+
+    def start(**kwargs):
+        server = StubLLM(latency=0.01, jitter=0, **kwargs).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def drained_scheduler(requests_per_minute):
+    """A scheduler whose request bucket is empty, so every call waits for a refill."""
+    scheduler = LLMScheduler(requests_per_minute=requests_per_minute, tokens_per_minute=1e9)
+    scheduler.requests.tokens = 0
+    return scheduler
+
+
+def test_interactive_call_is_not_queued_behind_throttled_batch_calls():
+    scheduler = drained_scheduler(requests_per_minute=600)  # One request every 0.1s
+    hedger = HedgedCaller(max_in_flight=4)
+    order = []
+
+    def call(name, priority):
+        scheduler.call(lambda: order.append(name), priority=priority, hedger=hedger, hedge_delay=0)
+
+    threads = [threading.Thread(target=call, args=(f"batch{i}", "batch")) for i in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.02)
+    threads.append(threading.Thread(target=call, args=("interactive", "interactive")))
+    threads[-1].start()
+    for thread in threads:
+        thread.join()
+
+    assert order[0] == "interactive"
+    assert sorted(order[1:]) == [f"batch{i}" for i in range(5)]
+
+
+def test_hedge_delay_starts_when_the_call_is_admitted():
+    scheduler = drained_scheduler(requests_per_minute=120)  # Admitted after about 0.5s
+    hedger = HedgedCaller(max_in_flight=4)
+
+    scheduler.call(lambda: time.sleep(0.1), hedger=hedger, hedge_delay=0.3)
+
+    assert hedger.stats()["hedges_fired"] == 0
+
+
+def test_hedge_is_skipped_when_the_scheduler_has_no_capacity():
+    scheduler = drained_scheduler(requests_per_minute=6)  # No capacity for a second request within the test
+    scheduler.requests.tokens = 1
+    hedger = HedgedCaller(max_in_flight=4)
+
+    assert scheduler.call(lambda: time.sleep(0.3) or "done", hedger=hedger, hedge_delay=0.1) == "done"
+
+    assert hedger.stats()["hedges_fired"] == 0
+    assert hedger.stats()["hedges_skipped"] == 1
+
+
+def test_slow_call_is_hedged_when_there_is_capacity():
+    scheduler = LLMScheduler(requests_per_minute=600, tokens_per_minute=1e9)
+    hedger = HedgedCaller(max_in_flight=4)
+    attempts = []
+
+    def slow_then_fast():
+        attempts.append(time.monotonic())
+        time.sleep(1.0 if len(attempts) == 1 else 0.01)
+        return len(attempts)
+
+    assert scheduler.call(slow_then_fast, hedger=hedger, hedge_delay=0.1) == 2
+    assert hedger.stats()["hedges_fired"] == 1
+    assert hedger.stats()["hedge_wins"] == 1
+
+
+def test_rate_limited_requests_are_retried_after_retry_after(stub_llm):
+    stub = stub_llm(rate_limit_every=2, retry_after=0.3)  # The second request is rejected
+    model = ScheduledTogether(id="stub", api_key="test", base_url=stub.url, hedge_delay=0)
+    retries_before = llm_scheduler.stats()["retries"]
+
+    started_at = time.monotonic()
+    for _ in range(2):
+        response = model.invoke([Message(role="user", content="Hello")])
+        assert response.choices[0].message.content
+
+    assert stub.stats()["rate_limited"] == 1
+    assert stub.stats()["requests"] == 2
+    assert llm_scheduler.stats()["retries"] - retries_before == 1
+    assert time.monotonic() - started_at >= 0.3
+
+
+def test_rate_limited_call_fails_after_max_retries():
+    scheduler = LLMScheduler(requests_per_minute=6000, tokens_per_minute=1e9, max_retries=2)
+    attempts = []
+
+    def rejected():
+        attempts.append(time.monotonic())
+        raise RateLimited(retry_after=0.01)
+
+    with pytest.raises(RateLimited):
+        scheduler.call(rejected)
+
+    assert len(attempts) == 3
+    assert scheduler.stats()["retries"] == 2
+    assert scheduler.stats()["failures"] == 1
+
+
+def test_backoff_stops_at_the_deadline():
+    scheduler = LLMScheduler(requests_per_minute=6000, tokens_per_minute=1e9)
+
+    def rejected():
+        raise RateLimited(retry_after=5)
+
+    started_at = time.monotonic()
+    with pytest.raises(DeadlineExceeded), deadline(1.0, "test"):
+        scheduler.call(rejected)
+
+    # The call gives up right away instead of sleeping past the deadline
+    assert time.monotonic() - started_at < 0.5
+    assert scheduler.stats()["retries"] == 0
+
+
+def test_backoff_without_retry_after_is_exponential_with_jitter():
+    for attempt in range(8):
+        delays = [backoff_delay(attempt, base=1.0, maximum=60.0) for _ in range(200)]
+        assert all(0 <= delay <= min(60.0, 2 ** attempt) for delay in delays)
+    assert max(backoff_delay(10, base=1.0, maximum=60.0) for _ in range(200)) <= 60.0
+
+
+def test_waiting_calls_are_admitted_by_priority_then_arrival():
+    scheduler = drained_scheduler(requests_per_minute=600)
+    order = []
+
+    def call(name, priority):
+        scheduler.call(lambda: order.append(name), priority=priority)
+
+    threads = []
+    for name, priority in [("batch0", "batch"), ("batch1", "batch"), ("batch2", "batch"), ("interactive", "interactive")]:
+        threads.append(threading.Thread(target=call, args=(name, priority)))
+        threads[-1].start()
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join()
+
+    assert order == ["interactive", "batch0", "batch1", "batch2"]
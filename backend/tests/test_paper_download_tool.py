@@ -0,0 +1,70 @@
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tools.paper_download_tool import download_file
+
+PDF = b"%PDF-1.4\n" + b"x" * 5000 + b"\n%%EOF\n"
+
+
+@pytest.fixture
+def server():
+    """PDF server supporting single byte ranges, answering 416 (optionally without Content-Range) past the end."""
+    state = {"content_range_on_416": True}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            match = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range", ""))
+            start = int(match.group(1)) if match else 0
+            if start >= len(PDF):
+                self.send_response(416)
+                if state["content_range_on_416"]:
+                    self.send_header("Content-Range", f"bytes */{len(PDF)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206 if match else 200)
+            if match:
+                self.send_header("Content-Range", f"bytes {start}-{len(PDF) - 1}/{len(PDF)}")
+            self.send_header("Content-Length", str(len(PDF) - start))
+            self.end_headers()
+            self.wfile.write(PDF[start:])
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = f"http://127.0.0.1:{httpd.server_address[1]}/paper.pdf"
+    yield state
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def download_with_part(server, tmp_path, part):
+    path = tmp_path / "paper.pdf"
+    (tmp_path / "paper.pdf.part").write_bytes(part)
+    received = download_file(server["url"], str(path))
+    assert not (tmp_path / "paper.pdf.part").exists()
+    return path.read_bytes(), received
+
+
+def test_truncated_part_is_resumed(server, tmp_path):
+    assert download_with_part(server, tmp_path, PDF[:1000]) == (PDF, len(PDF) - 1000)
+
+
+def test_complete_part_is_kept(server, tmp_path):
+    assert download_with_part(server, tmp_path, PDF) == (PDF, 0)
+
+
+def test_stale_part_longer_than_the_file_is_downloaded_again(server, tmp_path):
+    assert download_with_part(server, tmp_path, PDF + b"stale") == (PDF, len(PDF))
+
+
+def test_stale_part_is_checked_when_416_has_no_content_range(server, tmp_path):
+    server["content_range_on_416"] = False
+    assert download_with_part(server, tmp_path, b"%PDF-1.3\n" + b"y" * len(PDF)) == (PDF, len(PDF))
+    assert download_with_part(server, tmp_path, PDF + b"\n") == (PDF + b"\n", 0)  # Looks whole, so it is kept
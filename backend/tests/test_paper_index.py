@@ -0,0 +1,63 @@
+import pickle
+import threading
+
+import knowledge.paper_index as paper_index
+from knowledge.paper_index import PaperIndex
+
+PAGES = ["Graph neural networks propagate messages between the nodes of molecules.",
+         "Transformers attend over all the tokens of a protein sequence."]
+
+
+def test_papers_added_between_snapshots_share_one(tmp_path, monkeypatch):
+    saves = []
+    index = PaperIndex(str(tmp_path), snapshot_interval=3600)
+    monkeypatch.setattr(index, "save", lambda: saves.append(len(index)))
+
+    index.add_papers([("a", "Graphs", PAGES[:1], {})])
+    index.add_papers([("b", "Proteins", PAGES[1:], {})])
+
+    assert saves == []
+    assert index.snapshot_timer is not None
+    index.snapshot_timer.cancel()
+
+
+def test_index_without_snapshot_is_rebuilt_from_chunks(tmp_path):
+    index = PaperIndex(str(tmp_path), snapshot_interval=3600)
+    index.add_papers([("a", "Graphs", PAGES[:1], {}), ("b", "Proteins", PAGES[1:], {})])
+    index.snapshot_timer.cancel()
+
+    reloaded = PaperIndex(str(tmp_path))
+
+    assert reloaded.papers == {"a", "b"}
+    assert reloaded.search("protein transformers", top_k=1)[0]["paper"] == "b"
+
+
+def test_search_does_not_wait_for_snapshot(tmp_path, monkeypatch):
+    index = PaperIndex(str(tmp_path), snapshot_interval=0)
+    index.add_papers([("a", "Graphs", PAGES[:1], {})])
+
+    pickling, release = threading.Event(), threading.Event()
+    dump = pickle.dump
+
+    def slow_dump(*args, **kwargs):
+        pickling.set()
+        release.wait(10)
+        dump(*args, **kwargs)
+
+    monkeypatch.setattr(paper_index.pickle, "dump", slow_dump)
+    saver = threading.Thread(target=index.add_papers, args=([("b", "Proteins", PAGES[1:], {})],))
+    saver.start()
+    assert pickling.wait(10)
+
+    try:
+        results = []
+        searcher = threading.Thread(target=lambda: results.extend(index.search("graph molecules")))
+        searcher.start()
+        searcher.join(5)
+        assert not searcher.is_alive()
+        assert results[0]["paper"] == "a"
+    finally:
+        release.set()
+        saver.join()
+
+    assert PaperIndex(str(tmp_path)).papers == {"a", "b"}
@@ -0,0 +1,36 @@
+import pytest
+
+from pdf_from_json import generate_pdf_from_json
+from review_model import parse_review
+
+REVIEW = {
+    "papers": [{"title": "Q&A <Models>", "authors": "A. Author", "publication_date": "2024-01-01",
+                "keywords": ["cs.CL"], "source_link": "http://arxiv.org/abs/2401.00001v1",
+                "summary": "Summary.", "review": "Review."}],
+    "conclusion": "Conclusion.",
+    "references": ["A. Author, 'Q&A <Models>', arXiv:2401.00001, 2024."],
+}
+
+
+def test_markup_in_topic_is_rendered_as_text(tmp_path):
+    path = tmp_path / "review.pdf"
+    generate_pdf_from_json("R&D <b>agents", parse_review(REVIEW), str(path))
+
+    assert path.read_bytes().startswith(b"%PDF")
+
+
+def render_source(tmp_path, source_link):
+    path = tmp_path / "review.pdf"
+    generate_pdf_from_json("agents", parse_review({**REVIEW, "papers": [{**REVIEW["papers"][0], "source_link": source_link}]}), str(path))
+    return path.read_bytes()
+
+
+def test_source_link_with_quotes_is_linked(tmp_path):
+    pdf = render_source(tmp_path, "https://example.org/it's\"quoted\"")
+
+    assert b"/URI (https://example.org/it's\"quoted\")" in pdf
+
+
+@pytest.mark.parametrize("source_link", ["javascript:alert(1)", "data:text/html,<script>x</script>"])
+def test_other_source_links_are_rendered_as_text(tmp_path, source_link):
+    assert b"/URI" not in render_source(tmp_path, source_link)
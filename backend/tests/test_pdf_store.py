@@ -0,0 +1,69 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from storage.pdf_store import PdfStore
+
+
+def store_paper(store, key, size, text_size=0):
+    with open(store.path(key), "wb") as file:
+        file.write(b"x" * size)
+    store.add(key)
+    if text_size:
+        with open(store.text_path(key), "wb") as file:
+            file.write(b"x" * text_size)
+        store.add_text(key)
+
+
+def test_key_locks_are_dropped_once_released(tmp_path):
+    store = PdfStore(str(tmp_path))
+    running = []
+    overlaps = []
+    lock = threading.Lock()
+
+    def download(index):
+        key = f"paper-{index % 4}"
+        with store.key_lock(key):
+            with lock:
+                overlaps.append(key in running)
+                running.append(key)
+            with lock:
+                running.remove(key)
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(download, range(400)))
+
+    assert not any(overlaps)
+    assert store.key_locks == {}
+
+
+def test_pinned_papers_are_not_evicted(tmp_path):
+    store = PdfStore(str(tmp_path), max_bytes=250)
+    store_paper(store, "old", 100)
+
+    with store.pinned(["old"]):
+        store_paper(store, "new", 100)
+        store_paper(store, "newer", 100)
+        assert set(store.entries) == {"old", "newer"}  # "new" was the least recently used unpinned paper
+
+        store.max_bytes = 150
+        store_paper(store, "newest", 100)
+        assert set(store.entries) == {"old", "newest"}  # Over budget until "old" is unpinned
+        assert store.stats()["pinned"] == 1
+
+    # Once unpinned, the store is brought back under its budget
+    assert set(store.entries) == {"newest"}
+    assert not (tmp_path / "old.pdf").exists()
+    assert store.pins == {}
+
+
+def test_extracted_text_counts_in_the_budget(tmp_path):
+    store = PdfStore(str(tmp_path), max_bytes=300)
+    store_paper(store, "a", 100, text_size=100)
+    store_paper(store, "b", 100)
+    assert store.stats()["bytes"] == 300
+
+    store_paper(store, "c", 10)
+
+    assert set(store.entries) == {"b", "c"}
+    assert not (tmp_path / "a.pages.jsonl").exists()
+    assert PdfStore(str(tmp_path), max_bytes=300).stats()["bytes"] == 110
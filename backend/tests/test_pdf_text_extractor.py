@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+import tools.pdf_text_extractor as pdf_text_extractor
+from benchmarks.stub_arxiv import paper_id, render_fixture_pdf
+from storage.pdf_store import PdfStore
+
+
+def crash(pdf_path, text_path):
+    """Extraction killing its worker, as the OOM killer would on a huge PDF."""
+    os._exit(1)
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    store = PdfStore(str(tmp_path / "store"))
+    monkeypatch.setattr(pdf_text_extractor, "pdf_store", store)
+    monkeypatch.setattr(pdf_text_extractor, "EXTRACTION_WORKERS", 1)
+    yield store
+    if pdf_text_extractor._executor is not None:
+        pdf_text_extractor.reset_executor(pdf_text_extractor._executor)
+
+
+def downloaded_paper(tmp_path, index):
+    path = tmp_path / f"paper-{index}.pdf"
+    path.write_bytes(render_fixture_pdf(index, pages=4, image_kb=0))
+    return {"pdf_url": f"http://arxiv.org/abs/{paper_id(index)}v1", "pdf_path": str(path), "abstract": "Abstract."}
+
+
+def test_crashed_worker_falls_back_to_abstract_and_pool_is_recreated(tmp_path, monkeypatch):
+    extract_pdf_text = pdf_text_extractor.extract_pdf_text
+    monkeypatch.setattr(pdf_text_extractor, "extract_pdf_text", crash)
+    paper = downloaded_paper(tmp_path, 0)
+    pdf_text_extractor.extract_papers_text([paper])
+
+    assert paper["text_path"] == ""
+    assert "excerpts" not in paper
+    assert pdf_text_extractor._executor is None
+
+    monkeypatch.setattr(pdf_text_extractor, "extract_pdf_text", extract_pdf_text)
+    paper = downloaded_paper(tmp_path, 1)
+    pdf_text_extractor.extract_papers_text([paper])
+
+    assert os.path.exists(paper["text_path"])
+    assert paper["excerpts"]
+
+
+def test_submit_to_broken_pool_retries_on_new_pool(tmp_path):
+    broken = pdf_text_extractor.get_executor()
+    with pytest.raises(pdf_text_extractor.BrokenProcessPool):
+        broken.submit(os._exit, 1).result()
+
+    paper = downloaded_paper(tmp_path, 2)
+    pdf_text_extractor.extract_papers_text([paper])
+
+    assert pdf_text_extractor._executor is not broken
+    assert os.path.exists(paper["text_path"])
+    assert paper["excerpts"]
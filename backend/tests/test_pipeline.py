@@ -0,0 +1,49 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pipeline
+import workflows.research_workflow as research_workflow
+
+
+def test_topic_without_papers_is_reported_as_not_found(monkeypatch):
+    monkeypatch.setattr(research_workflow, "search_arxiv_papers", lambda *args, **kwargs: [])
+
+    assert pipeline.run_review_workflow("a topic without papers", 3) == {"error": "No papers found"}
+
+
+def concurrent_reviews(monkeypatch, *options):
+    """Requests reviews of one topic with each of `options` at the same time; returns the runs and the results."""
+    runs, started, release = [], threading.Event(), threading.Event()
+
+    def run_review_workflow(topic, max_papers, review_mode="single", search_mode="direct", previous=None, papers=None):
+        runs.append((review_mode, search_mode))
+        started.set()
+        release.wait(10)
+        return {"review_mode": review_mode}
+
+    monkeypatch.setattr(pipeline, "run_review_workflow", run_review_workflow)
+    with ThreadPoolExecutor(max_workers=len(options)) as executor:
+        futures = [executor.submit(pipeline.generate_literature_review, "Graph Networks", 5, force_refresh=True, **options[0])]
+        assert started.wait(10)
+        futures += [executor.submit(pipeline.generate_literature_review, "graph  networks", 5, force_refresh=True, **kwargs)
+                    for kwargs in options[1:]]
+        time.sleep(0.2)  # Let the later requests join the first run if they are going to
+        release.set()
+        return runs, [future.result() for future in futures]
+
+
+def test_identical_requests_share_a_run(monkeypatch):
+    runs, results = concurrent_reviews(monkeypatch, {"review_mode": "single"}, {"review_mode": "single"})
+
+    assert runs == [("single", "direct")]
+    assert [result["coalesced"] for result in results] == [False, True]
+
+
+def test_requests_with_other_options_do_not_share_a_run(monkeypatch):
+    runs, results = concurrent_reviews(monkeypatch, {"review_mode": "single"}, {"review_mode": "map_reduce"},
+                                       {"review_mode": "single", "search_mode": "agent"})
+
+    assert sorted(runs) == [("map_reduce", "direct"), ("single", "agent"), ("single", "direct")]
+    assert [result["review_mode"] for result in results] == ["single", "map_reduce", "single"]
+    assert not any(result["coalesced"] for result in results)
@@ -0,0 +1,35 @@
+import pytest
+
+from preview_from_json import generate_html_from_json, generate_markdown_from_json
+from review_model import parse_review
+
+
+def review(source_link):
+    return parse_review({
+        "papers": [{"title": "Graph Networks", "authors": "A. Author", "publication_date": "2024-01-01",
+                    "keywords": ["cs.LG"], "source_link": source_link, "summary": "Summary.", "review": "Review."}],
+        "conclusion": "Conclusion.",
+        "references": [],
+    })
+
+
+def render(writer, tmp_path, source_link):
+    path = tmp_path / "preview"
+    writer("graphs", review(source_link), str(path))
+    return path.read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("source_link", ["http://arxiv.org/abs/2401.00001v1", "HTTPS://arxiv.org/abs/2401.00001v1"])
+def test_web_links_are_clickable(tmp_path, source_link):
+    assert f'<a href="{source_link}">' in render(generate_html_from_json, tmp_path, source_link)
+    assert f"<{source_link}>" in render(generate_markdown_from_json, tmp_path, source_link)
+
+
+@pytest.mark.parametrize("source_link", ["javascript:alert(1)", " JavaScript:alert(1)", "data:text/html,<script>x</script>"])
+def test_other_links_are_rendered_as_text(tmp_path, source_link):
+    html = render(generate_html_from_json, tmp_path, source_link)
+    markdown = render(generate_markdown_from_json, tmp_path, source_link)
+
+    assert "href" not in html
+    assert "<script>" not in html
+    assert f"<{source_link}>" not in markdown
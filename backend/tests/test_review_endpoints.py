@@ -0,0 +1,32 @@
+import time
+from concurrent.futures import Future
+
+from fastapi.testclient import TestClient
+
+import main
+from storage.review_pdfs import ReviewPdfStore
+
+REVIEW_ID = "0" * 32
+
+
+def test_pdf_still_rendering_is_answered_right_away_with_wait_0(tmp_path, monkeypatch):
+    store = ReviewPdfStore(str(tmp_path))
+    store.renders[REVIEW_ID] = Future()  # A render that never finishes
+    monkeypatch.setattr(main, "review_pdf_store", store)
+
+    started_at = time.perf_counter()
+    response = TestClient(main.app).get(f"/reviews/{REVIEW_ID}.pdf", params={"wait": 0})
+
+    assert response.status_code == 504
+    assert time.perf_counter() - started_at < 2
+
+
+def test_rendered_pdf_is_downloaded_with_wait_0(tmp_path, monkeypatch):
+    store = ReviewPdfStore(str(tmp_path))
+    (tmp_path / f"{REVIEW_ID}.pdf").write_bytes(b"%PDF-1.4 review")
+    monkeypatch.setattr(main, "review_pdf_store", store)
+
+    response = TestClient(main.app).get(f"/reviews/{REVIEW_ID}.pdf", params={"wait": 0})
+
+    assert response.status_code == 200
+    assert response.content == b"%PDF-1.4 review"
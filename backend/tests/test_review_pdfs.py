@@ -0,0 +1,63 @@
+import os
+import time
+
+import pytest
+
+import storage.review_pdfs as review_pdfs
+from review_model import parse_review
+from storage.review_pdfs import ReviewPdfStore
+
+
+def crash(topic, review, pdf_path):
+    """Render killing its worker, as the OOM killer would on a huge review."""
+    os._exit(1)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ReviewPdfStore(str(tmp_path), max_workers=1)
+    yield store
+    if store.executor is not None:
+        store.executor.shutdown()
+
+
+def review(title="Graph Networks"):
+    return parse_review({
+        "papers": [{"title": title, "authors": "A. Author", "publication_date": "2024-01-01",
+                    "keywords": ["cs.LG"], "source_link": "http://arxiv.org/abs/2401.00001v1",
+                    "summary": "Summary.", "review": "Review."}],
+        "conclusion": "Conclusion.",
+        "references": ["A. Author, 'Graph Networks', arXiv:2401.00001, 2024."],
+    })
+
+
+def settle(store, timeout=30):
+    """Waits for the done callbacks of the renders in flight, which may run after their results are set."""
+    deadline = time.monotonic() + timeout
+    while store.stats()["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_crashed_render_fails_and_pool_is_recreated(store, monkeypatch):
+    monkeypatch.setattr(review_pdfs, "render_review_pdf", crash)
+    key = store.submit("graphs", review())
+    assert store.wait(key, timeout=30) is None
+    settle(store)
+
+    assert store.stats()["failures"] == 1
+    assert store.executor is None
+
+    monkeypatch.undo()
+    key = store.submit("graphs", review())
+    assert store.wait(key, timeout=60) == store.path(key)
+
+
+def test_submit_to_broken_pool_renders_on_new_pool(store):
+    broken = store._get_executor()
+    with pytest.raises(review_pdfs.BrokenProcessPool):
+        broken.submit(os._exit, 1).result()
+
+    key = store.submit("graphs", review("Broken Pools"))
+
+    assert store.executor is not broken
+    assert store.wait(key, timeout=60) == store.path(key)
@@ -0,0 +1,78 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agno.storage.workflow.sqlite import SqliteWorkflowStorage
+from agno.workflow import RunResponse, Workflow
+from sqlalchemy import update
+
+import storage.workflow_storage as workflow_storage
+from storage.workflow_storage import PooledSqliteWorkflowStorage
+
+
+class CountingWorkflow(Workflow):
+    """Workflow saving its session after every step, like a review saving each stage."""
+
+    def run(self, steps: int) -> RunResponse:
+        for step in range(steps):
+            self.session_state["steps"] = step + 1
+            self.write_to_storage()
+        return RunResponse(content=str(steps))
+
+
+def create_storage(tmp_path, **kwargs):
+    return PooledSqliteWorkflowStorage(table_name="workflows", db_file=str(tmp_path / "workflows.db"), **kwargs)
+
+
+def test_concurrent_workflows_persist_every_session_without_lock_errors(tmp_path, monkeypatch):
+    errors = []
+    monkeypatch.setattr(workflow_storage.logger, "error", lambda message, *args, **kwargs: errors.append(message))
+    storage = create_storage(tmp_path)
+
+    def run(number):
+        workflow = CountingWorkflow(session_id=f"session-{number}", storage=storage)
+        return workflow.run(steps=5).content
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        results = list(executor.map(run, range(64)))
+    storage.flush()
+
+    assert results == ["5"] * 64
+    assert errors == []
+
+    # Every session is committed, with its last state, as seen by a separate unpooled connection
+    reader = SqliteWorkflowStorage(table_name="workflows", db_file=str(tmp_path / "workflows.db"), mode="workflow")
+    sessions = {session.session_id: session for session in reader.get_all_sessions()}
+    assert len(sessions) == 64
+    assert all(session.session_data["session_state"]["steps"] == 5 for session in sessions.values())
+    # Writes of concurrent sessions are committed together
+    assert storage.batches_written < 64 * 5
+
+
+def test_prune_keeps_the_most_recent_sessions(tmp_path):
+    storage = create_storage(tmp_path, max_sessions=10)
+    for number in range(30):
+        CountingWorkflow(session_id=f"session-{number:02d}", storage=storage).run(steps=1)
+        storage.flush()
+        # Distinct activity times, oldest first
+        with storage.SqlSession() as sess, sess.begin():
+            sess.execute(update(storage.table).where(storage.table.c.session_id == f"session-{number:02d}")
+                         .values(updated_at=int(time.time()) - 1000 + number))
+
+    storage.prune()
+
+    remaining = sorted(session.session_id for session in storage.get_all_sessions())
+    assert remaining == [f"session-{number:02d}" for number in range(20, 30)]
+
+
+def test_prune_deletes_sessions_past_the_retention_period(tmp_path):
+    storage = create_storage(tmp_path, retention_seconds=3600)
+    for number in range(4):
+        CountingWorkflow(session_id=f"session-{number}", storage=storage).run(steps=1)
+    storage.flush()
+    with storage.SqlSession() as sess, sess.begin():
+        sess.execute(update(storage.table).where(storage.table.c.session_id.in_(["session-0", "session-1"]))
+                     .values(created_at=int(time.time()) - 7200, updated_at=int(time.time()) - 7200))
+
+    storage.prune()
+
+    assert sorted(session.session_id for session in storage.get_all_sessions()) == ["session-2", "session-3"]
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+import arxiv
+import os
+
+# arXiv API endpoint; point it at a local feed (e.g., "http://127.0.0.1:8080/api/query?{}") for offline runs
+ARXIV_API_URL = os.getenv("ARXIV_API_URL", arxiv.Client.query_url_format)
+# Number of results requested per API page
+ARXIV_PAGE_SIZE = 100
+# Seconds between the requests of a client, as asked by the arXiv API terms of use
+ARXIV_REQUEST_DELAY = float(os.getenv("ARXIV_REQUEST_DELAY", "3"))
+
+
+class ArxivClient(arxiv.Client):
+    """arXiv API client using the configured endpoint."""
+    query_url_format = ARXIV_API_URL
+
+
+def create_client(page_size=ARXIV_PAGE_SIZE):
+    return ArxivClient(page_size=page_size, delay_seconds=ARXIV_REQUEST_DELAY, num_retries=3)
+
+
+def to_paper_record(result):
+    """
+    Converts an arXiv search result into a structured paper record.
+
+    Args:
+        result (arxiv.Result): Result returned by the arXiv API.
+
+    Returns:
+        dict: Paper metadata in the format used by the review (title, authors, publication_date, ...).
+    """
+    short_id = result.get_short_id()  # e.g., "2403.12345v2"
+    arxiv_id, _, version = short_id.rpartition("v")
+
+    return {
+        "arxiv_id": arxiv_id,
+        "version": f"v{version}",
+        "title": " ".join(result.title.split()),
+        "authors": ", ".join(author.name for author in result.authors),
+        "abstract": " ".join(result.summary.split()),
+        "publication_date": result.published.isoformat(),
+        "keywords": result.categories,
+        "journal": result.journal_ref or "",
+        "source_link": result.entry_id,
+        "pdf_url": result.pdf_url,
+    }
+
+
+def search_arxiv_papers(topic, max_papers=5, client=None, since=None):
+    """
+    Searches arXiv for the most relevant papers on a topic.
+
+    Args:
+        topic (str): Research topic to search for.
+        max_papers (int): Maximum number of papers to return.
+        client (arxiv.Client): Client to use; one for the configured endpoint is created if not given.
+        since (float): Optional UNIX timestamp; only papers submitted after it are returned.
+
+    Returns:
+        list: Paper records, most relevant first.
+    """
+    client = client or create_client(page_size=min(max_papers, ARXIV_PAGE_SIZE))
+    query = topic
+    if since is not None:
+        start = datetime.fromtimestamp(since, tz=timezone.utc).strftime("%Y%m%d%H%M")
+        end = datetime.now(tz=timezone.utc).strftime("%Y%m%d%H%M")
+        query = f"({topic}) AND submittedDate:[{start} TO {end}]"
+    search = arxiv.Search(query=query, max_results=max_papers, sort_by=arxiv.SortCriterion.Relevance)
+    return [to_paper_record(result) for result in client.results(search)]
+
@@ -1,6 +1,161 @@
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from storage.pdf_store import pdf_store, paper_key
+import progress
 import requests
+import telemetry
 import os
+import re
 
+# Number of papers downloaded at the same time
+MAX_CONCURRENT_DOWNLOADS = int(os.getenv("MAX_CONCURRENT_DOWNLOADS", "8"))
+# Size of the chunks read from the network and of the file write buffer (1 MiB)
+CHUNK_SIZE = 1024 * 1024
+# Connect and read timeouts in seconds
+DOWNLOAD_TIMEOUT = (10, 60)
+
+
+def create_session():
+    """
+    Creates an HTTP session with a connection pool sized for concurrent downloads
+    and retries for transient server errors.
+    """
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=["GET"])
+    adapter = HTTPAdapter(pool_connections=MAX_CONCURRENT_DOWNLOADS, pool_maxsize=MAX_CONCURRENT_DOWNLOADS, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Shared session so connections to arXiv are reused across papers and requests
+session = create_session()
+
+
+def get_pdf_url(link):
+    """Converts an arXiv abstract page URL to its PDF URL."""
+    if "arxiv.org/abs/" in link:
+        return link.replace("arxiv.org/abs/", "arxiv.org/pdf/") + ".pdf"
+    elif "arxiv.org/pdf/" in link and not link.endswith(".pdf"):
+        return link + ".pdf"
+    return link  # Assume it's already a direct PDF link
+
+
+def parse_content_range(response):
+    """
+    Parses the Content-Range header of a 206 ("bytes 100-199/1234") or 416 ("bytes */1234") response.
+
+    Returns:
+        tuple: (first byte sent or None, total size or None).
+    """
+    match = re.fullmatch(r"bytes (?:(\d+)-\d+|\*)/(\d+|\*)", response.headers.get("Content-Range", "").strip())
+    if match is None:
+        return None, None
+    start, total = match.groups()
+    return int(start) if start else None, int(total) if total != "*" else None
+
+
+def looks_like_pdf(path):
+    """Whether a file starts with the PDF header and ends with an end-of-file marker."""
+    with open(path, "rb") as file:
+        header = file.read(5)
+        file.seek(max(os.path.getsize(path) - 1024, 0))
+        trailer = file.read()
+    return header == b"%PDF-" and b"%%EOF" in trailer
+
+
+def download_file(url, file_path):
+    """
+    Downloads a file atomically: data is written to a temporary `.part` file that is renamed
+    once complete. An existing `.part` file left by an interrupted download is resumed
+    with an HTTP Range request, or discarded if it does not match the file on the server
+    (e.g., it is stale or longer than the file).
+
+    Args:
+        url (str): URL of the file.
+        file_path (str): Final path of the downloaded file.
+
+    Returns:
+        int: Number of bytes received from the network.
+    """
+    part_path = file_path + ".part"
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    with session.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        start, total = parse_content_range(response)
+        if offset and response.status_code == 416:
+            # The partial file holds the whole document only if it has its size (or, if the server
+            # does not tell, looks like a whole PDF); otherwise it is stale and the download starts over
+            if (total == offset) if total is not None else looks_like_pdf(part_path):
+                os.replace(part_path, file_path)
+                return 0
+            os.remove(part_path)
+            return download_file(url, file_path)
+
+        if offset and response.status_code == 206 and start != offset:
+            os.remove(part_path)
+            return download_file(url, file_path)
+
+        response.raise_for_status()  # Raise error for failed requests
+
+        # Start over if the server ignored the Range header
+        mode = "ab" if response.status_code == 206 else "wb"
+        received = 0
+
+        with open(part_path, mode, buffering=CHUNK_SIZE) as file:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                file.write(chunk)
+                received += len(chunk)
+
+    os.replace(part_path, file_path)
+    return received
+
+
+def download_paper(link, save_dir):
+    """
+    Makes a single paper available in `save_dir` and returns its result entry.
+    Papers already in the shared store are linked without any network call.
+    """
+    result_entry = {"link": link}  # Initialize entry with the link
+
+    try:
+        pdf_url = get_pdf_url(link)
+        paper_id = pdf_url.split("/")[-1]  # Extract paper ID
+        file_path = os.path.join(save_dir, f"{paper_id}")
+        key = paper_key(pdf_url)
+
+        # Only one topic downloads a given paper at a time; the others wait and then hit the store
+        with pdf_store.key_lock(key), pdf_store.pinned([key]):
+            cached = pdf_store.get(key) is not None
+            telemetry.record_cache_lookup("pdf_store", int(cached), int(not cached))
+            if not cached:
+                with telemetry.span("download", paper=key):
+                    received = download_file(pdf_url, pdf_store.path(key))
+                    telemetry.metrics.inc("download_bytes_total", received)
+                    telemetry.count(download_bytes=received)
+                pdf_store.add(key)
+
+            pdf_store.link(key, file_path)
+
+        result_entry["file_path"] = file_path  # Store success result
+        telemetry.metrics.inc("downloads_total", result="cached" if cached else "downloaded")
+
+    except (requests.exceptions.RequestException, OSError) as e:
+        result_entry["error"] = str(e)  # Store error message
+        telemetry.metrics.inc("downloads_total", result="failed")
+
+    return result_entry
+
+
+def pinned_papers(links):
+    """Keeps the papers of `links` in the store while a review downloads, extracts and indexes them."""
+    return pdf_store.pinned(paper_key(get_pdf_url(link)) for link in links)
+
+
+@telemetry.traced("tool.download_arxiv_papers")
 def download_arxiv_papers(topic, links):
     """
     Downloads PDFs from given arXiv source links and saves them locally.
@@ -8,45 +163,50 @@ def download_arxiv_papers(topic, links):
     Args:
         topic (str): Topic of the papers (used as the directory name).
         links (list): List of arXiv paper URLs (e.g., "https://arxiv.org/abs/2403.12345").
-        
+
     Returns:
         list: A list of dictionaries containing 'link', 'file_path' (or 'error' if any).
     """
     save_dir = f"downloaded_papers/{topic}"
+    os.makedirs(save_dir, exist_ok=True)  # Create directory if it doesn't exist
 
-    if not os.path.exists(save_dir):
-        os.makedirs(save_dir)  # Create directory if it doesn't exist
-
-    results = []
+    if not links:
+        return []
 
-    for link in links:
-        result_entry = {"link": link}  # Initialize entry with the link
+    # Download the papers concurrently, keeping the results in the order of the links
+    with progress.stage("downloading"), ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_DOWNLOADS, len(links))) as executor:
+        return list(executor.map(progress.bind(lambda link: download_paper(link, save_dir)), links))
 
-        try:
-            # Convert abstract page URL to PDF URL
-            if "arxiv.org/abs/" in link:
-                pdf_url = link.replace("arxiv.org/abs/", "arxiv.org/pdf/") + ".pdf"
-            elif "arxiv.org/pdf/" in link and not link.endswith(".pdf"):
-                pdf_url = link + ".pdf"
-            else:
-                pdf_url = link  # Assume it's already a direct PDF link
 
-            paper_id = pdf_url.split("/")[-1]  # Extract paper ID
-            file_path = os.path.join(save_dir, f"{paper_id}")
-
-            # Download the PDF
-            response = requests.get(pdf_url, stream=True)
-            response.raise_for_status()  # Raise error for failed requests
-
-            with open(file_path, "wb") as file:
-                for chunk in response.iter_content(chunk_size=1024):
-                    file.write(chunk)
+def download_topic_papers(links_by_topic):
+    """
+    Downloads the papers of several topics on one pool, each into the directory of its topic.
+    A paper listed for several topics is downloaded once and linked into the other directories.
 
-            result_entry["file_path"] = file_path  # Store success result
+    Args:
+        links_by_topic (dict): arXiv paper URLs by topic.
 
-        except requests.exceptions.RequestException as e:
-            result_entry["error"] = str(e)  # Store error message
+    Returns:
+        dict: For each topic, the result entries of its links in order ('link', 'file_path' or 'error').
+    """
+    # First occurrences are queued first, so the pool is not filled with duplicates waiting on their download
+    seen = set()
+    first, repeated = [], []
+    for topic, links in links_by_topic.items():
+        save_dir = f"downloaded_papers/{topic}"
+        os.makedirs(save_dir, exist_ok=True)
+        for index, link in enumerate(links):
+            key = paper_key(get_pdf_url(link))
+            (repeated if key in seen else first).append((topic, index, link, save_dir))
+            seen.add(key)
 
-        results.append(result_entry)  # Append the result entry to the list
+    results = {topic: [None] * len(links) for topic, links in links_by_topic.items()}
+    tasks = first + repeated
+    if not tasks:
+        return results
 
+    with progress.stage("downloading"), ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_DOWNLOADS, len(tasks))) as executor:
+        entries = executor.map(progress.bind(lambda task: download_paper(task[2], task[3])), tasks)
+        for (topic, index, _, _), entry in zip(tasks, entries):
+            results[topic][index] = entry
     return results
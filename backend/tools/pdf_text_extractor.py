@@ -0,0 +1,167 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import json
+import os
+import re
+import threading
+
+from storage.pdf_store import pdf_store, paper_key
+from tools.paper_download_tool import get_pdf_url
+
+# Number of processes extracting text at the same time
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 1)))
+# Maximum number of characters kept per section excerpt
+SECTION_MAX_CHARS = int(os.getenv("SECTION_MAX_CHARS", "2000"))
+
+# Headings of the sections excerpted for the reviews, and of the sections that end them
+SECTION_HEADINGS = {
+    "methods": r"methods?|methodology|approach|proposed method|model",
+    "results": r"results?|experiments?|experimental results|evaluation",
+}
+OTHER_HEADINGS = r"abstract|introduction|related work|background|discussion|conclusions?|limitations|references|acknowledge?ments?|appendix"
+HEADING_PATTERN = r"^\s*(?:\d+(?:\.\d+)*\.?|[IVX]+\.)?\s*({})\s*$"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Returns the process pool shared by all extractions, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawned workers do not inherit the locks held by the server's threads
+            _executor = ProcessPoolExecutor(max_workers=EXTRACTION_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def reset_executor(executor):
+    """Drops a pool that is no longer usable (e.g., a worker was killed), so the next extraction creates a new one."""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def submit_extraction(pdf_path, text_path):
+    """
+    Submits an extraction, on a new pool if the current one is broken.
+
+    Returns:
+        tuple: The pool running the extraction and its future.
+    """
+    executor = get_executor()
+    try:
+        return executor, executor.submit(extract_pdf_text, pdf_path, text_path)
+    except BrokenProcessPool:
+        reset_executor(executor)
+        executor = get_executor()
+        return executor, executor.submit(extract_pdf_text, pdf_path, text_path)
+
+
+def extract_pdf_text(pdf_path, text_path):
+    """
+    Extracts the text of a PDF page by page into a JSON Lines file (one page per line).
+    Pages are written as they are read, so memory stays bounded for long papers.
+    Runs in a worker process.
+
+    Returns:
+        int: Number of pages extracted.
+    """
+    import pymupdf
+
+    # Per-process temporary file, in case two requests extract the same paper at once
+    part_path = f"{text_path}.{os.getpid()}.part"
+    pages = 0
+    try:
+        with pymupdf.open(pdf_path) as document, open(part_path, "w", encoding="utf-8") as file:
+            for page in document:
+                file.write(json.dumps(page.get_text()) + "\n")
+                pages += 1
+    except Exception:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+
+    os.replace(part_path, text_path)
+    return pages
+
+
+def extract_papers_text(papers):
+    """
+    Extracts the full text of downloaded papers on the process pool, skipping papers already extracted.
+    Each paper gets a `text_path` to its cached page-level text (empty if extraction failed)
+    and `excerpts` of its methods and results sections. Papers whose extraction fails, including when
+    a worker dies (e.g., out of memory on a huge PDF), are reviewed from their abstracts.
+
+    Args:
+        papers (list): Paper records with `pdf_url` and `pdf_path`.
+    """
+    futures = {}
+    for paper in papers:
+        if not paper.get("pdf_path"):
+            continue
+
+        key = paper_key(get_pdf_url(paper["pdf_url"]))
+        paper["text_path"] = pdf_store.text_path(key)
+        if not os.path.exists(paper["text_path"]):
+            try:
+                futures[id(paper)] = (key, *submit_extraction(paper["pdf_path"], paper["text_path"]))
+            except BrokenProcessPool:
+                paper["text_path"] = ""
+
+    for paper in papers:
+        key, executor, future = futures.get(id(paper), (None, None, None))
+        try:
+            if future is not None:
+                future.result()
+                pdf_store.add_text(key)
+            if paper.get("text_path"):
+                paper["excerpts"] = extract_sections(paper["text_path"])
+        except BrokenProcessPool:
+            reset_executor(executor)
+            paper["text_path"] = ""
+        except Exception:
+            paper["text_path"] = ""
+
+
+def read_pages(text_path):
+    """Yields the text of each page of an extracted paper, one page at a time."""
+    with open(text_path, encoding="utf-8") as file:
+        for line in file:
+            yield json.loads(line)
+
+
+def extract_sections(text_path, max_chars=SECTION_MAX_CHARS):
+    """
+    Finds the methods and results sections of an extracted paper.
+
+    Returns:
+        dict: Up to `max_chars` characters of text per section found (e.g., {"methods": "...", "results": "..."}).
+    """
+    patterns = {name: re.compile(HEADING_PATTERN.format(headings), re.IGNORECASE) for name, headings in SECTION_HEADINGS.items()}
+    other = re.compile(HEADING_PATTERN.format(OTHER_HEADINGS), re.IGNORECASE)
+
+    sections = {}
+    current = None
+    for page in read_pages(text_path):
+        for line in page.splitlines():
+            heading = next((name for name, pattern in patterns.items() if pattern.match(line)), None)
+            if heading is not None:
+                current = heading if heading not in sections else None
+                sections.setdefault(heading, "")
+                continue
+            if other.match(line):
+                current = None
+                continue
+
+            if current is not None and len(sections[current]) < max_chars:
+                sections[current] = (sections[current] + " " + line.strip()).strip()[:max_chars]
+
+        # Stop reading once every section is complete
+        if current is None and len(sections) == len(patterns):
+            break
+
+    return {name: text for name, text in sections.items() if text}
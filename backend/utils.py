@@ -1,59 +1,58 @@
-import os
+import ast
 import json
 import re
-from pdf_from_json import generate_pdf_from_json
-
-def extract_metadata(response_content: str):
-    metadata = []
-    paper_sections = response_content.split("## ")[1:]  # Splitting by section titles
-    
-    for section in paper_sections:
-        lines = section.strip().split("\n")
-        title = lines[0].strip()
-        
-        # Skip non-research sections
-        if title.lower() in ["conclusion", "references"]:
-            continue
-
-        authors = re.search(r"\*\*Authors\*\*: (.+)", section)
-        publication_date = re.search(r"\*\*Publication Date\*\*: (.+)", section)
-        keywords = re.search(r"\*\*Keywords\*\*: (.+)", section)
-        journal = re.search(r"\*\*Journal\*\*: (.+)", section)
-        review_match = re.search(r"\*\*Review\*\*: \*(.+?)\*", section, re.DOTALL)
-        source_link = re.search(r"(http[s]?://[^\s]+)", section)
-
-        metadata.append({
-            "title": title,
-            "authors": authors.group(1) if authors else "",
-            "publication_date": publication_date.group(1) if publication_date else "",
-            "keywords": [kw.strip() for kw in keywords.group(1).split(",")] if keywords else [],
-            "journal": journal.group(1) if journal else "",
-            "source_link": source_link.group(1) if source_link else ""
-        })
-
-    return metadata
-
-# Save paper metadata as JSON
-def save_paper_metadata(topic, papers):
-    PAPERS_DIR = "../papers_metadata"
-    os.makedirs(PAPERS_DIR, exist_ok=True)
-
-    file_path = os.path.join(PAPERS_DIR, f"{topic}_papers.json")
-    with open(file_path, "w") as f:
-        json.dump(papers, f, indent=4)
-    return file_path
-
-def generate_pdf(topic, response):
-    PDF_DIR = "../literature_reviews"
-    os.makedirs(PDF_DIR, exist_ok=True)
-
-    pdf_path = os.path.join(PDF_DIR, f"{topic.replace(' ', '_')}_literature_review.pdf")
-
-    print("Generating PDF...")
-
-    # Generate PDF from JSON
-    json_response = json.loads(response)
-    generate_pdf_from_json(topic, json_response, pdf_path)
-
-    print(f"PDF successfully generated: {pdf_path}")
-    return pdf_path
\ No newline at end of file
+
+from telemetry import traced
+
+# Quoted strings, or JSON literals outside of them
+LITERAL_PATTERN = re.compile(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')|\b(true|false|null)\b")
+
+def normalize_topic(topic: str):
+    """Normalizes a research topic so that equivalent requests share cache entries."""
+    return " ".join(topic.lower().split())
+
+@traced("json.parse")
+def parse_json_response(content: str):
+    """
+    Parses the JSON object in an LLM response, ignoring Markdown code fences and any surrounding text.
+    Common glitches of LLM output (trailing commas, single-quoted strings, Python literals) are repaired.
+    """
+    start, end = content.find("{"), content.rfind("}")
+    if start == -1 or end == -1:
+        raise ValueError("No JSON object found in the response")
+    content = content[start:end + 1]
+
+    try:
+        return json.loads(content, strict=False)
+    except json.JSONDecodeError:
+        pass
+
+    # Remove trailing commas before closing brackets
+    repaired = re.sub(r",\s*([}\]])", r"\1", content)
+    try:
+        return json.loads(repaired, strict=False)
+    except json.JSONDecodeError:
+        pass
+
+    # Single-quoted strings are valid Python literals once true/false/null (outside strings) become True/False/None
+    python_literals = {"true": "True", "false": "False", "null": "None"}
+    repaired = LITERAL_PATTERN.sub(lambda m: m.group(1) or python_literals[m.group(2)], repaired)
+    try:
+        data = ast.literal_eval(repaired)
+    except (ValueError, SyntaxError, MemoryError, RecursionError) as e:
+        raise ValueError(f"The response is not valid JSON: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError("The response is not a JSON object")
+    return data
+
+def extract_metadata(review):
+    """
+    Extracts the metadata of the papers of a literature review.
+
+    Args:
+        review (LiteratureReview): The parsed literature review.
+
+    Returns:
+        list: PaperMetadata of each paper.
+    """
+    return [paper.metadata() for paper in review.papers]
\ No newline at end of file
@@ -1,60 +1,372 @@
 from agno.agent import Agent
 from agno.workflow import Workflow, RunResponse, RunEvent
-from agno.storage.workflow.sqlite import SqliteWorkflowStorage
 from agno.utils.pprint import pprint_run_response
 from agno.utils.log import logger
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+import json
+import os
+import re
+import time
 
-from agents.summarization_agent import summarization_agent
-from agents.review_generation_agent import review_generation_agent
+from agents.summarization_agent import create_summarization_agent
+from agents.review_generation_agent import create_review_generation_agent
+from agents.paper_review_agent import create_paper_review_agent
+from agents.review_synthesis_agent import create_review_synthesis_agent
+from agents.paper_summary_agent import create_paper_summary_agent, MODEL_ID as SUMMARY_MODEL_ID, PROMPT_VERSION as SUMMARY_PROMPT_VERSION
+from tools.arxiv_search import search_arxiv_papers
+from tools.paper_download_tool import download_arxiv_papers, pinned_papers
+from tools.pdf_text_extractor import extract_papers_text
+from knowledge.knowledge_base import index_papers
+from storage.workflow_storage import PooledSqliteWorkflowStorage
+from storage.summary_cache import summary_cache
+from storage.pdf_store import normalize_arxiv_id
+from utils import parse_json_response
+from review_model import Paper
+from llm_scheduler import backoff_delay
+from deadlines import DeadlineExceeded
+from telemetry import VERBOSE_LOGGING, record_cache_lookup, run_agent
+import deadlines
+import progress
+
+# Number of papers reviewed at the same time in map-reduce mode
+REVIEW_CONCURRENCY = int(os.getenv("REVIEW_CONCURRENCY", "8"))
+# Number of papers summarized by a single LLM call in direct search mode
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "10"))
+# Seconds allowed for the summarization and review stages
+SUMMARIZING_DEADLINE = float(os.getenv("SUMMARIZING_DEADLINE", "300"))
+REVIEWING_DEADLINE = float(os.getenv("REVIEWING_DEADLINE", "600"))
 
 # Define the ResearchCopilot workflow 
 class ResearchCopilot(Workflow):
-    summarization_agent: Agent = summarization_agent
-    review_generation_agent: Agent = review_generation_agent
+    summarization_agent: Agent
+    review_generation_agent: Agent
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Each workflow session gets its own agents so concurrent sessions never interleave agent memory
+        self.summarization_agent = create_summarization_agent(session_id=self.session_id)
+        self.review_generation_agent = create_review_generation_agent(session_id=self.session_id)
+        # Papers summarized and reviewed so far, returned if the run misses its deadline
+        self.partial = {"papers": [], "reviews": []}
 
-    def run(self, topic: str, max_papers: int = 5) -> RunResponse:
+    def run(self, topic: str, max_papers: int = 5, review_mode: str = "single", search_mode: str = "direct",
+            previous_review: dict = None, since: float = None, papers: list = None) -> RunResponse:
         """
             Executes the research workflow:
             1. Searches for research papers related to the topic.
+               In "direct" mode arXiv is queried and papers are downloaded without going through the LLM,
+               which only writes the summaries. In "agent" mode the summarization agent does all of it with tools.
             2. Generates a literature review based on the extracted papers.
+               In "map_reduce" mode each paper is reviewed by its own LLM call, in parallel,
+               and a final call writes the conclusion and references.
+            If a previous review of the topic is given, it is refreshed incrementally instead (see refresh_review).
+            If paper records are given (e.g., searched and summarized once for a whole batch of topics), step 1 is skipped.
         """
+        if previous_review is not None:
+            return self.refresh_review(topic, max_papers, previous_review, since)
+
         logger.info(f"Generating a literature review of {max_papers} research papers from arXiv on: {topic}")
 
         # Step 1: Search arXiv for research papers on the topic and summarize them
-        extracted_papers = self.get_extracted_papers(topic, max_papers)
+        if papers is not None:
+            extracted_papers = json.dumps(papers) if papers else None
+        elif search_mode == "agent":
+            with progress.stage("summarizing"), deadlines.deadline(SUMMARIZING_DEADLINE, "summarizing stage"):
+                extracted_papers = self.get_extracted_papers(topic, max_papers)
+            papers = split_extracted_papers(extracted_papers) if extracted_papers else None
+        else:
+            papers = self.get_paper_records(topic, max_papers)
+            extracted_papers = json.dumps(papers) if papers else None
         
-        # If no extracted papers are found for the topic, end the workflow
+        # If no extracted papers are found for the topic, end the workflow without content
         if extracted_papers is None:
-            return RunResponse(
-                event=RunEvent.workflow_completed,
-                content=f"Sorry, could not find any research papers on the topic: {topic}",
-            )           
+            logger.info(f"No research papers found on the topic: {topic}")
+            return RunResponse(event=RunEvent.workflow_completed, content=None)
         
-        print("Extracted papers:", extracted_papers)
+        if VERBOSE_LOGGING:
+            logger.debug(f"Extracted papers: {extracted_papers}")
+
+        self.partial["papers"] = papers or []
 
         # Step 2: Generate a literature review of the extracted papers
-        literature_review: RunResponse = self.review_generation_agent.run(extracted_papers)
+        with progress.stage("reviewing"), deadlines.deadline(REVIEWING_DEADLINE, "reviewing stage"):
+            if review_mode == "map_reduce":
+                literature_review = self.generate_review_map_reduce(papers)
+            else:
+                literature_review: RunResponse = run_agent(self.review_generation_agent, extracted_papers)
         if literature_review is None:
             return RunResponse(
                 event=RunEvent.workflow_completed,
                 content="Sorry, could not generate a literature review of the research papers.",
             )
         
-        print("Literature review:", literature_review.content)
+        if VERBOSE_LOGGING:
+            logger.debug(f"Literature review: {literature_review.content}")
         return RunResponse(
             event=RunEvent.workflow_completed,
             content=literature_review.content,
         )
 
+    def refresh_review(self, topic: str, max_papers: int, previous_review: dict, since: float = None) -> RunResponse:
+        """
+        Refreshes a previous review of the topic with the papers submitted since it was generated:
+        only the new papers are searched, summarized and reviewed, then the conclusion and references
+        are written again for all the papers. The papers of the previous review are kept as they are.
+
+        Args:
+            topic (str): Research topic of the review.
+            max_papers (int): Maximum number of new papers.
+            previous_review (dict): The previous review, as dumped from a LiteratureReview.
+            since (float): UNIX timestamp of the previous search; only papers submitted after it are searched.
+        """
+        previous_papers = previous_review.get("papers", [])
+        known = {arxiv_id[0] for arxiv_id in (normalize_arxiv_id(paper.get("source_link", "")) for paper in previous_papers) if arxiv_id}
+        logger.info(f"Refreshing the literature review on {topic} ({len(previous_papers)} papers) with papers submitted since {time.strftime('%Y-%m-%d', time.gmtime(since))}")
+
+        papers = self.get_paper_records(topic, max_papers, since=since, exclude=known)
+        if not papers:
+            logger.info(f"No new papers on {topic}")
+            return RunResponse(event=RunEvent.workflow_completed, content=json.dumps(previous_review))
+
+        self.partial["papers"] = papers
+
+        # Only the new papers are reviewed; the conclusion and references cover all the papers
+        with progress.stage("reviewing"), deadlines.deadline(REVIEWING_DEADLINE, "reviewing stage"):
+            with ThreadPoolExecutor(max_workers=min(REVIEW_CONCURRENCY, len(papers))) as executor:
+                reviews = [review for review in executor.map(progress.bind(self.review_paper), papers) if review]
+            if not reviews:
+                return RunResponse(
+                    event=RunEvent.workflow_completed,
+                    content="Sorry, could not review the new research papers.",
+                )
+
+            merged = previous_papers + reviews
+            synthesis = self.synthesize_review(merged)
+            if synthesis is None:
+                return RunResponse(
+                    event=RunEvent.workflow_completed,
+                    content="Sorry, could not update the conclusion of the literature review.",
+                )
+
+        return RunResponse(event=RunEvent.workflow_completed, content=json.dumps({"papers": merged, **synthesis}))
+
+    def partial_result(self):
+        """Returns the papers reviewed (or, failing that, summarized) before the run was interrupted."""
+        papers = self.partial["reviews"] or [paper for paper in self.partial["papers"] if isinstance(paper, dict)]
+        return {
+            "papers": [Paper.model_validate(paper).model_dump() for paper in papers],
+            "reviewed": len(self.partial["reviews"]),
+        }
+
+    def generate_review_map_reduce(self, papers: list):
+        """
+        Generates the literature review in two steps:
+        1. Map: reviews each paper with its own LLM call, running up to REVIEW_CONCURRENCY calls at a time.
+        2. Reduce: writes the conclusion and references from the per-paper reviews in one small call.
+
+        Args:
+            papers (list): Paper records, or blocks of text describing one paper each.
+        """
+        logger.info(f"Reviewing {len(papers)} papers with up to {REVIEW_CONCURRENCY} concurrent calls")
+
+        with ThreadPoolExecutor(max_workers=min(REVIEW_CONCURRENCY, len(papers))) as executor:
+            reviews = [review for review in executor.map(progress.bind(self.review_paper), papers) if review]
+
+        if not reviews:
+            return None
+
+        synthesis = self.synthesize_review(reviews)
+        if synthesis is None:
+            return None
+
+        return RunResponse(content=json.dumps({"papers": reviews, **synthesis}))
+
+    def review_paper(self, paper):
+        """Generates the review of a single paper, given as a paper record or a block of text."""
+
+        MAX_ATTEMPTS = 2
+
+        prompt = json.dumps(paper) if isinstance(paper, dict) else paper
+
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                # A fresh agent per paper, since an agent must not run concurrently
+                response: RunResponse = run_agent(create_paper_review_agent(session_id=self.session_id), prompt)
+                review = parse_json_response(response.content)
+
+                # Metadata from arXiv is kept as is rather than as retyped by the LLM
+                if isinstance(paper, dict):
+                    metadata = {key: value for key, value in paper.items() if key != "excerpts"}
+                    review = {**metadata, "review": review.get("review", "")}
+
+                # Stream the paper in the same shape as the papers of the final review
+                progress.report("paper", paper=Paper.model_validate(review).model_dump())
+                self.partial["reviews"].append(review)
+                return review
+
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                logger.warning(f"Paper review attempt {attempt + 1}/{MAX_ATTEMPTS} failed: {str(e)}")
+
+        logger.error(f"Failed to review paper after {MAX_ATTEMPTS} attempts")
+        return None
+
+    def synthesize_review(self, reviews: list):
+        """Generates the conclusion and references from the reviews of the individual papers."""
+
+        MAX_ATTEMPTS = 2
+
+        # Only the fields needed for the conclusion and citations, to keep the prompt small
+        prompt = json.dumps([
+            {key: review.get(key) for key in ("title", "authors", "publication_date", "source_link", "review")}
+            for review in reviews
+        ])
+
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                response: RunResponse = run_agent(create_review_synthesis_agent(session_id=self.session_id), prompt)
+                synthesis = parse_json_response(response.content)
+                synthesis = {"conclusion": synthesis.get("conclusion", ""), "references": synthesis.get("references", [])}
+                progress.report("conclusion", **synthesis)
+                return synthesis
+
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                logger.warning(f"Review synthesis attempt {attempt + 1}/{MAX_ATTEMPTS} failed: {str(e)}")
+
+        logger.error(f"Failed to synthesize the review after {MAX_ATTEMPTS} attempts")
+        return None
+
+    def get_paper_records(self, topic: str, max_papers: int, since: float = None, exclude=()):
+        """
+        Searches arXiv and downloads the papers directly, then has the LLM summarize them.
+
+        Args:
+            topic (str): Research topic to search for.
+            max_papers (int): Maximum number of papers.
+            since (float): Optional UNIX timestamp; only papers submitted after it are searched.
+            exclude (set): arXiv ids (without version) of papers to leave out, e.g. those already reviewed.
+
+        Returns:
+            list: Paper records with their summaries and PDF paths, or None if no papers were found.
+        """
+        papers = self.search_papers(topic, max_papers, since=since, exclude=exclude)
+        if not papers:
+            return None
+
+        with pinned_papers([paper["pdf_url"] for paper in papers]):
+            self.download_papers(topic, papers)
+            self.process_papers(papers)
+        return papers
+
+    def search_papers(self, topic: str, max_papers: int, since: float = None, exclude=(), client=None):
+        """Searches arXiv for the paper records of a topic, leaving out the `exclude`d arXiv ids. Returns None if the search failed."""
+        with progress.stage("searching"):
+            try:
+                papers = search_arxiv_papers(topic, max_papers, client=client, since=since)
+            except Exception as e:
+                logger.error(f"arXiv search failed: {str(e)}")
+                return None
+            return [paper for paper in papers if paper["arxiv_id"] not in exclude]
+
+    def download_papers(self, topic: str, papers: list):
+        """Downloads the papers into the directory of the topic and adds their `pdf_path` (empty if the download failed)."""
+        downloads = download_arxiv_papers(topic, [paper["pdf_url"] for paper in papers])
+        for paper, download in zip(papers, downloads):
+            paper["pdf_path"] = download.get("file_path", "")
+            progress.report("paper_metadata", paper=paper)
+
+    def process_papers(self, papers: list):
+        """Extracts the text of downloaded papers, indexes it for the chat agent and summarizes the papers."""
+        # Extract the full text of the papers so reviews can draw on their methods and results
+        with progress.stage("extracting"):
+            extract_papers_text(papers)
+
+        # Add the papers to the knowledge base used by the chat agent
+        with progress.stage("indexing"):
+            try:
+                index_papers(papers)
+            except Exception as e:
+                logger.error(f"Indexing failed: {str(e)}")
+
+        with progress.stage("summarizing"), deadlines.deadline(SUMMARIZING_DEADLINE, "summarizing stage"):
+            # Papers summarized for earlier topics or runs reuse their cached summaries
+            cached = summary_cache.get_many([(paper["arxiv_id"], paper["version"]) for paper in papers],
+                                            SUMMARY_MODEL_ID, SUMMARY_PROMPT_VERSION)
+            record_cache_lookup("summary_cache", len(cached), len(papers) - len(cached))
+            misses = []
+            for paper in papers:
+                if (paper["arxiv_id"], paper["version"]) in cached:
+                    paper["summary"] = cached[(paper["arxiv_id"], paper["version"])]
+                else:
+                    misses.append(paper)
+
+            batches = [misses[i:i + SUMMARY_BATCH_SIZE] for i in range(0, len(misses), SUMMARY_BATCH_SIZE)]
+            if batches:
+                with ThreadPoolExecutor(max_workers=min(REVIEW_CONCURRENCY, len(batches))) as executor:
+                    list(executor.map(progress.bind(self.summarize_papers), batches))
+
+    def summarize_papers(self, papers: list):
+        """
+        Adds a summary to each paper record, falling back to the abstract if the LLM fails.
+        Summaries written by the LLM are added to the summary cache.
+        """
+
+        MAX_ATTEMPTS = 2
+
+        prompt = json.dumps([
+            {"arxiv_id": paper["arxiv_id"], "title": paper["title"], "abstract": paper["abstract"]}
+            for paper in papers
+        ])
+
+        summaries = {}
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                response: RunResponse = run_agent(create_paper_summary_agent(session_id=self.session_id), prompt)
+                summaries = {
+                    item["arxiv_id"]: item["summary"]
+                    for item in parse_json_response(response.content).get("summaries", [])
+                }
+                break
+
+            except DeadlineExceeded:
+                # Out of time: the papers keep their abstracts as summaries
+                logger.warning("Summarization deadline exceeded, using the abstracts of the papers")
+                break
+            except Exception as e:
+                logger.warning(f"Summarization attempt {attempt + 1}/{MAX_ATTEMPTS} failed: {str(e)}")
+
+        for paper in papers:
+            paper["summary"] = summaries.get(paper["arxiv_id"]) or paper["abstract"]
+
+        try:
+            summary_cache.put_many({
+                (paper["arxiv_id"], paper["version"]): summaries[paper["arxiv_id"]]
+                for paper in papers if summaries.get(paper["arxiv_id"])
+            }, SUMMARY_MODEL_ID, SUMMARY_PROMPT_VERSION)
+        except Exception as e:
+            logger.warning(f"Could not cache summaries: {str(e)}")
+
     def get_extracted_papers(self, topic: str, max_papers: int):
         """Get the search results for a topic."""
 
         MAX_ATTEMPTS = 3
 
         for attempt in range(MAX_ATTEMPTS):
+            # Back off before retrying instead of hitting the provider again right away
+            if attempt > 0:
+                delay = backoff_delay(attempt - 1)
+                left = deadlines.remaining()
+                if left is not None and delay >= left:
+                    raise DeadlineExceeded("Deadline of the summarizing stage exceeded")
+                time.sleep(delay)
+
             try:
                 prompt = f"Search for {max_papers} most relevant papers on {topic}."
-                summarizer_response: RunResponse = self.summarization_agent.run(prompt)
+                summarizer_response: RunResponse = run_agent(self.summarization_agent, prompt)
 
                 # Validate response content
                 if not summarizer_response or not summarizer_response.content:
@@ -63,9 +375,12 @@ class ResearchCopilot(Workflow):
 
                 logger.info(f"Found papers on the topic {topic} in attempt {attempt + 1}")
 
-                print("Extracted papers:", summarizer_response.content)
+                if VERBOSE_LOGGING:
+                    logger.debug(f"Extracted papers: {summarizer_response.content}")
                 return summarizer_response.content
             
+            except DeadlineExceeded:
+                raise
             except Exception as e:
                 logger.warning(f"Attempt {attempt + 1}/{MAX_ATTEMPTS} failed: {str(e)}")
 
@@ -73,11 +388,25 @@ class ResearchCopilot(Workflow):
         return None
     
 
-# Initialize the Research Copilot workflow with SQLite storage
-research_workflow = ResearchCopilot(
-    session_id=f"generate-literature-review",
-    storage=SqliteWorkflowStorage(
-        table_name="generate_literature_review_workflows",
-        db_file="workflows/db/workflows.db",
-    ),
+def split_extracted_papers(extracted_papers: str):
+    """Splits the summarization agent's response into one block of text per paper."""
+    blocks = re.split(r"\n(?=[#*\s\d.-]*Title\**:)", extracted_papers)
+    papers = [block.strip() for block in blocks if re.search(r"Title\**:", block)]
+    return papers or [extracted_papers]
+
+
+# SQLite storage shared by all workflow sessions
+workflow_storage = PooledSqliteWorkflowStorage(
+    table_name="generate_literature_review_workflows",
+    db_file="workflows/db/workflows.db",
 )
+
+def create_research_workflow(session_id=None):
+    """
+    Creates a Research Copilot workflow with its own session, backed by the shared SQLite storage.
+    Use one workflow per request or job; a workflow instance must not run concurrently.
+    """
+    return ResearchCopilot(
+        session_id=session_id or f"generate-literature-review-{uuid4().hex}",
+        storage=workflow_storage,
+    )
@@ -1,6 +1,6 @@
 import streamlit as st
 import requests
-import json
+import time
 
 # Set Streamlit page configurations
 st.set_page_config(page_title="AI Research Copilot", layout="wide")
@@ -16,9 +16,29 @@ if "selected_paper" not in st.session_state:
     st.session_state.selected_paper = None
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
+if "pending_request" not in st.session_state:
+    st.session_state.pending_request = None
+if "job_id" not in st.session_state:
+    st.session_state.job_id = None
+if "job_started_at" not in st.session_state:
+    st.session_state.job_started_at = None
+if "job_error" not in st.session_state:
+    st.session_state.job_error = None
+if "pdf_status" not in st.session_state:
+    st.session_state.pdf_status = {}  # "ready" or "failed" by PDF URL, once the render is over
 
 # Define API URL for backend communication
 API_URL = "http://127.0.0.1:8000"
+# Connect and read timeouts of the requests to the backend, in seconds
+REQUEST_TIMEOUT = (5, 30)
+# Seconds between two checks of a running review
+POLL_INTERVAL = 2
+# Seconds after which a review that has not finished is given up on
+JOB_TIMEOUT = 30 * 60
+# Largest number of papers that can be requested
+MAX_PAPERS = 100
+# Number of papers shown per page
+PAPERS_PER_PAGE = 10
 
 # Sidebar UI for user inputs and controls
 with st.sidebar:
@@ -28,47 +48,172 @@ with st.sidebar:
     
     # Input fields for research topic and number of papers
     topic = st.text_input("Enter Research Topic:", key="topic_input", value=st.session_state.research_topic)
-    max_papers = st.number_input("Number of Papers to Fetch:", min_value=1, max_value=10, value=st.session_state.max_papers, key="papers_input")
+    max_papers = st.number_input("Number of Papers to Fetch:", min_value=1, max_value=MAX_PAPERS, value=st.session_state.max_papers, key="papers_input")
+    incremental = st.checkbox("Only add papers published since the last review", key="incremental_input")
     
     col_btn1, col_btn2 = st.columns([2, 1])  # Layout for buttons
     
     with col_btn1:
         # Fetch papers button
-        if st.button("Fetch Papers & Generate Review"):
+        if st.button("Fetch Papers & Generate Review", disabled=st.session_state.job_id is not None):
             if topic:
                 st.session_state.research_topic = topic
-                try:
-                    with st.spinner("Fetching papers from arXiv..."):
-                        response = requests.post(API_URL+"/fetch_papers/", json={"topic": topic, "max_papers": max_papers})
-                    
-                    if response.status_code != 200:
-                        st.error("Error: Invalid response from server.")
-                        st.stop()
-                    
-                    # Parse response JSON
-                    result_decoded = response.content.decode("utf-8")
-                    st.session_state.result_json = json.loads(result_decoded)
-                
-                except json.JSONDecodeError:
-                    st.error("Error: Received an unreadable response from the server.")
-                    st.stop()
-                except requests.exceptions.RequestException:
-                    st.error("Error: Could not connect to the server.")
-                    st.stop()
+                st.session_state.result_json = None
+                st.session_state.job_error = None
+                # The review is generated in the background and polled for in the main area below
+                st.session_state.pending_request = {"topic": topic, "max_papers": max_papers, "incremental": incremental}
     
     with col_btn2:
         # Refresh button to clear results and reset inputs
         if st.button("🔄 Refresh"):
             st.session_state.result_json = None
+            st.session_state.job_id = None
+            st.session_state.job_error = None
             st.session_state.research_topic = ""
             st.session_state.max_papers = 5
             st.rerun()
 
+# Labels shown while each stage of the workflow is running
+STAGE_LABELS = {
+    "searching": "Searching arXiv...",
+    "summarizing": "Summarizing papers...",
+    "downloading": "Downloading papers...",
+    "extracting": "Extracting full text from papers...",
+    "indexing": "Indexing papers for chat...",
+    "reviewing": "Reviewing papers...",
+    "metadata": "Saving paper metadata...",
+    "pdf": "Generating PDF...",
+}
+
+def render_paper(i, paper):
+    """Displays the details of a single paper."""
+    with st.container():
+        st.subheader(f"📄 {i+1}. {paper['title']}")
+        st.markdown(f"**🖊️ Authors:** {paper.get('authors', '')}")
+        st.markdown(f"**📅 Publication Date:** {paper.get('publication_date', '')[:10]}")
+        keywords = paper.get("keywords", [])
+        st.markdown(f"**🔑 Keywords:** {', '.join(keywords) if isinstance(keywords, list) else keywords}")
+        st.markdown("**📌 Summary:**")
+        st.write(paper.get("summary", ""))
+        st.markdown("**📝 Review:**")
+        st.write(paper.get("review", ""))
+        st.divider()
+
+def render_papers(papers, key):
+    """Displays a list of papers one page at a time, so large reviews stay responsive."""
+    pages = (len(papers) + PAPERS_PER_PAGE - 1) // PAPERS_PER_PAGE
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages}, {len(papers)} papers)", min_value=1, max_value=pages, value=1, key=f"page_{key}")
+    first = (page - 1) * PAPERS_PER_PAGE
+    for i, paper in enumerate(papers[first:first + PAPERS_PER_PAGE], start=first):
+        render_paper(i, paper)
+
+def submit_job(request):
+    """
+    Starts a literature review job on the backend and returns its id, or None if it could not be started.
+    """
+    try:
+        response = requests.post(API_URL + "/jobs", json=request, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return response.json()["job_id"]
+    except (requests.exceptions.RequestException, KeyError, ValueError):
+        st.error("Error: Could not connect to the server.")
+        return None
+
+@st.fragment(run_every=POLL_INTERVAL)
+def poll_job():
+    """
+    Checks the running job on every tick without rerunning the whole page, and reruns it once the review is ready.
+    """
+    job_id = st.session_state.job_id
+    if job_id is None:
+        return
+
+    def finish(result=None, error=None):
+        st.session_state.job_id = None
+        st.session_state.result_json = result
+        st.session_state.job_error = error
+        st.rerun(scope="app")
+
+    if time.time() - st.session_state.job_started_at > JOB_TIMEOUT:
+        finish(error="The literature review is taking too long. Please try again later.")
+
+    try:
+        response = requests.get(f"{API_URL}/jobs/{job_id}", timeout=REQUEST_TIMEOUT)
+        if response.status_code == 404:
+            finish(error="The literature review job was lost by the server. Please try again.")
+        response.raise_for_status()
+        job = response.json()
+    except (requests.exceptions.RequestException, ValueError):
+        st.warning("Waiting for the server...")  # Transient failures are retried on the next tick
+        return
+
+    if job["status"] == "completed":
+        finish(result=job["result"])
+    elif job["status"] == "failed":
+        finish(error=job.get("error") or "Failed to generate the literature review.")
+
+    running = [name for name, stage in job.get("stages", {}).items() if stage["status"] == "started"]
+    label = STAGE_LABELS.get(running[-1], running[-1]) if running else "Waiting for the review to start..."
+    with st.status(label, expanded=False):
+        for name, stage in job.get("stages", {}).items():
+            if stage["status"] == "completed":
+                st.write(f"✓ {STAGE_LABELS.get(name, name)}")
+    if job.get("papers"):
+        st.caption(f"{len(job['papers'])} papers reviewed so far")
+        render_papers(job["papers"], f"job_{job_id}")
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def fetch_pdf(pdf_url):
+    """
+    Downloads the PDF of a review from the backend without waiting for its render, so a rerun never blocks on it.
+    PDFs are immutable, so they are cached by URL; failures (e.g., still being rendered) are not.
+    """
+    response = requests.get(API_URL + pdf_url, params={"wait": 0}, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.content
+
+@st.fragment(run_every=POLL_INTERVAL)
+def poll_pdf(pdf_url):
+    """
+    Checks on every tick whether the PDF of the review is rendered, without rerunning the whole page,
+    and reruns the page once it can be downloaded or its render failed.
+    """
+    try:
+        fetch_pdf(pdf_url)
+    except requests.exceptions.HTTPError as e:
+        if e.response.status_code != 504:  # 504: still being rendered
+            st.session_state.pdf_status[pdf_url] = "failed"
+            st.rerun(scope="app")
+        st.caption("⏳ Rendering the PDF...")
+        return
+    except requests.exceptions.RequestException:
+        st.caption("⏳ Rendering the PDF...")  # Transient failures are retried on the next tick
+        return
+    st.session_state.pdf_status[pdf_url] = "ready"
+    st.rerun(scope="app")
+
 # Display main application title
 st.title("AI Research Copilot")
 
+# Start a newly requested review as a background job
+if st.session_state.pending_request:
+    st.session_state.job_id = submit_job(st.session_state.pending_request)
+    st.session_state.job_started_at = time.time()
+    st.session_state.pending_request = None
+
+# Follow a running review; the rest of the page stays interactive while it is generated
+if st.session_state.job_id:
+    st.header(f"📖 Literature Review: {st.session_state.research_topic.title()}")
+    poll_job()
+    st.stop()
+
+if st.session_state.job_error:
+    st.error(f"Error: {st.session_state.job_error}")
+
 # Show instructions if no results are available
-if st.session_state.result_json is None:
+if st.session_state.result_json is None and not st.session_state.job_error:
     st.info("Enter a research topic and click 'Fetch Papers & Generate Review' to get started.")
 
 # Display results if available
@@ -76,8 +221,8 @@ if st.session_state.result_json:
     research_topic = st.session_state.research_topic.title()  # Capitalize topic words
     st.header(f"📖 Literature Review: {research_topic}")
     
-    if "pdf_path" in st.session_state.result_json:
-        pdf_path = st.session_state.result_json["pdf_path"]
+    if "pdf_url" in st.session_state.result_json:
+        pdf_url = st.session_state.result_json["pdf_url"]
         filename = f"{topic.replace(' ', '_')}_literature_review.pdf"
         
         # Layout for success message and download button
@@ -87,31 +232,43 @@ if st.session_state.result_json:
             st.success("Literature Review Generated!")
         
         with col_download:
-            st.download_button(label="📥 Download", 
-                               data=open(pdf_path, "rb"), 
-                               file_name=filename, 
-                               mime="application/pdf")
+            pdf_data = None
+            if st.session_state.pdf_status.get(pdf_url) == "ready":
+                try:
+                    pdf_data = fetch_pdf(pdf_url)  # Cached, unless it was evicted from the cache
+                except requests.exceptions.RequestException:
+                    st.session_state.pdf_status.pop(pdf_url)
+
+            if pdf_data is not None:
+                st.download_button(label="📥 Download", 
+                                   data=pdf_data, 
+                                   file_name=filename, 
+                                   mime="application/pdf")
+            elif st.session_state.pdf_status.get(pdf_url) == "failed":
+                if st.button("🔄 Retry PDF", help="The PDF could not be downloaded."):
+                    st.session_state.pdf_status.pop(pdf_url)
+                    st.rerun()
+            else:
+                poll_pdf(pdf_url)
     
-    # Extract and display literature review details
-    response = st.session_state.result_json.get("response")
-    data = json.loads(response)
+    # A review that missed its deadline comes back with the papers completed so far
+    if "error" in st.session_state.result_json:
+        st.error(f"Error: {st.session_state.result_json['error']}")
+        partial = st.session_state.result_json.get("partial_result") or {}
+        if partial.get("papers"):
+            st.warning(f"Showing the {len(partial['papers'])} papers processed before the review timed out.")
+            render_papers(partial["papers"], "partial")
+        st.stop()
+
+    # Display the literature review details, which the backend returns already structured
+    data = st.session_state.result_json.get("response") or {}
     papers = data.get("papers", [])
     conclusion = data.get("conclusion", "")
     references = data.get("references", [])
     
     if papers:
-        # Iterate through each retrieved paper and display details
-        for i, paper in enumerate(papers):
-            with st.container():
-                st.subheader(f"📄 {i+1}. {paper['title']}")
-                st.markdown(f"**🖊️ Authors:** {paper['authors']}")
-                st.markdown(f"**📅 Publication Date:** {paper['publication_date'][:10]}")
-                st.markdown(f"**🔑 Keywords:** {paper['keywords']}")
-                st.markdown("**📌 Summary:**")
-                st.write(paper["summary"])
-                st.markdown("**📝 Review:**")
-                st.write(paper["review"])
-                st.divider()
+        # Display the details of the retrieved papers, a page at a time
+        render_papers(papers, st.session_state.result_json.get("review_id", "review"))
         
         # Display conclusion section
         st.subheader("🧐 Conclusion")